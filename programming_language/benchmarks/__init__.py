@@ -0,0 +1,7 @@
+__all__ = [
+    "artifact_cache_benchmark", "ast_benchmark", "backend_benchmark", "batch_craft_benchmark",
+    "bulk_compile_benchmark", "gui_output_benchmark", "highlighter_benchmark", "lexer_benchmark",
+    "output_sink_benchmark", "pipeline_benchmark", "planner_benchmark", "program_generator",
+    "recipe_index_benchmark", "resource_limits_benchmark", "service_load_benchmark", "stack_benchmark",
+    "startup_benchmark", "token_memory_benchmark",
+]
@@ -0,0 +1,115 @@
+"""
+Artifact cache benchmark.
+
+Runs every program in EQUIVALENCE_PROGRAMS (from tests/test_engine_equivalence.py,
+plus the templates) through run_interpretation_process() on each engine without the
+cache, with a cold cache and with a warm one, and checks that output, errors
+and results are identical. Then checks that stale, corrupt and oversized
+entries are handled, and times cold against warm runs of a larger program.
+
+Run from the programming_language directory:
+    python -m benchmarks.artifact_cache_benchmark --statements 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from interpreter.artifact_cache import ArtifactCache, HEADER
+from interpreter.run_interpretation_process import ENGINES, PYTHON_CODE_CACHE, run_interpretation_process
+from tests.test_engine_equivalence import EQUIVALENCE_PROGRAMS, load_templates
+
+# Progress lines that depend on whether the analysis phases ran.
+PHASE_PREFIXES = ("Syntactic analysis", "Semantic analysis", "Type inference", "Optimization", "Analyzed program")
+
+
+def run(code, engine, cache):
+    PYTHON_CODE_CACHE.clear()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            result = run_interpretation_process(code, engine, cache=cache)
+            result = [node.to_dict() for node in result]
+            error = None
+        except Exception as e:
+            result = None
+            error = f"{type(e).__name__}: {e}"
+    lines = [line for line in output.getvalue().splitlines() if not line.startswith(PHASE_PREFIXES)]
+    return lines, error, result
+
+
+def build_program(statements):
+    lines = ["func scale(x, factor) { return x * factor; }"]
+    for index in range(statements):
+        lines.append(f"v{index % 50} = scale({index}, 2) + {index} * 3 - {index % 7};")
+    lines.append('log("done " + v0);')
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact cache benchmark")
+    parser.add_argument("--statements", type=int, default=2000, help="statements in the timed program")
+    parser.add_argument("--repeat", type=int, default=20, help="warm runs timed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ArtifactCache(directory)
+        programs = EQUIVALENCE_PROGRAMS + load_templates()
+        for code in programs:
+            for engine in ENGINES:
+                expected = run(code, engine, None)
+                for attempt in ("cold", "warm"):
+                    if run(code, engine, cache) != expected:
+                        raise AssertionError(f"{attempt} cached run differs on '{engine}':\n{code}")
+        print(f"Equivalence: {len(programs)} programs identical without cache, cold and warm on "
+              f"{', '.join(ENGINES)}")
+        print(f"  cache: {cache.statistics()}")
+
+        code = programs[0]
+        path = cache._key(code)[1]
+        with open(path, "r+b") as f:
+            f.seek(HEADER.size + 3)
+            byte = f.read(1)
+            f.seek(HEADER.size + 3)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        corrupt = cache.corrupt
+        if cache.get(code) is not None or cache.corrupt != corrupt + 1 or os.path.exists(path):
+            raise AssertionError("Corrupt entry not detected")
+        run(code, "tree", cache)
+        with open(path, "r+b") as f:
+            f.seek(6)
+            f.write(bytes(32))
+        stale = cache.stale
+        if cache.get(code) is not None or cache.stale != stale + 1:
+            raise AssertionError("Stale entry not detected")
+        small = ArtifactCache(directory, max_bytes=cache.size() // 2)
+        run(build_program(10), "tree", small)
+        if small.evictions == 0 or small.size() > small.max_bytes:
+            raise AssertionError("Cache not kept under max_bytes")
+        print(f"  corrupt and stale entries dropped, {small.evictions} entries evicted to stay under "
+              f"{small.max_bytes} bytes")
+
+        cache.clear()
+        code = build_program(args.statements)
+        start = time.perf_counter()
+        cold_result = run(code, "vm", cache)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            if run(code, "vm", cache) != cold_result:
+                raise AssertionError("Warm run differs from cold run")
+        warm = (time.perf_counter() - start) / args.repeat
+        uncached = time.perf_counter()
+        run(code, "vm", None)
+        uncached = time.perf_counter() - uncached
+        print(f"{args.statements} statements ({cache.size()} bytes cached):")
+        print(f"  no cache: {uncached * 1000:8.1f} ms")
+        print(f"      cold: {cold * 1000:8.1f} ms")
+        print(f"      warm: {warm * 1000:8.1f} ms")
+        print(f"Speedup: {uncached / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
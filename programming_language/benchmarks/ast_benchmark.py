@@ -0,0 +1,164 @@
+"""
+Memory and traversal benchmark for the AST representation.
+
+Compares the __slots__ node classes built by Parser against the equivalent
+plain dicts (Node.to_dict(), the format the parser used to produce): deep
+memory of the tree, measured with tracemalloc, and the time of a full
+visitor walk that reads every child the way Interpreter does.
+
+Run from the programming_language directory:
+    python -m benchmarks.ast_benchmark --size-mb 4
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.lexer_benchmark import build_corpus
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+
+
+class NodeWalker:
+    def visit(self, node):
+        return getattr(self, "visit_" + node.node_type)(node)
+
+    def visit_block(self, statements):
+        count = 0
+        for stmt in statements:
+            count += self.visit(stmt)
+        return count
+
+    def visit_recipe(self, node):
+        return 1 + sum(len(item.material) > 0 for item in node.input)
+
+    def visit_function_definition(self, node):
+        return 1 + self.visit_block(node.body)
+
+    def visit_assignment(self, node):
+        return 1 + self.visit(node.expression)
+
+    def visit_conditional(self, node):
+        count = 1 + self.visit(node.condition) + self.visit_block(node.then_branch)
+        if node.else_branch is not None:
+            count += self.visit_block(node.else_branch)
+        return count
+
+    def visit_while_loop(self, node):
+        return 1 + self.visit(node.condition) + self.visit_block(node.body)
+
+    def visit_for_loop(self, node):
+        return (1 + self.visit(node.init) + self.visit(node.condition)
+                + self.visit(node.post) + self.visit_block(node.body))
+
+    def visit_log(self, node):
+        return 1 + self.visit(node.expression)
+
+    def visit_craft_command(self, node):
+        return 1
+
+    def visit_binary_expression(self, node):
+        return 1 + self.visit(node.left) + self.visit(node.right)
+
+    def visit_literal(self, node):
+        return 1
+
+    def visit_identifier(self, node):
+        return 1
+
+
+class DictWalker:
+    def visit(self, node):
+        return getattr(self, "visit_" + node["node_type"])(node)
+
+    def visit_block(self, statements):
+        count = 0
+        for stmt in statements:
+            count += self.visit(stmt)
+        return count
+
+    def visit_recipe(self, node):
+        return 1 + sum(len(item["material"]) > 0 for item in node["input"])
+
+    def visit_function_definition(self, node):
+        return 1 + self.visit_block(node["body"])
+
+    def visit_assignment(self, node):
+        return 1 + self.visit(node["expression"])
+
+    def visit_conditional(self, node):
+        count = 1 + self.visit(node["condition"]) + self.visit_block(node["then_branch"])
+        if node["else_branch"] is not None:
+            count += self.visit_block(node["else_branch"])
+        return count
+
+    def visit_while_loop(self, node):
+        return 1 + self.visit(node["condition"]) + self.visit_block(node["body"])
+
+    def visit_for_loop(self, node):
+        return (1 + self.visit(node["init"]) + self.visit(node["condition"])
+                + self.visit(node["post"]) + self.visit_block(node["body"]))
+
+    def visit_log(self, node):
+        return 1 + self.visit(node["expression"])
+
+    def visit_craft_command(self, node):
+        return 1
+
+    def visit_binary_expression(self, node):
+        return 1 + self.visit(node["left"]) + self.visit(node["right"])
+
+    def visit_literal(self, node):
+        return 1
+
+    def visit_identifier(self, node):
+        return 1
+
+
+def measure(build):
+    """
+    Returns the object built by build() and the bytes it still holds afterwards.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_walk(walker, abstract_syntax_tree, repeat):
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = walker.visit_block(abstract_syntax_tree)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AST memory and traversal benchmark")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="approximate corpus size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="walks per representation (best is kept)")
+    args = parser.parse_args()
+
+    code = build_corpus(int(args.size_mb * 1024 * 1024))
+    tokens = Lexer(code).tokenize_buffer()
+    nodes, node_bytes = measure(lambda: Parser(tokens).parse())
+    dicts, dict_bytes = measure(lambda: [node.to_dict() for node in Parser(tokens).parse()])
+
+    node_time, node_count = time_walk(NodeWalker(), nodes, args.repeat)
+    dict_time, dict_count = time_walk(DictWalker(), dicts, args.repeat)
+    if node_count != dict_count:
+        raise AssertionError("Walkers visited a different number of nodes")
+
+    print(f"Corpus: {len(code) / (1024 * 1024):.2f} MB, {node_count} nodes")
+    for label, size, elapsed in (("dict nodes", dict_bytes, dict_time), ("slots nodes", node_bytes, node_time)):
+        print(f"{label:>12}: {size / (1024 * 1024):8.2f} MB  {size / node_count:8.1f} bytes/node  "
+              f"walk {elapsed:8.3f} s")
+    print(f"Memory reduction: {dict_bytes / node_bytes:.2f}x  Walk speedup: {dict_time / node_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Loop benchmark for the execution engines.
+
+Times a tight loop and a recursive function, with and without memoization, on
+every engine. That the engines behave the same is checked by
+tests/test_engine_equivalence.py.
+
+Run from the programming_language directory:
+    python -m benchmarks.backend_benchmark --iterations 200000 --recursion 20
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from interpreter.run_interpretation_process import ENGINES, create_engine
+from tests.test_engine_equivalence import parse
+
+RECURSIVE_PROGRAM = """
+func cost(n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return cost(n - 1) + cost(n - 2);
+}}
+total = cost({depth});
+"""
+
+LOOP_PROGRAM = """
+total = 0;
+for (i = 0; i < {iterations}; i = i + 1) {{
+    total = total + i * 2;
+    if (total > 1000000) {{
+        total = total - 1000000;
+    }}
+}}
+"""
+
+
+
+def time_engine(engine_name, abstract_syntax_tree, global_scope, repeat, memo_size=0):
+    best = None
+    for _ in range(repeat):
+        engine = create_engine(engine_name, global_scope, memo_size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            engine.run(abstract_syntax_tree)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execution engine benchmark")
+    parser.add_argument("--iterations", type=int, default=100000, help="loop iterations of the timed program")
+    parser.add_argument("--recursion", type=int, default=18, help="argument of the timed recursive function")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per engine (best is kept)")
+    args = parser.parse_args()
+
+    abstract_syntax_tree, global_scope = parse(LOOP_PROGRAM.format(iterations=args.iterations))
+    baseline = time_engine("tree", abstract_syntax_tree, global_scope, args.repeat)
+    for engine_name in ENGINES:
+        elapsed = baseline if engine_name == "tree" else time_engine(engine_name, abstract_syntax_tree,
+                                                                     global_scope, args.repeat)
+        print(f"{engine_name:>8}: {elapsed:8.3f} s  {args.iterations / elapsed:12.0f} iterations/s  "
+              f"{baseline / elapsed:6.2f}x")
+
+    abstract_syntax_tree, global_scope = parse(RECURSIVE_PROGRAM.format(depth=args.recursion))
+    print(f"Recursive cost({args.recursion}):")
+    for engine_name in ENGINES:
+        plain = time_engine(engine_name, abstract_syntax_tree, global_scope, args.repeat)
+        memoized = time_engine(engine_name, abstract_syntax_tree, global_scope, args.repeat, memo_size=128)
+        print(f"{engine_name:>8}: {plain:8.3f} s  memoized {memoized:8.4f} s  "
+              f"memo speedup {plain / memoized:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
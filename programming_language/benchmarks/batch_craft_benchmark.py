@@ -0,0 +1,82 @@
+"""
+Batch crafting benchmark.
+
+Compiles the template recipes into a RecipeMatrix, generates random inventories,
+checks BatchSimulator.max_crafts() and craft() against the pure-Python reference
+on a sample, and then times max_crafts() for every recipe and in-place crafts of
+every recipe over all the inventories.
+
+Run from the programming_language directory:
+    python -m benchmarks.batch_craft_benchmark --inventories 1000000
+"""
+import argparse
+import time
+
+# Imported first: it explains how to install numpy when it is missing.
+from interpreter.crafting.batch_simulator import BatchSimulator, RecipeMatrix, reference_craft, reference_max_crafts
+import numpy as np
+
+from benchmarks.recipe_index_benchmark import load_recipes
+
+
+def random_inventories(matrix, count, seed=3):
+    rng = np.random.default_rng(seed)
+    # Mostly small stacks with some empty slots, like real inventories.
+    inventories = rng.integers(0, 65, size=(count, len(matrix.materials)), dtype=np.int64)
+    inventories[rng.random(inventories.shape) < 0.3] = 0
+    return np.asfortranarray(inventories)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch crafting benchmark")
+    parser.add_argument("--inventories", type=int, default=1000000, help="inventories simulated with NumPy")
+    parser.add_argument("--sample", type=int, default=2000, help="inventories checked against the reference")
+    args = parser.parse_args()
+
+    recipes = load_recipes()
+    matrix = RecipeMatrix(recipes)
+    simulator = BatchSimulator(matrix)
+    print(f"Matrix: {len(matrix.recipes)} recipes x {len(matrix.materials)} materials")
+
+    inventories = random_inventories(matrix, args.inventories)
+    sample = inventories[:args.sample]
+    dicts = [matrix.to_dict(row) for row in sample]
+    counts = simulator.max_crafts(sample)
+    for recipe in recipes:
+        row = matrix.recipe(recipe.name)
+        crafted = simulator.craft(sample, row, counts[:, row])
+        for index, inventory in enumerate(dicts):
+            expected = reference_max_crafts(recipe, inventory)
+            if counts[index, row] != expected:
+                raise AssertionError(f"max_crafts of '{recipe.name}' differs on inventory {index}")
+            if matrix.to_dict(crafted[index]) != reference_craft(recipe, inventory, expected):
+                raise AssertionError(f"craft of '{recipe.name}' differs on inventory {index}")
+    if not (matrix.to_array(dicts) == sample).all():
+        raise AssertionError("to_array does not invert to_dict")
+    print(f"Equivalence: {args.sample} inventories x {len(recipes)} recipes identical to the reference")
+
+    start = time.perf_counter()
+    counts = simulator.max_crafts(inventories)
+    vector_max = time.perf_counter() - start
+    # Each recipe is crafted as often as possible, one after another, on the same inventories.
+    start = time.perf_counter()
+    for recipe in recipes:
+        row = matrix.recipe(recipe.name)
+        simulator.craft(inventories, row, simulator.max_crafts(inventories, row), in_place=True)
+    vector_craft = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for recipe in recipes:
+        for inventory in dicts:
+            reference_craft(recipe, inventory, reference_max_crafts(recipe, inventory))
+    reference = (time.perf_counter() - start) / len(dicts)
+
+    vector = (vector_max + vector_craft) / args.inventories
+    print(f"  numpy: max_crafts {vector_max:.3f} s, craft {vector_craft:.3f} s "
+          f"for {args.inventories} inventories ({1 / vector:12.0f} inventories/s)")
+    print(f" python: {1 / reference:12.0f} inventories/s")
+    print(f"Speedup: {reference / vector:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Bulk compilation benchmark.
+
+Writes a tree of recipe files (the templates, generated recipes and a few files
+with lexical, syntax and semantic errors) to a temporary directory,
+compiles it with bulk_compile() at 1, 2, 4, ... worker processes up to the
+number of cores, checks that every run produces the same database and errors,
+and reports throughput in files/s.
+
+Run from the programming_language directory:
+    python -m benchmarks.bulk_compile_benchmark --files 5000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from interpreter.bulk_compiler import bulk_compile
+from benchmarks.recipe_index_benchmark import MATERIALS, TEMPLATES_DIR
+
+BROKEN_SOURCES = [
+    "recipe broken_lexical { input: [ (0,0) 1 stick ]; output: stick; tool_required: crafting_table; quantity: 1; } $",
+    "recipe broken_syntax { input: [ (0,0) 1 stick ] output: stick; tool_required: crafting_table; quantity: 1; }",
+    "func broken_semantic() {\n    log(undefined_material);\n}",
+]
+
+
+def write_tree(root, count):
+    """
+    count files in directories of 500: the templates first, then files with one
+    to three random recipes, and one file in every thousand broken.
+    """
+    rng = random.Random(17)
+    templates = sorted(filename for filename in os.listdir(TEMPLATES_DIR) if filename.endswith(".txt"))
+    for index in range(count):
+        directory = os.path.join(root, f"pack_{index // 500:03d}")
+        os.makedirs(directory, exist_ok=True)
+        if index < len(templates):
+            with open(os.path.join(TEMPLATES_DIR, templates[index]), "r", encoding="utf-8") as f:
+                source = f.read()
+        elif index % 1000 == 999:
+            source = BROKEN_SOURCES[(index // 1000) % len(BROKEN_SOURCES)]
+        else:
+            recipes = []
+            for number in range(rng.randint(1, 3)):
+                cells = rng.sample([(row, col) for row in range(3) for col in range(3)], rng.randint(1, 9))
+                items = ",\n             ".join(f"({row},{col}) 1 {rng.choice(MATERIALS)}" for row, col in cells)
+                recipes.append(f"recipe pack_{index}_{number} {{\n    input: [ {items} ];\n"
+                               f"    output: pack_{index}_{number};\n    tool_required: crafting_table;\n"
+                               f"    quantity: {rng.randint(1, 4)};\n}}\n")
+            source = "\n".join(recipes)
+        with open(os.path.join(directory, f"recipe_{index:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk compilation benchmark")
+    parser.add_argument("--files", type=int, default=5000, help="generated source files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest worker count timed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(os.path.join(root, "src"), args.files)
+        counts = [1]
+        while counts[-1] * 2 <= args.workers:
+            counts.append(counts[-1] * 2)
+        if counts[-1] != args.workers:
+            counts.append(args.workers)
+
+        baseline = None
+        for workers in counts:
+            database = os.path.join(root, f"recipes_{workers}.json")
+            report = bulk_compile(os.path.join(root, "src"), database, workers)
+            with open(database, "r", encoding="utf-8") as f:
+                content = json.load(f)
+            if baseline is None:
+                baseline = report
+                print(f"Database: {len(content['recipes'])} recipes, {len(content['errors'])} files with errors, "
+                      f"{len(content['conflicts'])} conflicts")
+                for name, error in list(report.errors.items())[:3]:
+                    print(f"  {name}: {error['type']} at line {error['line']}, column {error['column']}")
+                baseline_content = content
+            elif content != baseline_content:
+                raise AssertionError(f"Database with {workers} workers differs from the single-process one")
+            speedup = baseline.elapsed / report.elapsed
+            print(f"  {workers:3d} workers: {report.files_per_second:8.0f} files/s ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+GUI responsiveness benchmark for InterpreterController.
+
+Runs a script that logs many lines through the controller (worker thread plus
+batched output to the DebugPanel) under an offscreen QApplication, while a
+16 ms timer on the GUI thread records how late each tick fires. Then starts an
+endless loop and measures how long the Stop button takes to end it.
+
+Run from the programming_language directory:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.gui_output_benchmark --lines 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from gui.code_editor import CodeEditor
+from gui.crafting_table import CraftingTableWidget
+from gui.debug_panel import DebugPanel
+from controller.interpreter_controller import InterpreterController
+
+FRAME_INTERVAL_MS = 16
+
+
+def run_until_idle(app, controller, timeout, on_tick=None):
+    """
+    Processes events until the controller is idle; returns the tick gaps in ms.
+    """
+    gaps = []
+    last = time.perf_counter()
+    deadline = last + timeout
+
+    def tick():
+        nonlocal last
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+        if on_tick is not None:
+            on_tick(now)
+        if not controller.is_running() or now > deadline:
+            app.quit()
+
+    timer = QTimer()
+    timer.setInterval(FRAME_INTERVAL_MS)
+    timer.timeout.connect(tick)
+    timer.start()
+    app.exec_()
+    timer.stop()
+    return gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI output benchmark")
+    parser.add_argument("--lines", type=int, default=100000, help="lines logged by the script")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds before giving up")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    editor = CodeEditor()
+    panel = DebugPanel()
+    controller = InterpreterController(editor, CraftingTableWidget(), panel)
+
+    editor.setPlainText(f'for (i = 0; i < {args.lines}; i = i + 1) {{ log("line " + i); }}')
+    batches = []
+    start = time.perf_counter()
+    controller.interpret_code()
+    controller.batcher.linesReady.connect(lambda lines: batches.append(len(lines)))
+    gaps = run_until_idle(app, controller, args.timeout)
+    elapsed = time.perf_counter() - start
+    delivered = sum(batches)
+    text = panel.toPlainText()
+    if f"line {args.lines - 1}" not in text:
+        raise AssertionError("Last line did not reach the debug panel")
+    gaps.sort()
+    print(f"{args.lines} lines in {elapsed:.2f} s: {delivered} lines in {len(batches)} batches "
+          f"({delivered / max(len(batches), 1):.0f} lines/batch)")
+    print(f"  frame gap: median {gaps[len(gaps) // 2]:.1f} ms, p99 {gaps[int(len(gaps) * 0.99)]:.1f} ms, "
+          f"max {gaps[-1]:.1f} ms over {len(gaps)} frames")
+
+    editor.setPlainText("while (1 > 0) { }")
+    controller.interpret_code()
+    stop = {}
+
+    def cancel_later(now):
+        if "requested" not in stop and now - start_loop > 0.5:
+            stop["requested"] = now
+            controller.cancel()
+
+    start_loop = time.perf_counter()
+    run_until_idle(app, controller, args.timeout, cancel_later)
+    if controller.is_running() or "Interpretation cancelled." not in panel.toPlainText():
+        raise AssertionError("Endless loop was not cancelled")
+    print(f"  endless loop stopped {(time.perf_counter() - stop['requested']) * 1000:.1f} ms after cancel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Keystroke latency benchmark for the CodeEditor syntax highlighter.
+
+First checks that the highlighter colors exactly the keywords, numbers and
+strings Lexer produces, on the templates and on a generated program. Then loads
+a generated program of about 20k lines into an offscreen editor with the
+previous QRegExp highlighter (RegExpHighlighter, below) and with the current
+lexer-driven one, and times the initial highlighting and single keystrokes
+typed and erased at random lines: a letter, and a quote, which opens a string
+that runs into the next lines until it is erased. Fails if the p99 latency of
+a letter is over the target.
+
+Run from the programming_language directory:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.highlighter_benchmark --lines 20000 --keystrokes 500
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QRegExp
+from PyQt5.QtGui import QFont, QSyntaxHighlighter, QTextCharFormat, QTextCursor
+from PyQt5.QtWidgets import QApplication, QPlainTextEdit
+
+from benchmarks.program_generator import ProgramGenerator
+from gui.code_editor import COMMENT, INVALID, STRING, SyntaxHighlighter, block_spans
+from interpreter.lexical_analyzer.lexeme import KEYWORD, NUMBER
+from interpreter.lexical_analyzer.lexer import Lexer
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates")
+
+
+class RegExpHighlighter(QSyntaxHighlighter):
+    """
+    The highlighter CodeEditor used before: one QRegExp per rule, copied and run
+    over every block.
+    """
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.highlightingRules = []
+        keywordFormat = QTextCharFormat()
+        keywordFormat.setForeground(Qt.darkBlue)
+        keywordFormat.setFontWeight(QFont.Bold)
+        keywords = [
+            "func", "recipe", "input", "output", "tool_required", "quantity",
+            "if", "else", "while", "for", "craft", "log", "return", "int", "float", "char"
+        ]
+        for keyword in keywords:
+            self.highlightingRules.append((QRegExp(r"\b" + keyword + r"\b"), keywordFormat))
+        numberFormat = QTextCharFormat()
+        numberFormat.setForeground(Qt.darkRed)
+        self.highlightingRules.append((QRegExp(r"\b\d+(\.\d+)?\b"), numberFormat))
+        stringFormat = QTextCharFormat()
+        stringFormat.setForeground(Qt.darkGreen)
+        self.highlightingRules.append((QRegExp(r'"[^\"]*"'), stringFormat))
+        commentFormat = QTextCharFormat()
+        commentFormat.setForeground(Qt.gray)
+        self.highlightingRules.append((QRegExp(r"//[^\n]*"), commentFormat))
+
+    def highlightBlock(self, text):
+        for pattern, fmt in self.highlightingRules:
+            expression = QRegExp(pattern)
+            index = expression.indexIn(text)
+            while index >= 0:
+                length = expression.matchedLength()
+                self.setFormat(index, length, fmt)
+                index = expression.indexIn(text, index + length)
+
+
+def generate_source(lines, seed):
+    """
+    A generated program of at least the given number of lines, with a comment every 50 lines.
+    """
+    scale = 1
+    while True:
+        code = ProgramGenerator(seed).generate(**ProgramGenerator.parameters(scale))
+        count = code.count("\n")
+        if count >= lines:
+            break
+        scale = max(scale + 1, int(scale * lines / count) + 1)
+    source_lines = code.splitlines()
+    for index in range(len(source_lines) - 1, 0, -50):
+        source_lines.insert(index, f"// section {index}")
+    return "\n".join(source_lines) + "\n"
+
+
+def highlighted_tokens(code):
+    """
+    (start, end, kind) of the keywords, numbers and strings block_spans() finds,
+    line by line, with strings that span lines joined back into one token.
+    """
+    tokens = []
+    in_string = False
+    line_start = 0
+    for line in code.split("\n"):
+        spans, still_in_string = block_spans(line, in_string)
+        for start, length, kind in spans:
+            start += line_start
+            if kind == STRING and in_string and start == line_start and tokens and tokens[-1][2] == STRING:
+                tokens[-1] = (tokens[-1][0], start + length, STRING)
+            elif kind not in (COMMENT, INVALID):
+                tokens.append((start, start + length, kind))
+        in_string = still_in_string
+        line_start += len(line) + 1
+    return tokens
+
+
+def check_agreement(sources):
+    for name, code in sources:
+        buffer = Lexer(code).tokenize_buffer()
+        expected = [(buffer.starts[index], buffer.ends[index], buffer.kinds[index]) for index in range(len(buffer))
+                    if buffer.kinds[index] in (KEYWORD, NUMBER, STRING)]
+        actual = highlighted_tokens(code)
+        if actual != expected:
+            mismatch = next((pair for pair in zip(actual, expected) if pair[0] != pair[1]), None)
+            raise AssertionError(f"{name}: highlighting differs from the lexer, first at {mismatch}")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(app, highlighter_class, code, keystrokes, seed):
+    editor = QPlainTextEdit()
+    # Referenced from the editor, or the Python side of the highlighter is collected and nothing is highlighted.
+    editor.highlighter = highlighter_class(editor.document())
+    start = time.perf_counter()
+    editor.setPlainText(code)
+    app.processEvents()
+    load = time.perf_counter() - start
+
+    document = editor.document()
+    randomizer = random.Random(seed)
+    results = {}
+    for label, character in (("letter", "x"), ("quote", '"')):
+        latencies = []
+        for _ in range(keystrokes):
+            cursor = QTextCursor(document.findBlockByNumber(randomizer.randrange(document.blockCount())))
+            cursor.movePosition(QTextCursor.EndOfBlock if character == "x" else QTextCursor.StartOfBlock)
+            # Typing the character and erasing it again; each one is a keystroke.
+            for edit in (lambda: cursor.insertText(character), cursor.deletePreviousChar):
+                start = time.perf_counter()
+                edit()
+                latencies.append(time.perf_counter() - start)
+        results[label] = latencies
+    return load, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Syntax highlighter keystroke benchmark")
+    parser.add_argument("--lines", type=int, default=20000, help="lines of the generated program")
+    parser.add_argument("--keystrokes", type=int, default=500, help="characters typed (and erased) per kind")
+    parser.add_argument("--target-ms", type=float, default=2.0, help="p99 latency allowed for a letter")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the program and of the edited lines")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    code = generate_source(args.lines, args.seed)
+    sources = [(name, open(os.path.join(TEMPLATES_DIR, name), encoding="utf-8").read())
+               for name in sorted(os.listdir(TEMPLATES_DIR)) if name.endswith(".txt")]
+    check_agreement(sources + [("generated program", code)])
+    print(f"Highlighting matches the lexer on {len(sources)} templates and the generated program")
+
+    print(f"Program: {code.count(chr(10))} lines, {len(code) / 1024:.0f} KB; {args.keystrokes} keystrokes per kind")
+    letter_p99 = None
+    for highlighter_class in (RegExpHighlighter, SyntaxHighlighter):
+        load, results = measure(app, highlighter_class, code, args.keystrokes, args.seed)
+        print(f"{highlighter_class.__name__:>18}: load {load * 1000:8.1f} ms")
+        for label, latencies in results.items():
+            print(f"{'':>18}  {label:>6}: p50 {percentile(latencies, 0.5) * 1000:7.3f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:7.3f} ms  max {max(latencies) * 1000:8.3f} ms")
+        letter_p99 = percentile(results["letter"], 0.99) * 1000
+    if letter_p99 > args.target_ms:
+        raise AssertionError(f"p99 keystroke latency {letter_p99:.3f} ms is over the {args.target_ms} ms target")
+    print(f"p99 keystroke latency {letter_p99:.3f} ms, within the {args.target_ms} ms target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Throughput benchmark for the lexer.
+
+Compares the single-pass master-pattern scanner used by Lexer.tokenize()
+against the original per-pattern loop kept in Lexer.tokenize_sequential(),
+and checks that both produce the same tokens and the same lexical errors.
+
+Run from the programming_language directory:
+    python -m benchmarks.lexer_benchmark --size-mb 4
+"""
+import argparse
+import os
+import time
+
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.lexical_analyzer.lexical_error import LexicalError
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates")
+
+SAMPLE_PROGRAM = """
+// Generated crafting report
+func report(count, width) {
+    total = count * width;
+    for (i = 1; i <= count; i = i + 1) {
+        log("Task repetition #" + i);
+    }
+    while (total > 0) {
+        total = total - 1;
+    }
+    if (total >= 100) {
+        log("Large batch");
+    } else {
+        log("Small batch");
+    }
+}
+"""
+
+INVALID_SOURCES = [
+    'recipe bread { input: [ (0,0) 1 wheat ]; output: bread; } @',
+    'log("unterminated);',
+    "x = 1;\n y = 2 # 3;",
+    "x = 1;\x00",
+]
+
+
+def build_corpus(size_bytes):
+    pieces = [SAMPLE_PROGRAM]
+    if os.path.isdir(TEMPLATES_DIR):
+        for filename in sorted(os.listdir(TEMPLATES_DIR)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(TEMPLATES_DIR, filename), "r", encoding="utf-8") as f:
+                    pieces.append(f.read())
+    unit = "\n".join(pieces) + "\n"
+    return unit * max(1, size_bytes // len(unit))
+
+
+def time_tokenizer(code, method_name, repeat):
+    best = None
+    tokens = None
+    for _ in range(repeat):
+        lexer = Lexer(code)
+        start = time.perf_counter()
+        tokens = getattr(lexer, method_name)()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens
+
+
+def lexical_error_of(code, method_name):
+    try:
+        getattr(Lexer(code), method_name)()
+    except LexicalError as e:
+        return str(e), e.position
+    return None
+
+
+def check_equivalence():
+    for source in INVALID_SOURCES:
+        expected = lexical_error_of(source, "tokenize_sequential")
+        actual = lexical_error_of(source, "tokenize")
+        if expected != actual:
+            raise AssertionError(f"Lexical error mismatch for {source!r}: {expected} != {actual}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexer throughput benchmark")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="approximate corpus size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per implementation (best is kept)")
+    args = parser.parse_args()
+
+    code = build_corpus(int(args.size_mb * 1024 * 1024))
+    check_equivalence()
+
+    sequential_time, sequential_tokens = time_tokenizer(code, "tokenize_sequential", args.repeat)
+    master_time, master_tokens = time_tokenizer(code, "tokenize", args.repeat)
+    if sequential_tokens != master_tokens:
+        raise AssertionError("Token streams differ between the sequential and master-pattern lexers")
+
+    size_mb = len(code) / (1024 * 1024)
+    print(f"Corpus: {size_mb:.2f} MB, {len(master_tokens)} tokens")
+    for label, elapsed in (("per-pattern loop", sequential_time), ("master pattern", master_time)):
+        print(f"{label:>18}: {elapsed:8.3f} s  {size_mb / elapsed:8.2f} MB/s  "
+              f"{len(master_tokens) / elapsed:12.0f} tokens/s")
+    print(f"Speedup: {sequential_time / master_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
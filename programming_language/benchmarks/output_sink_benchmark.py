@@ -0,0 +1,103 @@
+"""
+Output sink check and benchmark.
+
+Runs every program in EQUIVALENCE_PROGRAMS (from tests/test_engine_equivalence.py,
+plus the templates) on every engine, optimized or not, with a StructuredSink
+and checks that they write the same lines with the same source positions and
+kinds, and that a StdoutSink writes exactly those lines. Then times a loop that logs on every
+iteration with each sink, writing to a line-buffered stream as a terminal would.
+
+Run from the programming_language directory:
+    python -m benchmarks.output_sink_benchmark --iterations 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from interpreter.evaluator.output_sink import NullSink, RingBufferSink, StdoutSink, StructuredSink
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.run_interpretation_process import ENGINES, create_engine
+from tests.test_engine_equivalence import EQUIVALENCE_PROGRAMS, load_templates, parse
+
+LOG_PROGRAM = 'for (i = 0; i < {iterations}; i = i + 1) {{ log("line " + i); }}'
+
+
+def run_engine(engine_name, abstract_syntax_tree, global_scope, output):
+    engine = create_engine(engine_name, global_scope, 0, None, output)
+    try:
+        engine.run(abstract_syntax_tree)
+    except Exception as e:
+        return type(e).__name__, str(e)
+    return None
+
+
+def check_sinks():
+    checked = 0
+    for code in EQUIVALENCE_PROGRAMS + load_templates():
+        try:
+            abstract_syntax_tree, global_scope = parse(code)
+        except Exception:
+            continue
+        expected = None
+        for tree in (abstract_syntax_tree, Optimizer().optimize(abstract_syntax_tree)):
+            for engine_name in ENGINES:
+                sink = StructuredSink(capacity=None)
+                error = run_engine(engine_name, tree, global_scope, sink)
+                actual = [(record.text, record.position, record.kind) for record in sink.records()], error
+                if expected is None:
+                    expected = actual
+                elif actual != expected:
+                    raise AssertionError(f"Engine '{engine_name}' wrote different records for {code!r}:\n"
+                                         f"{actual}\n!=\n{expected}")
+                stdout = io.StringIO()
+                with contextlib.redirect_stdout(stdout):
+                    run_engine(engine_name, tree, global_scope, None)
+                if stdout.getvalue() != sink.getvalue():
+                    raise AssertionError(f"StdoutSink on '{engine_name}' differs from StructuredSink for {code!r}")
+        checked += 1
+    return checked
+
+
+def time_sink(engine_name, abstract_syntax_tree, global_scope, repeat, sink_factory):
+    best = None
+    with open(os.devnull, "w", buffering=1) as stream:
+        for _ in range(repeat):
+            sink = sink_factory(stream)
+            start = time.perf_counter()
+            run_engine(engine_name, abstract_syntax_tree, global_scope, sink)
+            sink.close()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output sink check and benchmark")
+    parser.add_argument("--iterations", type=int, default=100000, help="lines logged by the timed program")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per engine and sink (best is kept)")
+    args = parser.parse_args()
+
+    checked = check_sinks()
+    print(f"Sinks: {checked} programs write the same lines, positions and kinds on {', '.join(ENGINES)}")
+
+    abstract_syntax_tree, global_scope = parse(LOG_PROGRAM.format(iterations=args.iterations))
+    sinks = [
+        # One write() per line, as print() to a terminal did before the sinks.
+        ("per line", lambda stream: StdoutSink(stream, batch_size=1)),
+        ("batched", lambda stream: StdoutSink(stream)),
+        ("ring", lambda stream: RingBufferSink()),
+        ("structured", lambda stream: StructuredSink()),
+        ("null", lambda stream: NullSink()),
+    ]
+    print(f"Loop logging {args.iterations} lines (line-buffered stream):")
+    print(f"{'':>8}" + "".join(f"{label:>12}" for label, _ in sinks))
+    for engine_name in ENGINES:
+        times = [time_sink(engine_name, abstract_syntax_tree, global_scope, args.repeat, factory)
+                 for _, factory in sinks]
+        print(f"{engine_name:>8}" + "".join(f"{elapsed:10.3f} s" for elapsed in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Per-phase benchmark of the whole pipeline on generated programs.
+
+For every scale, generates a program with ProgramGenerator and times each phase
+of run_interpretation_process() separately: Lexer.tokenize_buffer(),
+Parser.parse(), IterativeSemanticAnalyzer.analyze(), TypeInference.infer(),
+Optimizer.optimize() and the run of the optimized tree on each engine (the
+script's output goes to a NullSink). Reports tokens/s for the lexer, nodes/s
+for the passes over the tree and steps/s for the engines, plus the peak memory
+of each phase, measured with tracemalloc in a separate pass so it does not slow
+down the timed one. The results are written as JSON; --compare reads the JSON
+of another commit and fails if a phase became slower than the threshold.
+
+Run from the programming_language directory:
+    python -m benchmarks.pipeline_benchmark --scales 1 4 16 --output pipeline.json
+    python -m benchmarks.pipeline_benchmark --compare pipeline.json
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.program_generator import ProgramGenerator
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.ast_nodes import Node
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+from interpreter.semantic_analyzer.type_inference import TypeInference
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.evaluator.execution_limits import ExecutionLimits
+from interpreter.evaluator.output_sink import NullSink
+from interpreter.run_interpretation_process import ENGINES, create_engine
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Version of the JSON layout, bumped when a field changes meaning.
+FORMAT_VERSION = 1
+
+
+def count_nodes(value):
+    if isinstance(value, list):
+        return sum(count_nodes(item) for item in value)
+    if isinstance(value, Node):
+        return 1 + sum(count_nodes(child) for _, child in value.fields())
+    return 0
+
+
+def git_commit():
+    """
+    (commit hash, whether the working tree has changes), or (None, None) outside a git checkout.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+class Workload:
+    """
+    The inputs of every phase for one program, built once so that each phase is
+    timed on its own: the tokens, the parsed tree, the analyzed tree and so on.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.tokens = Lexer(code).tokenize_buffer()
+        self.tree = Parser(self.tokens).parse()
+        self.analyzer = IterativeSemanticAnalyzer()
+        self.analyzer.analyze(self.tree)
+        TypeInference().infer(self.tree)
+        self.optimized_tree = Optimizer().optimize(self.tree)
+        self.node_count = count_nodes(self.tree)
+
+    def phases(self, engines):
+        """
+        (name, unit, count, function) of every phase. Each function redoes the phase
+        on fresh input, since the analysis passes annotate the tree they are given.
+        """
+        analyze = self._prepare(lambda tree: IterativeSemanticAnalyzer().analyze(tree))
+        infer = self._prepare(lambda tree: TypeInference().infer(tree), analyzed=True)
+        optimize = self._prepare(lambda tree: Optimizer().optimize(tree), inferred=True)
+        phases = [
+            ("lex", "tokens", len(self.tokens), lambda: Lexer(self.code).tokenize_buffer()),
+            ("parse", "nodes", self.node_count, lambda: Parser(self.tokens).parse()),
+            ("analyze", "nodes", self.node_count, analyze),
+            ("infer", "nodes", self.node_count, infer),
+            ("optimize", "nodes", self.node_count, optimize),
+        ]
+        for engine in engines:
+            phases.append((f"run_{engine}", "steps", self.count_steps(engine), self._runner(engine)))
+        return phases
+
+    def _prepare(self, phase, analyzed=False, inferred=False):
+        """
+        Returns (setup, phase): setup parses (and analyzes) a fresh tree outside the timing.
+        """
+        def setup():
+            tree = Parser(self.tokens).parse()
+            if analyzed or inferred:
+                IterativeSemanticAnalyzer().analyze(tree)
+            if inferred:
+                TypeInference().infer(tree)
+            return tree
+        return setup, phase
+
+    def _runner(self, engine):
+        return lambda: create_engine(engine, self.analyzer.global_scope, output=NullSink()).run(self.optimized_tree)
+
+    def count_steps(self, engine):
+        limits = ExecutionLimits(max_steps=sys.maxsize, check_interval=1)
+        create_engine(engine, self.analyzer.global_scope, limits=limits, output=NullSink()).run(self.optimized_tree)
+        return limits.granted
+
+
+def split(function):
+    if isinstance(function, tuple):
+        return function
+    return (lambda: None), (lambda _: function())
+
+
+def time_phase(function, repeat):
+    """
+    Best wall time of repeat runs of the phase (its setup, if any, is not timed).
+    """
+    setup, phase = split(function)
+    best = None
+    for _ in range(repeat):
+        argument = setup()
+        start = time.perf_counter()
+        phase(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(function):
+    """
+    Peak bytes allocated by one run of the phase, above what its input already holds.
+    """
+    setup, phase = split(function)
+    argument = setup()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        phase(argument)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark(seed, scale, engines, repeat):
+    parameters = ProgramGenerator.parameters(scale)
+    code = ProgramGenerator(seed).generate(**parameters)
+    workload = Workload(code)
+    result = {
+        "scale": scale,
+        "parameters": parameters,
+        "source_bytes": len(code.encode("utf-8")),
+        "source_sha256": hashlib.sha256(code.encode("utf-8")).hexdigest(),
+        "tokens": len(workload.tokens),
+        "nodes": workload.node_count,
+        "phases": {},
+    }
+    for name, unit, count, function in workload.phases(engines):
+        seconds = time_phase(function, repeat)
+        result["phases"][name] = {
+            "seconds": seconds,
+            "unit": unit,
+            "count": count,
+            "per_second": count / seconds if seconds else None,
+            "peak_bytes": peak_memory(function),
+        }
+    return result
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the time of every phase against the baseline; returns the phases that got slower than threshold.
+    """
+    if baseline.get("format") != FORMAT_VERSION:
+        raise AssertionError(f"Baseline has format {baseline.get('format')}, expected {FORMAT_VERSION}")
+    print(f"Compared with {baseline.get('commit') or 'unknown commit'} ({baseline.get('timestamp')}):")
+    previous = {(workload["scale"], workload["source_sha256"]): workload for workload in baseline["workloads"]}
+    regressions = []
+    for workload in results["workloads"]:
+        old = previous.get((workload["scale"], workload["source_sha256"]))
+        if old is None:
+            print(f"  scale {workload['scale']}: no baseline for the same program (seed or generator changed)")
+            continue
+        for name, phase in workload["phases"].items():
+            if name not in old["phases"]:
+                continue
+            ratio = phase["seconds"] / old["phases"][name]["seconds"]
+            memory = phase["peak_bytes"] / max(old["phases"][name]["peak_bytes"], 1)
+            marker = ""
+            if ratio > 1 + threshold:
+                marker = "  SLOWER"
+                regressions.append(f"scale {workload['scale']} {name}")
+            elif ratio < 1 - threshold:
+                marker = "  faster"
+            print(f"  scale {workload['scale']:3d} {name:>12}: time {ratio:5.2f}x  peak memory {memory:5.2f}x{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase pipeline benchmark on generated programs")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the program generator")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16], help="program sizes to generate")
+    parser.add_argument("--engines", nargs="+", default=["tree"], choices=list(ENGINES), help="engines to run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per phase (the best is kept)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.20, help="slowdown reported as a regression")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    results = {
+        "format": FORMAT_VERSION,
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "workloads": [],
+    }
+    for scale in args.scales:
+        workload = benchmark(args.seed, scale, args.engines, args.repeat)
+        results["workloads"].append(workload)
+        print(f"Scale {scale}: {workload['source_bytes'] / 1024:.1f} KB, {workload['tokens']} tokens, "
+              f"{workload['nodes']} nodes")
+        for name, phase in workload["phases"].items():
+            print(f"  {name:>12}: {phase['seconds'] * 1000:9.2f} ms  {phase['per_second']:12,.0f} {phase['unit']}/s  "
+                  f"peak {phase['peak_bytes'] / 1024:9.1f} KB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            raise AssertionError(f"Slower by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Crafting planner benchmark.
+
+Builds a RecipeGraph over a generated, layered recipe pack (each output made from
+outputs of the layer below and raw materials), checks the planner against a
+simulation that crafts on demand and keeps leftovers in an inventory, and then
+times graph construction and plan_many() over every output at growing pack
+sizes, plus repeated plans of one target with and without memoized closures.
+
+Run from the programming_language directory:
+    python -m benchmarks.planner_benchmark --recipes 10000
+"""
+import argparse
+import random
+import time
+
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.crafting.crafting_error import CraftingError
+from interpreter.crafting.crafting_planner import CraftingPlanner
+from interpreter.crafting.dependency_graph import RecipeGraph
+from benchmarks.recipe_index_benchmark import load_recipes
+
+RAW_MATERIALS = ["oak_log", "cobblestone", "iron_ore", "gold_ore", "sand", "string", "wool", "redstone", "coal"]
+
+CYCLIC_SOURCE = """
+recipe ingot_from_block { input: [ (0,0) 1 iron_block ]; output: iron_ingot; tool_required: crafting_table; quantity: 9; }
+recipe block_from_ingots { input: [ (0,0) 9 iron_ingot ]; output: iron_block; tool_required: crafting_table; quantity: 1; }
+recipe anvil { input: [ (0,0) 3 iron_block, (1,1) 4 iron_ingot ]; output: anvil; tool_required: crafting_table; quantity: 1; }
+"""
+
+
+def parse_recipes(source):
+    return [node for node in Parser(Lexer(source).tokenize_buffer()).parse() if node.node_type == "recipe"]
+
+
+def build_pack_source(count, width=100, seed=13):
+    """
+    count recipes in layers of width outputs; layer 0 only uses raw materials.
+    """
+    rng = random.Random(seed)
+    lines = []
+    for index in range(count):
+        layer = index // width
+        below = range((layer - 1) * width, layer * width) if layer else ()
+        cells = rng.sample([(row, col) for row in range(3) for col in range(3)], rng.randint(1, 4))
+        items = []
+        for row, col in cells:
+            if below and rng.random() < 0.7:
+                material = f"part_{rng.choice(below)}"
+            else:
+                material = rng.choice(RAW_MATERIALS)
+            items.append(f"({row},{col}) {rng.randint(1, 3)} {material}")
+        lines.append(f"recipe make_part_{index} {{ input: [ {', '.join(items)} ]; output: part_{index}; "
+                     f"tool_required: crafting_table; quantity: {rng.randint(1, 4)}; }}")
+    return "\n".join(lines)
+
+
+def simulate(graph, targets):
+    """
+    Crafts each target on demand, taking ingredients from an inventory of
+    leftovers first. Returns (raw materials, crafts per recipe, leftovers).
+    """
+    inventory = {}
+    raw = {}
+    crafts = {}
+
+    def obtain(material, amount):
+        if graph.is_raw(material):
+            raw[material] = raw.get(material, 0) + amount
+            return
+        stored = inventory.get(material, 0)
+        taken = min(stored, amount)
+        inventory[material] = stored - taken
+        amount -= taken
+        if not amount:
+            return
+        batch = graph.yields[material]
+        count = -(-amount // batch)
+        for ingredient, per_craft in graph.ingredients[material]:
+            obtain(ingredient, count * per_craft)
+        name = graph.producers[material].name
+        crafts[name] = crafts.get(name, 0) + count
+        inventory[material] += count * batch - amount
+
+    for target, quantity in targets.items():
+        obtain(target, quantity)
+    return raw, crafts, {material: amount for material, amount in inventory.items() if amount}
+
+
+def check_plan(graph, targets):
+    plan = CraftingPlanner(graph).plan_many(targets)
+    raw, crafts, leftovers = simulate(graph, targets)
+    if plan.raw_materials != raw or dict(plan.steps) != crafts or plan.leftovers != leftovers:
+        raise AssertionError(f"Planner and simulation disagree for {targets}")
+    # Steps list every ingredient before the outputs that use it.
+    position = {name: index for index, (name, _) in enumerate(plan.steps)}
+    for name, _ in plan.steps:
+        recipe = next(recipe for recipe in graph.producers.values() if recipe.name == name)
+        for material, _ in graph.ingredients[recipe.output]:
+            if material in graph.producers and position[graph.producers[material].name] > position[name]:
+                raise AssertionError(f"Step '{name}' comes before its ingredient '{material}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crafting planner benchmark")
+    parser.add_argument("--recipes", type=int, default=10000, help="recipes in the largest generated pack")
+    parser.add_argument("--repeats", type=int, default=200, help="plans of one target with varying quantities")
+    args = parser.parse_args()
+
+    templates = RecipeGraph.from_nodes(load_recipes())
+    plan = CraftingPlanner(templates).plan("cake", 64)
+    print(f"Templates: {len(templates)} recipes, {len(templates.raw_materials())} raw materials, "
+          f"{len(templates.cycles)} cycles")
+    print(f"  64 cake: {plan.raw_materials} in {plan.crafts} crafts")
+
+    cyclic = RecipeGraph.from_nodes(parse_recipes(CYCLIC_SOURCE))
+    try:
+        CraftingPlanner(cyclic).plan("anvil")
+        raise AssertionError("Cycle not detected")
+    except CraftingError as e:
+        print(f"  cycle: {e}")
+
+    small = RecipeGraph.from_nodes(parse_recipes(build_pack_source(300, width=30)))
+    rng = random.Random(5)
+    outputs = list(small.producers)
+    for _ in range(50):
+        check_plan(small, {target: rng.randint(1, 64) for target in rng.sample(outputs, rng.randint(1, 5))})
+    print(f"Equivalence: 50 plans identical to on-demand simulation ({len(small)} recipes)")
+
+    for count in (args.recipes // 4, args.recipes // 2, args.recipes):
+        recipes = parse_recipes(build_pack_source(count))
+        start = time.perf_counter()
+        graph = RecipeGraph.from_nodes(recipes)
+        build_time = time.perf_counter() - start
+        planner = CraftingPlanner(graph)
+        start = time.perf_counter()
+        plan = planner.plan_many({output: 1 + index % 64 for index, output in enumerate(graph.producers)})
+        plan_time = time.perf_counter() - start
+        print(f"{count:6d} recipes: graph {build_time:.3f} s, plan all {plan_time:.3f} s "
+              f"({(build_time + plan_time) / count * 1e6:.1f} us/recipe), {len(plan.steps)} steps")
+
+    target = graph.order[-1]
+    start = time.perf_counter()
+    for quantity in range(1, args.repeats + 1):
+        planner.plan(target, quantity)
+    memoized = time.perf_counter() - start
+    start = time.perf_counter()
+    for quantity in range(1, args.repeats + 1):
+        CraftingPlanner(graph).plan(target, quantity)
+    fresh = time.perf_counter() - start
+    print(f"Repeated plans of '{target}' ({len(planner.closure(target))} outputs needed):")
+    print(f"  memoized: {args.repeats / memoized:10.0f} plans/s")
+    print(f"     fresh: {args.repeats / fresh:10.0f} plans/s")
+    print(f"Speedup: {fresh / memoized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Seeded generator of synthetic programs for the benchmarks.
+
+ProgramGenerator(seed).generate(...) returns the source of a program with the
+requested number of recipes (and craft commands), functions built around deeply
+nested expressions, blocks of nested loops and long runs of log statements. The
+same seed and parameters always give the same source, so timings of different
+commits compare the same work. Every program passes the semantic analysis and
+runs without errors on every engine.
+
+    python -m benchmarks.program_generator --seed 1 --scale 2 > program.txt
+"""
+import argparse
+import random
+
+MATERIALS = ("wheat", "coal", "stick", "iron_ingot", "gold_ingot", "planks", "cobblestone", "string", "sugar",
+             "egg", "milk_bucket", "redstone", "diamond", "leather", "paper", "feather", "flint", "glass")
+TOOLS = ("crafting_table", "furnace", "anvil", "smithing_table")
+WORDS = ("batch", "torch", "stack", "report", "progress", "crafted", "material", "stock", "order", "queue")
+
+
+# Parameters of generate() at scale 1.
+DEFAULT_PARAMETERS = dict(
+    recipes=20,              # recipe definitions, each crafted once
+    functions=10,            # functions whose body is one deep expression
+    expression_depth=12,     # nesting depth of those expressions (parentheses)
+    loop_blocks=4,           # top-level blocks of nested loops
+    loop_depth=3,            # loops nested in each block
+    loop_trips=8,            # iterations of each loop (a block runs trips ** depth times)
+    log_lines=200,           # top-level log statements
+    log_length=80,           # characters of each logged string literal
+)
+
+
+class ProgramGenerator:
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    @staticmethod
+    def parameters(scale=1):
+        """
+        DEFAULT_PARAMETERS with every count multiplied by scale (depths and trips are kept).
+        """
+        counts = ("recipes", "functions", "loop_blocks", "log_lines")
+        return {name: value * scale if name in counts else value for name, value in DEFAULT_PARAMETERS.items()}
+
+    def generate(self, **parameters):
+        settings = dict(DEFAULT_PARAMETERS, **parameters)
+        self.random.seed(self.seed)
+        parts = []
+        recipe_names = [f"item_{index}" for index in range(settings["recipes"])]
+        for name in recipe_names:
+            parts.append(self._recipe(name))
+        function_names = []
+        for index in range(settings["functions"]):
+            function_names.append(f"compute_{index}")
+            parts.append(self._function(function_names[-1], settings["expression_depth"]))
+        parts.append("total = 0;")
+        blocks = [self._loop_block(index, settings["loop_depth"], settings["loop_trips"], function_names)
+                  for index in range(settings["loop_blocks"])]
+        logs = [self._log(settings["log_length"]) for _ in range(settings["log_lines"])]
+        crafts = [f"craft recipe {name};" for name in recipe_names]
+        # Interleaved so that no phase sees one long run of a single kind of statement.
+        statements = blocks + logs + crafts
+        self.random.shuffle(statements)
+        parts.extend(statements)
+        parts.append('log("total " + total);')
+        return "\n".join(parts) + "\n"
+
+    def _recipe(self, name):
+        grid = [(row, column) for row in range(3) for column in range(3)]
+        cells = self.random.sample(grid, self.random.randint(1, 9))
+        items = ", ".join(f"({row},{column}) {self.random.randint(1, 4)} {self.random.choice(MATERIALS)}"
+                          for row, column in cells)
+        return (f"recipe {name} {{\n    input: [ {items} ];\n    output: {name};\n"
+                f"    tool_required: {self.random.choice(TOOLS)};\n    quantity: {self.random.randint(1, 16)};\n}}")
+
+    def _expression(self, depth, names):
+        """
+        Nested arithmetic over names and small constants; '+' and '-' (plus '*' and
+        '/' by constants) keep the values finite however deep it is.
+        """
+        operand = self.random.choice(names) if self.random.random() < 0.6 else str(self.random.randint(1, 9))
+        if depth == 0:
+            return operand
+        inner = self._expression(depth - 1, names)
+        operator = self.random.choice(("+", "-", "+", "-", "*", "/"))
+        if operator in ("*", "/"):
+            return f"({inner}) {operator} {self.random.randint(1, 3)}"
+        return f"{operand} {operator} ({inner})"
+
+    def _function(self, name, depth):
+        return (f"func {name}(a, b) {{\n    r = {self._expression(depth, ['a', 'b'])};\n"
+                f"    if (r > 1000000) {{\n        r = 1000000;\n    }}\n    return r;\n}}")
+
+    def _loop_block(self, index, depth, trips, function_names):
+        counters = [f"i{index}_{level}" for level in range(depth)]
+        body = f"acc = {self._expression(3, counters)};"
+        if function_names:
+            body += f"\nacc = acc + {self.random.choice(function_names)}(acc, {counters[-1]});"
+        body += "\nif (acc > 1000) {\nacc = acc / 2;\n}\ntotal = total + acc;"
+        for level, counter in reversed(list(enumerate(counters))):
+            loop = "for" if level % 2 == 0 else "while"
+            if loop == "for":
+                body = f"for ({counter} = 0; {counter} < {trips}; {counter} = {counter} + 1) {{\n{body}\n}}"
+            else:
+                body = (f"{counter} = 0;\nwhile ({counter} < {trips}) {{\n{body}\n"
+                        f"{counter} = {counter} + 1;\n}}")
+        return "acc = 0;\n" + body
+
+    def _log(self, length):
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(self.random.choice(WORDS))
+        text = " ".join(words)[:length]
+        if self.random.random() < 0.5:
+            return f'log("{text}");'
+        return f'log("{text} " + total);'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a synthetic program")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--scale", type=int, default=1, help="multiplier of the default counts")
+    args = parser.parse_args()
+    print(ProgramGenerator(args.seed).generate(**ProgramGenerator.parameters(args.scale)), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Grid matching benchmark for RecipeRegistry.
+
+Registers the templates plus generated recipes, checks that every template
+is found from its grid at every translation (and mirrored), and then times
+RecipeRegistry.match() against a linear scan that compares the grid with
+each recipe's cells.
+
+Run from the programming_language directory:
+    python -m benchmarks.recipe_index_benchmark --recipes 5000 --lookups 100000
+"""
+import argparse
+import os
+import random
+import time
+
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.crafting.recipe_registry import RecipeRegistry, grid_cells, shape_key
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates")
+
+MATERIALS = ["planks", "stick", "cobblestone", "iron_ingot", "gold_ingot", "string", "wool", "glass", "redstone"]
+
+
+def load_recipes():
+    recipes = []
+    for filename in sorted(os.listdir(TEMPLATES_DIR)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(TEMPLATES_DIR, filename), "r", encoding="utf-8") as f:
+                recipes.extend(node for node in Parser(Lexer(f.read()).tokenize_buffer()).parse()
+                               if node.node_type == "recipe")
+    return recipes
+
+
+def build_generated_source(count, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for index in range(count):
+        cells = rng.sample([(row, col) for row in range(3) for col in range(3)], rng.randint(1, 9))
+        items = ", ".join(f"({row},{col}) 1 {rng.choice(MATERIALS)}" for row, col in cells)
+        lines.append(f"recipe generated_{index} {{ input: [ {items} ]; output: generated_{index}; "
+                     f"tool_required: crafting_table; quantity: 1; }}")
+    return "\n".join(lines)
+
+
+def recipe_grid(recipe, row_offset=0, col_offset=0, mirrored=False):
+    cells = [(int(item.position[0]), int(item.position[1]), item.material) for item in recipe.input]
+    width = max(col for _, col, _ in cells) + 1
+    grid = [[None] * 3 for _ in range(3)]
+    for row, col, material in cells:
+        if mirrored:
+            col = width - 1 - col
+        grid[row + row_offset][col + col_offset] = material
+    return grid
+
+
+def placements(recipe):
+    rows = max(int(item.position[0]) for item in recipe.input) + 1
+    cols = max(int(item.position[1]) for item in recipe.input) + 1
+    for row_offset in range(3 - rows + 1):
+        for col_offset in range(3 - cols + 1):
+            yield row_offset, col_offset
+
+
+def linear_match(recipes, grid, allow_mirroring=True):
+    key = shape_key(grid_cells(grid))
+    for recipe in recipes:
+        cells = [(int(item.position[0]), int(item.position[1]), item.material) for item in recipe.input]
+        if shape_key(cells) == key or (allow_mirroring and shape_key(cells, mirrored=True) == key):
+            return recipe
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recipe grid matching benchmark")
+    parser.add_argument("--recipes", type=int, default=5000, help="generated recipes added to the templates")
+    parser.add_argument("--lookups", type=int, default=100000, help="grids matched with the registry")
+    parser.add_argument("--linear-lookups", type=int, default=200, help="grids matched with the linear scan")
+    args = parser.parse_args()
+
+    templates = load_recipes()
+    generated = [node for node in Parser(Lexer(build_generated_source(args.recipes)).tokenize_buffer()).parse()]
+    start = time.perf_counter()
+    registry = RecipeRegistry.from_nodes(templates + generated)
+    build_time = time.perf_counter() - start
+    print(f"Registry: {len(registry)} recipes, {len(registry.by_shape)} shapes, "
+          f"{len(registry.conflicts)} conflicts, built in {build_time:.3f} s")
+    for conflict in registry.conflicts[:5]:
+        print(f"  {conflict}")
+
+    # Every template that kept its shape is found from every placement, mirrored or not.
+    for recipe in templates:
+        if registry.match(recipe_grid(recipe)) is not recipe:
+            continue
+        for row_offset, col_offset in placements(recipe):
+            for mirrored in (False, True):
+                if registry.match(recipe_grid(recipe, row_offset, col_offset, mirrored)) is not recipe:
+                    raise AssertionError(f"Recipe '{recipe.name}' not matched at {row_offset},{col_offset}")
+
+    rng = random.Random(11)
+    recipes = templates + generated
+    grids = []
+    for _ in range(1000):
+        recipe = rng.choice(recipes)
+        row_offset, col_offset = rng.choice(list(placements(recipe)))
+        grids.append(recipe_grid(recipe, row_offset, col_offset, rng.random() < 0.5))
+
+    start = time.perf_counter()
+    for index in range(args.lookups):
+        registry.match(grids[index % len(grids)])
+    indexed = (time.perf_counter() - start) / args.lookups
+
+    start = time.perf_counter()
+    for index in range(args.linear_lookups):
+        linear = linear_match(recipes, grids[index % len(grids)])
+        if linear is not registry.match(grids[index % len(grids)]):
+            raise AssertionError("Linear scan and registry disagree")
+    scanned = (time.perf_counter() - start) / args.linear_lookups
+
+    print(f"  registry: {1 / indexed:12.0f} matches/s")
+    print(f"    linear: {1 / scanned:12.0f} matches/s")
+    print(f"Speedup: {scanned / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
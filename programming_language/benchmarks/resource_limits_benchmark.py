@@ -0,0 +1,137 @@
+"""
+Resource limits check and overhead benchmark.
+
+Runs every program in EQUIVALENCE_PROGRAMS (from tests/test_engine_equivalence.py)
+on every engine under a range of step limits and checks that they stop at the
+same step, with the same output, error (and position) and global_env. Then checks that an
+endless loop is stopped by the timeout, that a doubling string is stopped by
+the memory limit, and times the loop benchmark with and without limits.
+
+Run from the programming_language directory:
+    python -m benchmarks.resource_limits_benchmark --iterations 200000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from interpreter.evaluator.execution_limits import ExecutionLimits
+from interpreter.evaluator.resource_limit_error import ResourceLimitError
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.run_interpretation_process import ENGINES, create_engine
+from interpreter.syntax_analyzer.ast_nodes import FunctionDefinition
+from benchmarks.backend_benchmark import LOOP_PROGRAM
+from tests.test_engine_equivalence import EQUIVALENCE_PROGRAMS, parse
+
+STEP_LIMITS = (0, 1, 2, 5, 13, 40)
+
+# Programs whose limit error must point at a known statement: (code, limits, offset of the marked loop or call).
+LOCATED_PROGRAMS = [
+    ('x = 0; while (1 > 0) { x = x + 1; }', dict(max_steps=50), "while"),
+    ('func spin() { for (i = 0; 1 > 0; i = i + 1) { } } spin();', dict(max_steps=50), "for"),
+    ('func f(n) { return n; } for (i = 0; i < 10; i = i + 1) { f(i); }', dict(max_steps=5), "f(i)"),
+    ('func twice(t) { return t + t; } s = "ab"; while (1 > 0) { s = twice(s); }', dict(max_memory=1 << 20),
+     "twice(s)"),
+    ('s = "ab"; for (i = 0; 1 > 0; i = i + 1) { s = s + s; }', dict(max_memory=1 << 20), "for"),
+]
+
+
+def run_engine(engine_name, abstract_syntax_tree, global_scope, limits):
+    output = io.StringIO()
+    engine = create_engine(engine_name, global_scope, 0, limits)
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            engine.run(abstract_syntax_tree)
+        except Exception as e:
+            error = (type(e).__name__, str(e), getattr(e, "position", None))
+    global_env = {
+        name: ("function", value.name) if isinstance(value, FunctionDefinition) else value
+        for name, value in engine.global_env.items()
+    }
+    return output.getvalue(), error, global_env
+
+
+def check_step_limits():
+    checked = stopped = 0
+    for code in EQUIVALENCE_PROGRAMS:
+        abstract_syntax_tree, global_scope = parse(code)
+        optimized_tree = Optimizer().optimize(abstract_syntax_tree)
+        # The Optimizer drops loops that never run, so each tree is compared with itself on 'tree'.
+        for tree in (abstract_syntax_tree, optimized_tree):
+            for max_steps in STEP_LIMITS:
+                # A small check_interval also exercises the blocks grant() hands out.
+                expected = run_engine("tree", tree, global_scope, ExecutionLimits(max_steps, check_interval=3))
+                for engine_name in ENGINES:
+                    actual = run_engine(engine_name, tree, global_scope, ExecutionLimits(max_steps, check_interval=3))
+                    if actual != expected:
+                        raise AssertionError(f"Engine '{engine_name}' differs from 'tree' with max_steps={max_steps} "
+                                             f"for {code!r}:\n{actual}\n!=\n{expected}")
+                checked += 1
+                stopped += expected[1] is not None and expected[1][0] == "ResourceLimitError"
+    return checked, stopped
+
+
+def check_positions():
+    for code, limits, marker in LOCATED_PROGRAMS:
+        abstract_syntax_tree, global_scope = parse(code)
+        for engine_name in ENGINES:
+            _, error, _ = run_engine(engine_name, abstract_syntax_tree, global_scope, ExecutionLimits(**limits))
+            if error is None or error[0] != "ResourceLimitError" or error[2] != code.index(marker):
+                raise AssertionError(f"Engine '{engine_name}' reported {error} for {code!r}, "
+                                     f"expected position {code.index(marker)}")
+
+
+def check_timeout(timeout):
+    abstract_syntax_tree, global_scope = parse('x = 0; while (1 > 0) { x = x + 1; }')
+    results = []
+    for engine_name in ENGINES:
+        engine = create_engine(engine_name, global_scope, 0, ExecutionLimits(timeout=timeout))
+        start = time.perf_counter()
+        try:
+            engine.run(abstract_syntax_tree)
+        except ResourceLimitError:
+            pass
+        else:
+            raise AssertionError(f"Engine '{engine_name}' ran an endless loop to completion")
+        results.append((engine_name, time.perf_counter() - start))
+    return results
+
+
+def time_loop(engine_name, abstract_syntax_tree, global_scope, repeat, limits_factory):
+    best = None
+    for _ in range(repeat):
+        engine = create_engine(engine_name, global_scope, 0, limits_factory())
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            engine.run(abstract_syntax_tree)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resource limits check and benchmark")
+    parser.add_argument("--iterations", type=int, default=200000, help="loop iterations of the timed program")
+    parser.add_argument("--timeout", type=float, default=0.2, help="timeout of the endless loop, in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per engine (best is kept)")
+    args = parser.parse_args()
+
+    checked, stopped = check_step_limits()
+    print(f"Step limits: {checked} program/limit pairs identical on {', '.join(ENGINES)} ({stopped} stopped)")
+    check_positions()
+    print(f"Positions: {len(LOCATED_PROGRAMS)} limit errors located at the same loop or call on every engine")
+    for engine_name, elapsed in check_timeout(args.timeout):
+        print(f"  timeout {args.timeout} s on {engine_name:>6}: stopped after {elapsed:.3f} s")
+
+    abstract_syntax_tree, global_scope = parse(LOOP_PROGRAM.format(iterations=args.iterations))
+    generous = lambda: ExecutionLimits(max_steps=10 ** 12, timeout=3600, max_memory=1 << 40)
+    print(f"Loop of {args.iterations} iterations, all limits enabled:")
+    for engine_name in ENGINES:
+        plain = time_loop(engine_name, abstract_syntax_tree, global_scope, args.repeat, lambda: None)
+        limited = time_loop(engine_name, abstract_syntax_tree, global_scope, args.repeat, generous)
+        print(f"{engine_name:>8}: {plain:8.3f} s  limited {limited:8.3f} s  overhead {(limited / plain - 1) * 100:+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Load test for the interpretation service (interpreter.service).
+
+Starts the service in-process with each worker count, has a number of clients
+send run and check jobs over keep-alive connections as fast as they are
+answered, and reports jobs/s and the p50/p99 latency. Then checks that a
+script stuck out of reach of its ExecutionLimits is killed (504) while the
+other jobs keep being answered, and that a full queue refuses jobs (503).
+
+Run from the programming_language directory:
+    python -m benchmarks.service_load_benchmark --workers 1 2 4 --clients 16 --jobs 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from interpreter.service import start_service
+
+PROGRAM = """
+func square(n) {{ return n * n; }}
+total = 0;
+for (i = 0; i < {iterations}; i = i + 1) {{ total = total + square(i); }}
+log("total " + total);
+"""
+
+# A loop whose body is so long that the 1024 steps between two clock checks take
+# seconds: only killing the worker stops it in time.
+STUCK_PROGRAM = "x = 0; while (1 > 0) { " + "x = x + 1; " * 5000 + "}"
+
+
+class Client:
+    """
+    Minimal HTTP/1.1 client over one keep-alive connection.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def make_jobs(count, iterations):
+    """
+    (path, payload, expected output) of count jobs, one in five a check.
+    """
+    engines = ("tree", "stack", "vm", "python")
+    jobs = []
+    for index in range(count):
+        if index % 5 == 4:
+            jobs.append(("/check", {"code": PROGRAM.format(iterations=iterations)}, []))
+        else:
+            # Distinct sources, so the artifact cache does not turn the test into a cache benchmark.
+            n = iterations + index % 50
+            jobs.append(("/run", {"code": PROGRAM.format(iterations=n), "engine": engines[index % len(engines)]},
+                         ["Defined function: square", f"LOG: total {float(sum(i * i for i in range(n)))}"]))
+    return jobs
+
+
+async def run_clients(port, jobs, clients):
+    """
+    Sends every job through the given number of concurrent clients; returns (latencies, elapsed).
+    """
+    pending = list(reversed(jobs))
+    latencies = []
+
+    async def client_loop():
+        client = Client(port)
+        try:
+            while pending:
+                path, payload, expected = pending.pop()
+                start = time.perf_counter()
+                status, result = await client.request("POST", path, payload)
+                latencies.append(time.perf_counter() - start)
+                if status != 200 or not result["ok"] or result["output"] != expected:
+                    raise AssertionError(f"{path} answered {status}: {result}, expected output {expected}")
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def load_test(workers, clients, jobs, iterations):
+    server, pool = await start_service(port=0, workers=workers, queue_size=max(64, clients))
+    port = server.sockets[0].getsockname()[1]
+    try:
+        # One job per worker first, so the first requests do not pay the first call of each engine.
+        await run_clients(port, make_jobs(workers, iterations), workers)
+        return await run_clients(port, make_jobs(jobs, iterations), clients)
+    finally:
+        server.close()
+        await pool.close()
+
+
+async def check_stuck_job(workers, iterations):
+    server, pool = await start_service(port=0, workers=workers, kill_grace=0.2)
+    port = server.sockets[0].getsockname()[1]
+    stuck = Client(port)
+    try:
+        start = time.perf_counter()
+        stuck_request = asyncio.ensure_future(stuck.request("POST", "/run", {"code": STUCK_PROGRAM, "timeout": 0.3}))
+        latencies, _ = await run_clients(port, make_jobs(40, iterations), max(workers - 1, 1))
+        status, result = await stuck_request
+        killed_after = time.perf_counter() - start
+        if status != 504 or result["error"]["type"] != "TimeoutError":
+            raise AssertionError(f"Stuck job answered {status}: {result}")
+        health = (await stuck.request("GET", "/health"))[1]
+        if health["killed"] != 1 or health["respawned"] != 1:
+            raise AssertionError(f"Stuck worker was not replaced: {health}")
+        return killed_after, percentile(latencies, 0.99)
+    finally:
+        stuck.close()
+        server.close()
+        await pool.close()
+
+
+async def check_backpressure():
+    server, pool = await start_service(port=0, workers=1, queue_size=2)
+    port = server.sockets[0].getsockname()[1]
+    clients = [Client(port) for _ in range(8)]
+    try:
+        payload = {"code": "x = 0; while (1 > 0) { x = x + 1; }", "timeout": 0.3}
+        responses = await asyncio.gather(*(client.request("POST", "/run", payload) for client in clients))
+        statuses = sorted(status for status, _ in responses)
+        # Two jobs waiting, plus one running if the worker took it before the others arrived;
+        # the rest are refused at once.
+        if set(statuses) != {200, 503} or not 2 <= statuses.count(200) <= 3:
+            raise AssertionError(f"Expected 2 or 3 answered jobs and the rest refused, got {statuses}")
+        return statuses.count(503)
+    finally:
+        for client in clients:
+            client.close()
+        server.close()
+        await pool.close()
+
+
+async def main_async(args):
+    print(f"{args.jobs} jobs ({args.iterations} loop iterations each) from {args.clients} clients, "
+          f"{os.cpu_count()} cores:")
+    for workers in args.workers:
+        latencies, elapsed = await load_test(workers, args.clients, args.jobs, args.iterations)
+        print(f"  {workers:3d} workers: {len(latencies) / elapsed:8.1f} jobs/s  "
+              f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms")
+    killed_after, p99 = await check_stuck_job(max(args.workers), args.iterations)
+    print(f"Stuck job killed after {killed_after:.2f} s; p99 of the other jobs meanwhile {p99 * 1000:.1f} ms")
+    refused = await check_backpressure()
+    print(f"Backpressure: {refused} of 8 jobs refused by a full queue of 2")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpretation service load test")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to test")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--jobs", type=int, default=400, help="jobs per worker count")
+    parser.add_argument("--iterations", type=int, default=2000, help="loop iterations of each run job")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Recursive vs explicit-stack visitors on deep and long ASTs.
+
+Builds programs with a left-leaning expression chain of N terms
+(x = a + a + ... + a;) and with N statements, then times the recursive
+SemanticAnalyzer against IterativeSemanticAnalyzer and the recursive
+Interpreter against StackInterpreter. A visitor that runs out of Python
+stack is reported as RecursionError. Where both succeed, the annotations,
+output and global_env are checked to be identical.
+
+Run from the programming_language directory:
+    python -m benchmarks.stack_benchmark --terms 500,5000,50000 --statements 20000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.syntax_analyzer.ast_nodes import Node
+from interpreter.semantic_analyzer.semantic_analyzer import SemanticAnalyzer
+from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+from interpreter.semantic_analyzer.type_inference import TypeInference
+from interpreter.evaluator.interpreter import Interpreter
+from interpreter.evaluator.stack_interpreter import StackInterpreter
+
+
+def build_chain_program(terms):
+    return "a = 1; x = " + " + ".join(["a"] * terms) + "; log(x);"
+
+
+def build_statement_program(statements):
+    return "x = 0; " + "x = x + 1; " * statements + "log(x);"
+
+
+def annotations(abstract_syntax_tree):
+    """
+    (node type, scope, slot) of every node, collected without recursion.
+    """
+    result = []
+    work = list(reversed(abstract_syntax_tree))
+    while work:
+        node = work.pop()
+        result.append((node.node_type, getattr(node, "scope", None), getattr(node, "slot", None)))
+        children = []
+        for _, value in node.fields():
+            if isinstance(value, Node):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(child for child in value if isinstance(child, Node))
+        work.extend(reversed(children))
+    return result
+
+
+def time_analyzer(analyzer_class, code):
+    abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+    analyzer = analyzer_class()
+    start = time.perf_counter()
+    try:
+        analyzer.analyze(abstract_syntax_tree)
+    except RecursionError:
+        return None, None
+    return time.perf_counter() - start, (abstract_syntax_tree, analyzer.global_scope)
+
+
+def time_engine(engine_class, abstract_syntax_tree, global_scope):
+    engine = engine_class(global_scope)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        try:
+            engine.run(abstract_syntax_tree)
+        except RecursionError:
+            return None, None
+        elapsed = time.perf_counter() - start
+    return elapsed, (output.getvalue(), engine.global_env)
+
+
+def format_time(elapsed):
+    return f"{elapsed:10.4f} s" if elapsed is not None else f"{'RecursionError':>12}"
+
+
+def compare(label, code):
+    recursive_time, recursive_result = time_analyzer(SemanticAnalyzer, code)
+    iterative_time, iterative_result = time_analyzer(IterativeSemanticAnalyzer, code)
+    if iterative_result is None:
+        raise AssertionError(f"IterativeSemanticAnalyzer failed on {label}")
+    abstract_syntax_tree, global_scope = iterative_result
+    if recursive_result is not None and annotations(recursive_result[0]) != annotations(abstract_syntax_tree):
+        raise AssertionError(f"Analyzers annotated {label} differently")
+    TypeInference().infer(abstract_syntax_tree)
+
+    tree_time, tree_result = time_engine(Interpreter, abstract_syntax_tree, global_scope)
+    stack_time, stack_result = time_engine(StackInterpreter, abstract_syntax_tree, global_scope)
+    if stack_result is None:
+        raise AssertionError(f"StackInterpreter failed on {label}")
+    if tree_result is not None and tree_result != stack_result:
+        raise AssertionError(f"Interpreters produced different results on {label}")
+
+    print(f"{label:>22}  analyze: recursive {format_time(recursive_time)}  iterative {format_time(iterative_time)}"
+          f"   run: recursive {format_time(tree_time)}  stack {format_time(stack_time)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recursive vs explicit-stack visitor benchmark")
+    parser.add_argument("--terms", default="500,5000,50000", help="comma-separated expression chain lengths")
+    parser.add_argument("--statements", type=int, default=20000, help="length of the statement list program")
+    args = parser.parse_args()
+
+    for terms in (int(value) for value in args.terms.split(",")):
+        compare(f"chain of {terms} terms", build_chain_program(terms))
+    compare(f"{args.statements} statements", build_statement_program(args.statements))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cold start benchmark for the headless command line (python -m interpreter).
+
+Runs each command in a fresh interpreter under -X importtime and adds up the
+import time of every module a bare "python -c pass" does not import, i.e. what
+the command itself costs before doing any work. Fails if the median of any
+command is over the budget, or if any PyQt5 module is imported.
+
+Run from the programming_language directory:
+    python -m benchmarks.startup_benchmark --budget 50 --repeat 7
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PROGRAM = """
+func countdown(n) { while (n > 0) { log("n " + n); n = n - 1; } }
+recipe torch { input: [ (0,0) 1 coal, (1,0) 1 stick ]; output: torch; tool_required: crafting_table; quantity: 4; }
+countdown(3);
+craft recipe torch;
+"""
+
+COMMANDS = [
+    ("check", ["check"]),
+    ("ast", ["ast"]),
+    ("run", ["run", "--no-cache"]),
+    ("run (cached)", ["run"]),
+    ("run vm", ["run", "--no-cache", "-e", "vm"]),
+    ("run python", ["run", "--no-cache", "-e", "python"]),
+]
+
+
+def import_times(arguments, environment):
+    """
+    Runs python -X importtime with the arguments; returns ({module: self time in us}, wall seconds).
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime"] + arguments, cwd=PROJECT_DIR, env=environment,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise AssertionError(f"{' '.join(arguments)} exited with {completed.returncode}:\n{completed.stderr}")
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_time)
+    return modules, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark of python -m interpreter")
+    parser.add_argument("--budget", type=float, default=50.0, help="import time allowed per command, in ms")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per command (the median is kept)")
+    args = parser.parse_args()
+
+    environment = dict(os.environ, PYTHONPATH=PROJECT_DIR, PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.TemporaryDirectory() as directory:
+        environment["PROGRAMMING_LANGUAGE_CACHE"] = os.path.join(directory, "cache")
+        path = os.path.join(directory, "program.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(PROGRAM)
+
+        baseline_modules, _ = import_times(["-c", "pass"], environment)
+        baseline_wall = statistics.median(import_times(["-c", "pass"], environment)[1] for _ in range(args.repeat))
+        print(f"Baseline (python -c pass): {baseline_wall * 1000:.1f} ms wall, {len(baseline_modules)} modules")
+
+        over_budget = []
+        for label, command in COMMANDS:
+            arguments = ["-m", "interpreter"] + command + [path]
+            if label == "run (cached)":
+                import_times(arguments, environment)
+            totals, walls, imported = [], [], None
+            for _ in range(args.repeat):
+                modules, elapsed = import_times(arguments, environment)
+                imported = [name for name in modules if name not in baseline_modules]
+                totals.append(sum(modules[name] for name in imported) / 1000)
+                walls.append(elapsed)
+            qt_modules = [name for name in imported if name.split(".")[0].startswith("PyQt")]
+            if qt_modules:
+                raise AssertionError(f"'{label}' imported {', '.join(qt_modules)}")
+            total = statistics.median(totals)
+            wall = statistics.median(walls)
+            print(f"{label:>13}: imports {total:6.1f} ms ({len(imported):3d} modules), "
+                  f"wall {wall * 1000:6.1f} ms (+{(wall - baseline_wall) * 1000:5.1f} ms over baseline)")
+            if total > args.budget:
+                over_budget.append(label)
+    if over_budget:
+        raise AssertionError(f"Over the {args.budget} ms import budget: {', '.join(over_budget)}")
+    print(f"All commands within the {args.budget} ms import budget, no PyQt5 module imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Memory benchmark for token storage.
+
+Compares the bytes per token of the list of (type, lexeme, position) tuples
+returned by Lexer.tokenize() against the TokenBuffer returned by
+Lexer.tokenize_buffer(), and checks that the parser builds the same AST from both.
+
+Run from the programming_language directory:
+    python -m benchmarks.token_memory_benchmark --size-mb 4
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.lexer_benchmark import build_corpus
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+
+
+def tuple_list_size(tokens):
+    """
+    Deep size of the token list. Type names are interned constants shared by
+    every token, so only the list, the tuples, the lexemes and the positions count.
+    """
+    total = sys.getsizeof(tokens)
+    for token in tokens:
+        _, lexeme, position = token
+        total += sys.getsizeof(token) + sys.getsizeof(lexeme) + sys.getsizeof(position)
+    return total
+
+
+def token_buffer_size(buffer):
+    """
+    Size of the buffer object and its arrays. The source string is not counted:
+    the caller already holds it.
+    """
+    return (sys.getsizeof(buffer) + sys.getsizeof(buffer.kinds)
+            + sys.getsizeof(buffer.starts) + sys.getsizeof(buffer.ends))
+
+
+def time_parser(tokens, repeat):
+    best = None
+    abstract_syntax_tree = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        abstract_syntax_tree = Parser(tokens).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, abstract_syntax_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token storage memory benchmark")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="approximate corpus size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="parser runs per representation (best is kept)")
+    args = parser.parse_args()
+
+    code = build_corpus(int(args.size_mb * 1024 * 1024))
+    tokens = Lexer(code).tokenize()
+    buffer = Lexer(code).tokenize_buffer()
+    if buffer.to_tuples() != tokens:
+        raise AssertionError("TokenBuffer differs from the token list produced by tokenize()")
+
+    count = len(tokens)
+    list_bytes = tuple_list_size(tokens)
+    buffer_bytes = token_buffer_size(buffer)
+    print(f"Corpus: {len(code) / (1024 * 1024):.2f} MB, {count} tokens")
+    for label, size in (("tuple list", list_bytes), ("token buffer", buffer_bytes)):
+        print(f"{label:>14}: {size / (1024 * 1024):8.2f} MB  {size / count:8.2f} bytes/token")
+    print(f"Reduction: {list_bytes / buffer_bytes:.2f}x")
+
+    list_time, list_ast = time_parser(tokens, args.repeat)
+    buffer_time, buffer_ast = time_parser(buffer, args.repeat)
+    if list_ast != buffer_ast:
+        raise AssertionError("Parser produced different ASTs for the tuple list and the token buffer")
+    print(f"Parse (tuple list converted): {list_time:8.3f} s")
+    print(f"Parse (token buffer):         {buffer_time:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-__all__ = ["interpreter_controller"]
\ No newline at end of file
+__all__ = ["interpretation_worker", "interpreter_controller"]
\ No newline at end of file
@@ -0,0 +1,164 @@
+import sys
+import threading
+import time
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from interpreter.run_interpretation_process import ARTIFACT_CACHE, run_interpretation_process
+from interpreter.lexical_analyzer.lexical_error import LexicalError
+from interpreter.syntax_analyzer.syntax_error import SyntaxError
+from interpreter.semantic_analyzer.semantic_error import SemanticError
+from interpreter.evaluator.execution_limits import ExecutionLimits
+from interpreter.evaluator.resource_limit_error import ExecutionCancelled, ResourceLimitError
+
+# Lines are handed to the GUI at most this often (one frame at 60 fps).
+FLUSH_INTERVAL = 0.016
+
+class ThreadRoutedStdout:
+    """
+    Replacement for sys.stdout that sends what a registered thread writes to that
+    thread's writer and everything else to the original stream, so the GUI can
+    capture the interpreter's print() calls without touching its own output.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writers = {}
+
+    @classmethod
+    def install(cls):
+        if not isinstance(sys.stdout, cls):
+            sys.stdout = cls(sys.stdout)
+        return sys.stdout
+
+    def route(self, thread_id, writer):
+        self.writers[thread_id] = writer
+
+    def unroute(self, thread_id):
+        self.writers.pop(thread_id, None)
+
+    def write(self, text):
+        writer = self.writers.get(threading.get_ident())
+        if writer is None:
+            return self.stream.write(text)
+        writer.write(text)
+        return len(text)
+
+    def flush(self):
+        if threading.get_ident() not in self.writers:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+class LineBatcher(QObject):
+    """
+    Collects written text into complete lines and emits them as one list per
+    FLUSH_INTERVAL. write() runs on the worker thread, so linesReady reaches
+    the GUI through a queued connection; flush() may be called from either
+    thread (the GUI calls it on a timer so the last lines of a quiet stretch
+    are not held back). write_line() makes it an OutputSink, so the engines
+    hand it their lines directly instead of going through print().
+    """
+    linesReady = pyqtSignal(list)
+
+    def __init__(self, interval=FLUSH_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.lines = []
+        self.partial = ""
+        self.last_flush = time.perf_counter()
+
+    def write(self, text):
+        with self.lock:
+            if "\n" in text:
+                *complete, self.partial = (self.partial + text).split("\n")
+                self.lines.extend(complete)
+            else:
+                self.partial += text
+        if self.lines and time.perf_counter() - self.last_flush >= self.interval:
+            self.flush()
+
+    def write_line(self, text, position=None, kind=None):
+        with self.lock:
+            self.lines.append(text)
+        if time.perf_counter() - self.last_flush >= self.interval:
+            self.flush()
+
+    def close(self):
+        self.flush(final=True)
+
+    def flush(self, final=False):
+        with self.lock:
+            if final and self.partial:
+                self.lines.append(self.partial)
+                self.partial = ""
+            lines, self.lines = self.lines, []
+            self.last_flush = time.perf_counter()
+        if lines:
+            self.linesReady.emit(lines)
+
+class InterpretationWorker(QObject):
+    """
+    Runs run_interpretation_process() on the QThread it is moved to. Output goes
+    to a LineBatcher, both as the engine's OutputSink and, for any stray print(),
+    through ThreadRoutedStdout; the result, an error (title, message) or the
+    cancellation is reported with a signal once the output has been flushed.
+    With a PipelineStats in stats the run is instrumented and skips the artifact
+    cache, so every phase shows up in the statistics. cancel() goes through the
+    run's ExecutionLimits, which are made cancellable.
+    """
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, code, batcher, limits=None, stats=None, parent=None):
+        super().__init__(parent)
+        self.code = code
+        self.batcher = batcher
+        if limits is None:
+            limits = ExecutionLimits(cancellable=True)
+        limits.cancellable = True
+        self.limits = limits
+        self.stats = stats
+        self.thread_id = None
+
+    @pyqtSlot()
+    def run(self):
+        stdout = ThreadRoutedStdout.install()
+        self.thread_id = threading.get_ident()
+        stdout.route(self.thread_id, self.batcher)
+        try:
+            cache = ARTIFACT_CACHE if self.stats is None else None
+            result = run_interpretation_process(self.code, cache=cache, limits=self.limits, output=self.batcher,
+                                                stats=self.stats)
+        except ExecutionCancelled:
+            self._finish(self.cancelled.emit)
+        except LexicalError as e:
+            self._finish(self.failed.emit, "Lexical Error", str(e))
+        except SyntaxError as e:
+            self._finish(self.failed.emit, "Syntax Error", str(e))
+        except SemanticError as e:
+            self._finish(self.failed.emit, "Semantic Error", str(e))
+        except ResourceLimitError as e:
+            self._finish(self.failed.emit, "Resource Limit Error", str(e))
+        except Exception as e:
+            self._finish(self.failed.emit, "Unknown Error", str(e))
+        else:
+            self._finish(self.succeeded.emit, result)
+        finally:
+            stdout.unroute(self.thread_id)
+
+    def _finish(self, signal, *arguments):
+        self.batcher.flush(final=True)
+        signal(*arguments)
+        self.finished.emit()
+
+    def cancel(self):
+        """
+        Called from the GUI thread: the engine raises ExecutionCancelled at its
+        next check of the limits, between two loop iterations or calls, so even a
+        loop without output stops. The lexing and analysis phases are not
+        interrupted; a cancel during them stops the script before it starts.
+        """
+        self.limits.cancel()
@@ -1,19 +1,32 @@
 import json
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QColor, QFont
-from interpreter.run_interpretation_process import run_interpretation_process
-from interpreter.lexical_analyzer.lexical_error import LexicalError
-from interpreter.syntax_analyzer.syntax_error import SyntaxError
-from interpreter.semantic_analyzer.semantic_error import SemanticError
+from controller.interpretation_worker import FLUSH_INTERVAL, InterpretationWorker, LineBatcher
+from interpreter.instrumentation import PipelineStats
+
+# Stack for the worker thread; the tree-walking Interpreter recurses deeply on nested calls.
+WORKER_STACK_SIZE = 256 * 1024 * 1024
 
 class InterpreterController(QObject):
     interpretationFinished = pyqtSignal(object)
 
-    def __init__(self, code_editor, crafting_table, debug_panel, parent=None):
+    def __init__(self, code_editor, crafting_table, debug_panel, run_button=None, stop_button=None, parent=None):
         super().__init__(parent)
         self.code_editor = code_editor
         self.crafting_table = crafting_table
         self.debug_panel = debug_panel
+        self.run_button = run_button
+        self.stop_button = stop_button
+        self.thread = None
+        self.worker = None
+        self.batcher = None
+        # With statistics on, every run is instrumented and ends with a summary table.
+        self.collect_statistics = False
+        # Drains lines the worker wrote just before going quiet.
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(int(FLUSH_INTERVAL * 1000))
+        self.flush_timer.timeout.connect(self._flush_output)
+        self._set_running(False)
 
     def debug_append(self, msg, color="black", bold=False):
         current_font = self.debug_panel.font()
@@ -23,30 +36,79 @@ class InterpreterController(QObject):
         self.debug_panel.setTextColor(QColor(color))
         self.debug_panel.append(msg)
 
+    def set_collect_statistics(self, enabled):
+        self.collect_statistics = enabled
+
+    def is_running(self):
+        return self.thread is not None
+
     def interpret_code(self):
+        """
+        Starts the interpretation of the editor's code on a worker thread; the
+        window stays responsive and output reaches the debug panel in batches.
+        """
+        if self.is_running():
+            return
         if hasattr(self.debug_panel, 'clear'):
             self.debug_panel.clear()
         else:
             print("Debug panel does not support clear()")
-        
+
         self.debug_append("Starting interpretation process...", color="blue", bold=True)
         code = self.code_editor.toPlainText()
 
-        try:
-            recipe_ast = run_interpretation_process(code)
-        except LexicalError as le:
-            self.debug_append("Lexical Error:\n" + str(le), color="red", bold=True)
-            return
-        except SyntaxError as se:
-            self.debug_append("Syntax Error:\n" + str(se), color="red", bold=True)
-            return
-        except SemanticError as sme:
-            self.debug_append("Semantic Error:\n" + str(sme), color="red", bold=True)
-            return
-        except Exception as e:
-            self.debug_append("Unknown Error:\n" + str(e), color="red", bold=True)
-            return
+        self.batcher = LineBatcher()
+        self.batcher.linesReady.connect(self._append_output)
+        stats = PipelineStats() if self.collect_statistics else None
+        self.worker = InterpretationWorker(code, self.batcher, stats=stats)
+        self.thread = QThread(self)
+        self.thread.setStackSize(WORKER_STACK_SIZE)
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.succeeded.connect(self._interpretation_succeeded)
+        self.worker.failed.connect(self._interpretation_failed)
+        self.worker.cancelled.connect(self._interpretation_cancelled)
+        self.worker.finished.connect(self.thread.quit)
+        self.thread.finished.connect(self._thread_finished)
+        self._set_running(True)
+        self.flush_timer.start()
+        self.thread.start()
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def wait(self, timeout_ms=None):
+        """
+        Blocks until the worker thread ends (used on shutdown and in scripts).
+        """
+        if self.thread is not None:
+            return self.thread.wait() if timeout_ms is None else self.thread.wait(timeout_ms)
+        return True
+
+    def _set_running(self, running):
+        if self.run_button is not None:
+            self.run_button.setEnabled(not running)
+        if self.stop_button is not None:
+            self.stop_button.setEnabled(running)
+
+    def _flush_output(self):
+        if self.batcher is not None:
+            self.batcher.flush()
 
+    def _append_output(self, lines):
+        if hasattr(self.debug_panel, 'append_lines'):
+            self.debug_panel.append_lines(lines)
+        else:
+            self.debug_append("\n".join(lines))
+
+    def _interpretation_failed(self, title, message):
+        self.debug_append(f"{title}:\n{message}", color="red", bold=True)
+
+    def _interpretation_cancelled(self):
+        self.debug_append("Interpretation cancelled.", color="red", bold=True)
+
+    def _interpretation_succeeded(self, recipe_ast):
         if recipe_ast is None:
             self.debug_append("Interpretation failed due to errors.", color="red", bold=True)
             return
@@ -62,7 +124,7 @@ class InterpreterController(QObject):
         self.debug_append("Interpretation completed successfully.", color="green", bold=True)
 
         try:
-            ast_details = json.dumps(recipe_ast, indent=4)
+            ast_details = json.dumps(recipe_ast.to_dict(), indent=4)
             self.debug_append("", color="black")
             self.debug_append("AST Details:", color="black", bold=True)
             self.debug_append(ast_details, color="darkblue")
@@ -70,3 +132,13 @@ class InterpreterController(QObject):
             self.debug_append("Error formatting AST details: " + str(e), color="red", bold=True)
 
         self.interpretationFinished.emit(recipe_ast)
+
+    def _thread_finished(self):
+        self.flush_timer.stop()
+        self._flush_output()
+        if self.worker.stats is not None and hasattr(self.debug_panel, 'append_statistics'):
+            self.debug_panel.append_statistics(self.worker.stats)
+        self.thread.deleteLater()
+        self.worker.deleteLater()
+        self.thread = self.worker = self.batcher = None
+        self._set_running(False)
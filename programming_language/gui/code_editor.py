@@ -1,6 +1,18 @@
 from PyQt5.QtWidgets import QPlainTextEdit
 from PyQt5.QtGui import QSyntaxHighlighter, QTextCharFormat, QFont
-from PyQt5.QtCore import Qt, QRegExp
+from PyQt5.QtCore import Qt
+from interpreter.lexical_analyzer.lexeme import MASTER_PATTERN, GROUP_KINDS, COMMENT, KEYWORD, NUMBER, STRING
+
+# Characters the lexer rejects; not a token kind of its own.
+INVALID = -1
+HIGHLIGHTED_KINDS = frozenset((COMMENT, KEYWORD, NUMBER, STRING))
+
+# Block states: whether a string opened in an earlier line is still open.
+NORMAL = 0
+IN_STRING = 1
+
+# (state, text) of highlighted lines kept in the cache; it is emptied when full.
+MAX_CACHED_BLOCKS = 50000
 
 
 class CodeEditor(QPlainTextEdit):
@@ -9,42 +21,100 @@ class CodeEditor(QPlainTextEdit):
         self.setFont(QFont("Consolas", 10))
         self.highlighter = SyntaxHighlighter(self.document())
 
+def block_spans(text, in_string=False):
+    """
+    Scans one line with the lexer's own MASTER_PATTERN, so the editor colors
+    exactly the tokens the interpreter will see. Returns the (start, length, kind)
+    of the tokens worth highlighting (and of the characters the lexer rejects,
+    as INVALID), and whether a string is still open at the end of the line.
+    """
+    spans = []
+    position = 0
+    length = len(text)
+    if in_string:
+        end = text.find('"')
+        if end == -1:
+            return ([(0, length, STRING)] if length else []), True
+        spans.append((0, end + 1, STRING))
+        position = end + 1
+    match_token = MASTER_PATTERN.match
+    group_kinds = GROUP_KINDS
+    while position < length:
+        match = match_token(text, position)
+        if match is None:
+            if text[position] == '"':
+                # Strings may span lines; the rest of this one is part of it.
+                spans.append((position, length - position, STRING))
+                return spans, True
+            spans.append((position, 1, INVALID))
+            position += 1
+            continue
+        kind = group_kinds[match.lastindex]
+        end = match.end()
+        if kind in HIGHLIGHTED_KINDS:
+            spans.append((position, end - position, kind))
+        position = end
+    return spans, False
+
+def _utf16_spans(text, spans):
+    # Qt counts positions in UTF-16 code units: characters outside the BMP take two.
+    offsets = [0]
+    for character in text:
+        offsets.append(offsets[-1] + (2 if ord(character) > 0xFFFF else 1))
+    return [(offsets[start], offsets[start + length] - offsets[start], kind) for start, length, kind in spans]
+
 class SyntaxHighlighter(QSyntaxHighlighter):
+    """
+    Highlights every line (block) with one scan of the lexer's MASTER_PATTERN.
+    Each block's state records whether a string is still open at its end, so Qt
+    only highlights the edited blocks again, plus the following ones while their
+    state changes. Lines seen before with the same state reuse their spans.
+    """
+
     def __init__(self, document):
         super(SyntaxHighlighter, self).__init__(document)
-        self.highlightingRules = []
-
         keywordFormat = QTextCharFormat()
         keywordFormat.setForeground(Qt.darkBlue)
         keywordFormat.setFontWeight(QFont.Bold)
-        keywords = [
-            "func", "recipe", "input", "output", "tool_required", "quantity",
-            "if", "else", "while", "for", "craft", "log", "return", "int", "float", "char"
-        ]
-        for keyword in keywords:
-            pattern = QRegExp(r"\b" + keyword + r"\b")
-            self.highlightingRules.append((pattern, keywordFormat))
-        
+
         numberFormat = QTextCharFormat()
         numberFormat.setForeground(Qt.darkRed)
-        pattern = QRegExp(r"\b\d+(\.\d+)?\b")
-        self.highlightingRules.append((pattern, numberFormat))
-        
+
         stringFormat = QTextCharFormat()
         stringFormat.setForeground(Qt.darkGreen)
-        pattern = QRegExp(r'"[^\"]*"')
-        self.highlightingRules.append((pattern, stringFormat))
-        
+
         commentFormat = QTextCharFormat()
         commentFormat.setForeground(Qt.gray)
-        pattern = QRegExp(r"//[^\n]*")
-        self.highlightingRules.append((pattern, commentFormat))
+
+        invalidFormat = QTextCharFormat()
+        invalidFormat.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        invalidFormat.setUnderlineColor(Qt.red)
+
+        self.formats = {
+            KEYWORD: keywordFormat,
+            NUMBER: numberFormat,
+            STRING: stringFormat,
+            COMMENT: commentFormat,
+            INVALID: invalidFormat,
+        }
+        # (starts in a string, text) -> (spans with their formats, state at the end).
+        self.blockCache = {}
 
     def highlightBlock(self, text):
-        for pattern, fmt in self.highlightingRules:
-            expression = QRegExp(pattern)
-            index = expression.indexIn(text)
-            while index >= 0:
-                length = expression.matchedLength()
-                self.setFormat(index, length, fmt)
-                index = expression.indexIn(text, index + length)
+        key = (self.previousBlockState() == IN_STRING, text)
+        cached = self.blockCache.get(key)
+        if cached is None:
+            spans, in_string = block_spans(text, key[0])
+            if not text.isascii() and any(ord(character) > 0xFFFF for character in text):
+                spans = _utf16_spans(text, spans)
+            formats = self.formats
+            cached = (tuple((start, length, formats[kind]) for start, length, kind in spans),
+                      IN_STRING if in_string else NORMAL)
+            if len(self.blockCache) >= MAX_CACHED_BLOCKS:
+                self.blockCache.clear()
+            self.blockCache[key] = cached
+        spans, state = cached
+        setFormat = self.setFormat
+        for start, length, fmt in spans:
+            setFormat(start, length, fmt)
+        self.setCurrentBlockState(state)
@@ -60,10 +60,10 @@ class CraftingTableWidget(QGraphicsView):
         offset_x = (self.bg_width - self.grid_width) / 2
         offset_y = (self.bg_height - self.grid_height) / 2
 
-        for item in recipe_ast.get("input", []):
-            position = item["position"]
-            quantity = item["quantity"]
-            material = item["material"]
+        for item in getattr(recipe_ast, "input", []):
+            position = item.position
+            quantity = item.quantity
+            material = item.material
             try:
                 row, col = int(position[0]), int(position[1])
             except Exception as e:
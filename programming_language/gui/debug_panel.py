@@ -1,13 +1,57 @@
+import html
 from PyQt5.QtWidgets import QTextEdit
 from PyQt5.QtGui import QFont
 
+# Oldest lines are dropped beyond this, so a chatty script cannot slow the panel down.
+MAX_LINES = 20000
+# Node types listed per visitor in the statistics table.
+STATISTICS_NODE_TYPES = 10
+
 class DebugPanel(QTextEdit):
     def __init__(self, parent=None):
         super(DebugPanel, self).__init__(parent)
         self.setReadOnly(True)
         self.setFont(QFont("Consolas", 10))
         self.setStyleSheet("background-color: #f0f0f0; color: black;")
+        self.document().setMaximumBlockCount(MAX_LINES)
 
     def append_message(self, message):
         self.append(message)
 
+    def append_lines(self, lines):
+        """
+        Appends a batch of program output lines with a single document update.
+        """
+        self.append("\n".join(lines))
+
+    def append_statistics(self, stats):
+        """
+        Appends a PipelineStats as HTML tables: the time and allocations of every
+        phase, then the most expensive node types of each instrumented visitor.
+        """
+        rows = [_row(("Phase", "Time (ms)", "Allocated (KB)", "Retained (KB)"), header=True)]
+        for phase in stats.phases:
+            rows.append(_row((phase.name, f"{phase.seconds * 1000:.2f}",
+                              _kilobytes(phase.allocated), _kilobytes(phase.retained))))
+        rows.append(_row(("total", f"{stats.total_seconds * 1000:.2f}", "", ""), header=True))
+        parts = ["<b>Pipeline statistics</b>", _table(rows)]
+        for visitor in stats.nodes:
+            rows = [_row((f"{visitor} node", "Count", "Cumulative (ms)", "Self (ms)"), header=True)]
+            for node_type, node_stats in stats.node_rows(visitor)[:STATISTICS_NODE_TYPES]:
+                rows.append(_row((node_type, str(node_stats.count), f"{node_stats.seconds * 1000:.2f}",
+                                  f"{node_stats.self_seconds * 1000:.2f}")))
+            parts.append(_table(rows))
+        self.append("".join(parts))
+
+def _kilobytes(size):
+    return "-" if size is None else f"{size / 1024:.1f}"
+
+def _row(cells, header=False):
+    tag = "th" if header else "td"
+    # The first column is a name, the others are numbers.
+    aligned = [f'<{tag} align="left">{html.escape(cells[0])}</{tag}>']
+    aligned.extend(f'<{tag} align="right">{html.escape(cell)}</{tag}>' for cell in cells[1:])
+    return "<tr>" + "".join(aligned) + "</tr>"
+
+def _table(rows):
+    return '<table cellspacing="0" cellpadding="3" border="1">' + "".join(rows) + "</table>"
@@ -1,6 +1,13 @@
 __all__ = [
     "lexical_analizer",
     "syntax_analizer",
+    "crafting",
+    "optimizer",
     "evaluator",
-    "run_interpretation_process"
+    "artifact_cache",
+    "bulk_compiler",
+    "instrumentation",
+    "profiler",
+    "run_interpretation_process",
+    "service"
 ]
\ No newline at end of file
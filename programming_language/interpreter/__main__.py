@@ -0,0 +1,223 @@
+"""
+Headless command line for the interpreter; it never imports the GUI (PyQt5).
+
+    python -m interpreter run script.txt [--engine vm] [--max-steps N] [--stats] [-v]
+    python -m interpreter check templates/*.txt
+    python -m interpreter ast script.txt [--optimized]
+    python -m interpreter profile script.txt [--collapsed script.folded] [--report script.prof]
+    python -m interpreter serve --port 8765 --workers 4
+
+A path of "-" (or no path at all) reads the source from stdin. Each command
+only imports the passes it needs, so the interpreter starts quickly in batch
+jobs. The exit status is 0 on success, 1 if any file failed and 2 for bad usage.
+"""
+import argparse
+import sys
+from interpreter.evaluator.output_sink import PHASE, OutputSink, StdoutSink
+
+class CommandLineSink(OutputSink):
+    """
+    Sends the script's output to stdout and the phase messages to stderr (with
+    -v) or nowhere, so stdout can be piped into another program.
+    """
+
+    def __init__(self, verbose=False):
+        self.program = StdoutSink(sys.stdout)
+        self.phases = StdoutSink(sys.stderr) if verbose else None
+
+    def write_line(self, text, position=None, kind=None):
+        if kind != PHASE:
+            self.program.write_line(text, position, kind)
+        elif self.phases is not None:
+            self.phases.write_line(text, position, kind)
+
+    def flush(self):
+        self.program.flush()
+        if self.phases is not None:
+            self.phases.flush()
+
+def _read_sources(paths):
+    """
+    (name, code) for every path; "-" is stdin.
+    """
+    for path in paths or ["-"]:
+        if path == "-":
+            yield "<stdin>", sys.stdin.read()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield path, f.read()
+
+def _report(name, code, error):
+    position = getattr(error, "position", None)
+    location = ""
+    if position is not None and code is not None:
+        from interpreter.lexical_analyzer.line_index import LineIndex
+        line, column = LineIndex(code).line_column(position)
+        location = f":{line}:{column}"
+    print(f"{name}{location}: {error}", file=sys.stderr)
+
+def _analyze(code):
+    from interpreter.lexical_analyzer.lexer import Lexer
+    from interpreter.syntax_analyzer.parser import Parser, nesting_headroom
+    from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+    from interpreter.semantic_analyzer.type_inference import TypeInference
+
+    abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+    with nesting_headroom():
+        IterativeSemanticAnalyzer().analyze(abstract_syntax_tree)
+        TypeInference().infer(abstract_syntax_tree)
+    return abstract_syntax_tree
+
+def run(args):
+    from interpreter.run_interpretation_process import ARTIFACT_CACHE, ENGINES, run_interpretation_process
+
+    if args.engine not in ENGINES:
+        print(f"error: unknown engine '{args.engine}', expected one of: {', '.join(ENGINES)}", file=sys.stderr)
+        return 2
+    limited = args.max_steps is not None or args.timeout is not None or args.max_memory is not None
+    output = CommandLineSink(args.verbose)
+    failed = 0
+    for name, code in _read_sources(args.paths):
+        # Every file gets its own step budget, deadline and memory baseline.
+        limits = None
+        if limited:
+            from interpreter.evaluator.execution_limits import ExecutionLimits
+            limits = ExecutionLimits(args.max_steps, args.timeout, args.max_memory)
+        stats = None
+        if args.stats:
+            from interpreter.instrumentation import PipelineStats
+            stats = PipelineStats()
+        try:
+            run_interpretation_process(code, args.engine, args.memo_size,
+                                       None if args.no_cache else ARTIFACT_CACHE, limits, output, stats)
+        except Exception as e:
+            output.flush()
+            _report(name, code, e)
+            failed += 1
+        if stats is not None:
+            output.flush()
+            print(f"{name}:", *stats.format_table(), sep="\n", file=sys.stderr)
+    output.close()
+    return 1 if failed else 0
+
+def check(args):
+    failed = 0
+    for name, code in _read_sources(args.paths):
+        try:
+            _analyze(code)
+        except Exception as e:
+            _report(name, code, e)
+            failed += 1
+        else:
+            if args.verbose:
+                print(f"{name}: OK")
+    return 1 if failed else 0
+
+def dump_ast(args):
+    import json
+    from interpreter.syntax_analyzer.parser import nesting_headroom
+
+    failed = 0
+    for name, code in _read_sources(args.paths):
+        try:
+            if args.optimized:
+                from interpreter.optimizer.optimizer import Optimizer
+                abstract_syntax_tree = _analyze(code)
+                with nesting_headroom():
+                    abstract_syntax_tree = Optimizer().optimize(abstract_syntax_tree)
+            else:
+                from interpreter.lexical_analyzer.lexer import Lexer
+                from interpreter.syntax_analyzer.parser import Parser
+                abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+        except Exception as e:
+            _report(name, code, e)
+            failed += 1
+            continue
+        with nesting_headroom():
+            json.dump([node.to_dict() for node in abstract_syntax_tree], sys.stdout, indent=args.indent)
+        sys.stdout.write("\n")
+    return 1 if failed else 0
+
+def profile(args):
+    from interpreter.profiler import ScriptProfiler
+    from interpreter.run_interpretation_process import run_interpretation_process
+
+    (name, code), = _read_sources([args.path])
+    profiler = ScriptProfiler(code)
+    output = CommandLineSink(args.verbose)
+    failed = 0
+    try:
+        run_interpretation_process(code, "tree", args.memo_size, None, None, output, profiler=profiler)
+    except Exception as e:
+        # The profile of the part that ran is still written.
+        output.flush()
+        _report(name, code, e)
+        failed = 1
+    output.close()
+    if args.collapsed:
+        profiler.write_collapsed(args.collapsed, args.weight)
+    report = "\n".join(profiler.annotated_source()) + "\n"
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        sys.stderr.write(report)
+    return failed
+
+def serve(args):
+    from interpreter.service import main as service_main
+    return service_main(args.options)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m interpreter", description="Run, check or dump scripts headless")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="analyze and execute scripts")
+    run_parser.add_argument("paths", nargs="*", help="source files ('-' or none: stdin)")
+    run_parser.add_argument("-e", "--engine", default="tree", help="tree, stack, vm or python")
+    run_parser.add_argument("--memo-size", type=int, default=0, help="memoized results per pure function")
+    run_parser.add_argument("--max-steps", type=int, default=None, help="loop tests and calls allowed")
+    run_parser.add_argument("--timeout", type=float, default=None, help="wall-clock seconds allowed")
+    run_parser.add_argument("--max-memory", type=int, default=None, help="bytes the process may grow by")
+    run_parser.add_argument("--no-cache", action="store_true", help="do not use the on-disk artifact cache")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="print the phase messages to stderr")
+    run_parser.add_argument("--stats", action="store_true", help="print phase and node timings to stderr")
+    run_parser.set_defaults(handler=run)
+
+    check_parser = commands.add_parser("check", help="lex, parse and analyze scripts without running them")
+    check_parser.add_argument("paths", nargs="*", help="source files ('-' or none: stdin)")
+    check_parser.add_argument("-v", "--verbose", action="store_true", help="also list the files that passed")
+    check_parser.set_defaults(handler=check)
+
+    ast_parser = commands.add_parser("ast", help="print the AST of scripts as JSON")
+    ast_parser.add_argument("paths", nargs="*", help="source files ('-' or none: stdin)")
+    ast_parser.add_argument("--optimized", action="store_true", help="analyze and optimize the tree first")
+    ast_parser.add_argument("--indent", type=int, default=2, help="JSON indentation")
+    ast_parser.set_defaults(handler=dump_ast)
+
+    profile_parser = commands.add_parser("profile", help="run a script and time its own lines, functions and loops")
+    profile_parser.add_argument("path", nargs="?", default="-", help="source file ('-' or none: stdin)")
+    profile_parser.add_argument("--collapsed", help="write collapsed stacks (flamegraph.pl input) to this file")
+    profile_parser.add_argument("--weight", choices=("time", "hits"), default="time",
+                                help="value of each collapsed stack: microseconds or executions")
+    profile_parser.add_argument("--report", help="write the annotated source here instead of to stderr")
+    profile_parser.add_argument("--memo-size", type=int, default=0, help="memoized results per pure function")
+    profile_parser.add_argument("-v", "--verbose", action="store_true", help="print the phase messages to stderr")
+    profile_parser.set_defaults(handler=profile)
+
+    # Everything after "serve" (-h included) is left to interpreter.service's own parser.
+    serve_parser = commands.add_parser("serve", add_help=False, help="start the JSON interpretation service")
+    serve_parser.set_defaults(handler=serve)
+
+    args, options = parser.parse_known_args(argv)
+    if options and args.command != "serve":
+        parser.error(f"unrecognized arguments: {' '.join(options)}")
+    args.options = options
+    try:
+        return args.handler(args)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Persistent cache of analyzed programs.
+
+run_interpretation_process() stores, for every source it has lexed, parsed,
+analyzed and optimized, the resulting trees in a directory on disk, so running
+an unchanged source again (in this process or a later one) skips those phases.
+"""
+import hashlib
+import os
+import pickle
+import struct
+import zlib
+from stat import S_ISDIR, S_IWGRP, S_IWOTH
+
+MAGIC = b"PLAC"
+FORMAT_VERSION = 1
+# Magic, format version, interpreter version digest, source digest, payload digest.
+HEADER = struct.Struct("<4sH32s32s32s")
+
+DEFAULT_DIRECTORY = os.environ.get(
+    "PROGRAMMING_LANGUAGE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "programming_language"))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_interpreter_version = None
+
+def private_directory_problem(directory):
+    """
+    Creates directory (accessible to its owner only) if it is missing. Returns why
+    it cannot hold trusted files, or "" if it is a directory owned by the current
+    user that neither its group nor others can write.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.stat(directory)
+    except OSError as e:
+        return f"{directory} is not accessible: {e.strerror}"
+    if not S_ISDIR(status.st_mode):
+        return f"{directory} is not a directory"
+    # Windows has no owner ids or group/other modes; its profile directories are private already.
+    if hasattr(os, "getuid"):
+        if status.st_uid != os.getuid():
+            return f"{directory} is owned by another user"
+        if status.st_mode & (S_IWGRP | S_IWOTH):
+            return f"{directory} is writable by other users"
+    return ""
+
+def interpreter_version():
+    """
+    SHA-256 over the interpreter's own source files, so that entries written by
+    a different version of any pass (whose trees may differ) are stale.
+    """
+    global _interpreter_version
+    if _interpreter_version is None:
+        root = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        paths = []
+        for directory, _, filenames in os.walk(root):
+            paths.extend(os.path.join(directory, filename) for filename in filenames if filename.endswith(".py"))
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, root).encode("utf-8") + b"\0")
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _interpreter_version = digest.digest()
+    return _interpreter_version
+
+class ArtifactCache:
+    """
+    Directory of compiled artifacts, one file per source. Files are named by the
+    SHA-256 of the source and hold a fixed header (with the interpreter version
+    and the payload's digest) followed by the zlib-compressed pickle of the
+    artifact. Entries written by another interpreter version (stale) or whose
+    digest or unpickling fails (corrupt) are deleted and count as misses, so the
+    next put() replaces them. The total size is kept under max_bytes by evicting
+    the least recently used files (a hit refreshes the file's mtime).
+    Any OSError disables nothing but the operation that failed, so an unwritable
+    directory only costs the cache's benefit. Since unpickling an entry can run
+    arbitrary code, a directory that is not owned by the current user, or that
+    its group or others can write, disables the whole cache (see refused).
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.corrupt = 0
+        self.writes = 0
+        self.evictions = 0
+        # None until the directory is checked, then why it was refused ("" if it was not).
+        self.refused = None
+
+    def usable(self):
+        """
+        Whether the directory (created on first use) is private enough to load entries from.
+        """
+        if self.refused is None:
+            self.refused = private_directory_problem(self.directory)
+        return not self.refused
+
+    def _key(self, code):
+        source = hashlib.sha256(code.encode("utf-8")).digest()
+        return source, os.path.join(self.directory, source.hex() + ".bin")
+
+    def get(self, code):
+        """
+        The artifact stored for code, or None.
+        """
+        if not self.usable():
+            self.misses += 1
+            return None
+        source, path = self._key(code)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        artifact = self._load(data, source, path)
+        if artifact is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return artifact
+
+    def _load(self, data, source, path):
+        if len(data) < HEADER.size:
+            return self._discard(path, corrupt=True)
+        magic, version, interpreter, stored_source, digest = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            return self._discard(path, corrupt=True)
+        if version != FORMAT_VERSION or interpreter != interpreter_version() or stored_source != source:
+            return self._discard(path, corrupt=False)
+        payload = data[HEADER.size:]
+        if hashlib.sha256(payload).digest() != digest:
+            return self._discard(path, corrupt=True)
+        try:
+            return pickle.loads(zlib.decompress(payload))
+        except Exception:
+            return self._discard(path, corrupt=True)
+
+    def _discard(self, path, corrupt):
+        if corrupt:
+            self.corrupt += 1
+        else:
+            self.stale += 1
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    def put(self, code, artifact):
+        """
+        Stores the artifact for code. Returns False if it could not be stored
+        (e.g. a tree too deep to pickle, or an unwritable directory).
+        """
+        if not self.usable():
+            return False
+        source, path = self._key(code)
+        try:
+            payload = zlib.compress(pickle.dumps(artifact, protocol=pickle.HIGHEST_PROTOCOL))
+        except (RecursionError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, interpreter_version(), source, hashlib.sha256(payload).digest())
+        # Only writes need tempfile, which is slow to import for a read-only (warm) run.
+        import tempfile
+        try:
+            # Written under a temporary name and renamed, so readers never see half a file.
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return False
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return False
+        self.writes += 1
+        self._evict()
+        return True
+
+    def _evict(self):
+        try:
+            entries = []
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.name.endswith(".bin"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        if not self.usable():
+            return
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.name.endswith((".bin", ".tmp")):
+                        os.remove(entry.path)
+        except OSError:
+            pass
+
+    def size(self):
+        """
+        Total bytes of the cached entries.
+        """
+        try:
+            with os.scandir(self.directory) as iterator:
+                return sum(entry.stat().st_size for entry in iterator if entry.name.endswith(".bin"))
+        except OSError:
+            return 0
+
+    def statistics(self):
+        if self.refused:
+            return f"disabled, {self.refused}"
+        return (f"{self.hits} hits, {self.misses} misses ({self.stale} stale, {self.corrupt} corrupt), "
+                f"{self.writes} writes, {self.evictions} evictions")
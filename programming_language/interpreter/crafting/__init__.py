@@ -0,0 +1 @@
+__all__ = ["batch_simulator", "crafting_error", "crafting_planner", "dependency_graph", "recipe_registry"]
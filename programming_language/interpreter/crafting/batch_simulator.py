@@ -0,0 +1,172 @@
+try:
+    import numpy as np
+except ImportError:
+    # numpy is an optional dependency, only the batch simulator needs it.
+    raise ImportError("The batch simulator needs numpy: pip install -r requirements-batch.txt") from None
+
+from .crafting_error import CraftingError
+from .dependency_graph import recipe_ingredients, recipe_yield
+
+class RecipeMatrix:
+    """
+    Recipes compiled into dense arrays over a fixed list of materials:
+    requirements[r, m] is how many items of material m one craft of recipe r
+    consumes, and one craft adds yields[r] items of material outputs[r].
+    Inventories are (N, len(materials)) integer arrays with the same columns;
+    the simulator reads and writes them column by column, so Fortran (column
+    major) order is fastest for large N.
+    Duplicate recipe names are recorded in conflicts; the first definition wins.
+    """
+
+    def __init__(self, recipes, materials=None):
+        compiled = []
+        self.conflicts = []
+        self.recipe_index = {}
+        for recipe in recipes:
+            if recipe.name in self.recipe_index:
+                self.conflicts.append(f"Duplicate recipe '{recipe.name}'; the first definition is kept")
+                continue
+            ingredients = recipe_ingredients(recipe)
+            if not ingredients:
+                raise CraftingError(f"Recipe '{recipe.name}' has no input")
+            self.recipe_index[recipe.name] = len(compiled)
+            compiled.append((recipe, ingredients, recipe_yield(recipe)))
+        self.recipes = [recipe.name for recipe, _, _ in compiled]
+
+        # Columns: the given materials first, then every material the recipes use or produce.
+        self.material_index = {}
+        for material in materials or ():
+            self.material_index.setdefault(material, len(self.material_index))
+        for recipe, ingredients, _ in compiled:
+            for material, _ in ingredients:
+                self.material_index.setdefault(material, len(self.material_index))
+            self.material_index.setdefault(recipe.output, len(self.material_index))
+        self.materials = list(self.material_index)
+
+        self.requirements = np.zeros((len(compiled), len(self.materials)), dtype=np.int64)
+        self.outputs = np.zeros(len(compiled), dtype=np.intp)
+        self.yields = np.zeros(len(compiled), dtype=np.int64)
+        # Columns each recipe consumes, so that only those are read per recipe.
+        self.columns = []
+        for row, (recipe, ingredients, batch) in enumerate(compiled):
+            for material, amount in ingredients:
+                self.requirements[row, self.material_index[material]] = amount
+            self.outputs[row] = self.material_index[recipe.output]
+            self.yields[row] = batch
+            self.columns.append(np.flatnonzero(self.requirements[row]))
+
+    @classmethod
+    def from_nodes(cls, nodes, materials=None):
+        return cls([node for node in nodes if node.node_type == "recipe"], materials)
+
+    def recipe(self, recipe):
+        """
+        Row of a recipe given by name or row number.
+        """
+        if isinstance(recipe, str):
+            row = self.recipe_index.get(recipe)
+            if row is None:
+                raise CraftingError(f"Unknown recipe: {recipe}")
+            return row
+        if not 0 <= recipe < len(self.recipes):
+            raise CraftingError(f"Recipe row {recipe} out of range")
+        return recipe
+
+    def to_array(self, inventories):
+        """
+        (N, materials) array from a sequence of {material: count} dicts. Materials
+        without a column are an error, since crafting could never see them.
+        """
+        array = np.zeros((len(inventories), len(self.materials)), dtype=np.int64, order="F")
+        for row, inventory in enumerate(inventories):
+            for material, count in inventory.items():
+                column = self.material_index.get(material)
+                if column is None:
+                    raise CraftingError(f"Unknown material '{material}' in inventory {row}")
+                array[row, column] = count
+        return array
+
+    def to_dict(self, row):
+        """
+        {material: count} of one inventory row, without empty materials.
+        """
+        return {material: int(count) for material, count in zip(self.materials, row) if count}
+
+class BatchSimulator:
+    """
+    Simulates crafting on many inventories at once. Every operation is vectorized
+    over the N inventories and loops only over recipes, so its cost is
+    O(N * inputs of the recipes involved) in NumPy rather than in Python.
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    @classmethod
+    def from_nodes(cls, nodes, materials=None):
+        return cls(RecipeMatrix.from_nodes(nodes, materials))
+
+    def max_crafts(self, inventories, recipe=None):
+        """
+        How many times each inventory can craft recipe, as an (N,) array; with
+        recipe=None, an (N, recipes) array with the count for every recipe.
+        """
+        matrix = self.matrix
+        if recipe is not None:
+            return self._max_crafts(inventories, matrix.recipe(recipe))
+        counts = np.empty((inventories.shape[0], len(matrix.recipes)), dtype=np.int64, order="F")
+        for row in range(len(matrix.recipes)):
+            counts[:, row] = self._max_crafts(inventories, row)
+        return counts
+
+    def _max_crafts(self, inventories, row):
+        # One column at a time: no (N, inputs) temporary, and contiguous reads in Fortran order.
+        requirements = self.matrix.requirements[row]
+        columns = self.matrix.columns[row]
+        counts = inventories[:, columns[0]] // requirements[columns[0]]
+        for column in columns[1:]:
+            np.minimum(counts, inventories[:, column] // requirements[column], out=counts)
+        return counts
+
+    def craft(self, inventories, recipe, count, in_place=False):
+        """
+        Inventories after crafting recipe count times, where count is a number or
+        an (N,) array with one count per inventory. The input is copied unless
+        in_place is True. Raises CraftingError if any inventory lacks the materials.
+        """
+        matrix = self.matrix
+        row = matrix.recipe(recipe)
+        count = np.broadcast_to(np.asarray(count, dtype=np.int64), (inventories.shape[0],))
+        if (count < 0).any():
+            raise CraftingError("Craft counts must not be negative")
+        short = count > self._max_crafts(inventories, row)
+        if short.any():
+            raise CraftingError(f"{int(short.sum())} inventories lack the materials to craft "
+                                f"'{matrix.recipes[row]}' (first: {int(np.flatnonzero(short)[0])})")
+        result = inventories if in_place else inventories.copy()
+        # Only the consumed columns and the output column change.
+        requirements = matrix.requirements[row]
+        for column in matrix.columns[row]:
+            result[:, column] -= count * requirements[column]
+        result[:, matrix.outputs[row]] += count * matrix.yields[row]
+        return result
+
+# ------------------ Reference implementation ------------------
+
+def reference_max_crafts(recipe, inventory):
+    """
+    How many times a {material: count} inventory can craft a recipe node.
+    """
+    return min(inventory.get(material, 0) // amount for material, amount in recipe_ingredients(recipe))
+
+def reference_craft(recipe, inventory, count):
+    """
+    New {material: count} inventory after crafting a recipe node count times.
+    """
+    if count > reference_max_crafts(recipe, inventory):
+        raise CraftingError(f"Inventory lacks the materials to craft '{recipe.name}'")
+    result = dict(inventory)
+    for material, amount in recipe_ingredients(recipe):
+        result[material] = result.get(material, 0) - count * amount
+    result[recipe.output] = result.get(recipe.output, 0) + count * recipe_yield(recipe)
+    return {material: amount for material, amount in result.items() if amount}
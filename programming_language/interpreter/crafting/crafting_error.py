@@ -0,0 +1,3 @@
+class CraftingError(Exception):
+    def __init__(self, message):
+        super().__init__(f"Crafting Error: {message}")
@@ -0,0 +1,131 @@
+from .crafting_error import CraftingError
+from .dependency_graph import RecipeGraph
+
+class CraftingPlan:
+    """
+    Result of CraftingPlanner.plan(): raw materials to gather, how many times each
+    recipe is crafted (steps, ingredients before the outputs that use them) and
+    the items left over because recipes craft in batches of their quantity.
+    """
+
+    __slots__ = ("targets", "raw_materials", "steps", "leftovers")
+
+    def __init__(self, targets, raw_materials, steps, leftovers):
+        self.targets = targets
+        self.raw_materials = raw_materials
+        self.steps = steps
+        self.leftovers = leftovers
+
+    @property
+    def crafts(self):
+        """
+        Total number of crafts.
+        """
+        return sum(count for _, count in self.steps)
+
+    def to_dict(self):
+        return {
+            "targets": dict(self.targets),
+            "raw_materials": dict(self.raw_materials),
+            "steps": [{"recipe": name, "crafts": count} for name, count in self.steps],
+            "leftovers": dict(self.leftovers),
+        }
+
+    def __repr__(self):
+        return (f"CraftingPlan(targets={self.targets}, raw_materials={self.raw_materials}, "
+                f"steps={self.steps}, leftovers={self.leftovers})")
+
+class CraftingPlanner:
+    """
+    Expands target outputs into raw materials and craft steps over a RecipeGraph.
+
+    Demand is pushed from each output to its ingredients in reverse topological
+    order, so an intermediate needed by several branches is crafted once for
+    their total demand and leftovers of one batch are never wasted on another.
+    The outputs each target needs (its closure, already in that order) are
+    memoized, so after the first plan for a target the next ones only do the
+    arithmetic. Several targets are walked together, so a plan never visits an
+    output twice and planning a whole pack is linear in the size of the graph
+    (plus sorting the outputs by rank).
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        # Target -> tuple of the craftable outputs it needs, users before ingredients.
+        self.closures = {}
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        return cls(RecipeGraph.from_nodes(nodes))
+
+    def closure(self, target):
+        """
+        Craftable outputs needed for target, users before ingredients (memoized).
+        """
+        closure = self.closures.get(target)
+        if closure is None:
+            closure = self.closures[target] = self._needed((target,))
+        return closure
+
+    def _needed(self, targets):
+        graph = self.graph
+        ingredients = graph.ingredients
+        needed = []
+        visited = set()
+        for target in targets:
+            if target in graph.cyclic:
+                cycle = graph.cycle_through(target)
+                raise CraftingError(f"Cannot plan '{target}': recipe cycle {' -> '.join(cycle)}")
+            if target in ingredients and target not in visited:
+                visited.add(target)
+                work = [target]
+                while work:
+                    output = work.pop()
+                    needed.append(output)
+                    for material, _ in ingredients[output]:
+                        if material in ingredients and material not in visited:
+                            visited.add(material)
+                            work.append(material)
+        needed.sort(key=graph.rank.__getitem__, reverse=True)
+        return tuple(needed)
+
+    def plan(self, target, quantity=1):
+        """
+        Plan for quantity items of target.
+        """
+        return self.plan_many({target: quantity})
+
+    def plan_many(self, targets):
+        """
+        Plan for several targets at once, given as {output: quantity} or as
+        (output, quantity) pairs; intermediates are shared between all of them.
+        """
+        targets = dict(targets)
+        demand = {}
+        for target, quantity in targets.items():
+            if not isinstance(quantity, int) or quantity < 0:
+                raise CraftingError(f"Quantity of '{target}' must be a non-negative whole number, got {quantity!r}")
+            demand[target] = demand.get(target, 0) + quantity
+
+        graph = self.graph
+        # Closures are memoized per target; several targets share one walk instead.
+        outputs = self.closure(next(iter(targets))) if len(targets) == 1 else self._needed(targets)
+
+        ingredients, yields, producers = graph.ingredients, graph.yields, graph.producers
+        steps = []
+        leftovers = {}
+        for output in outputs:
+            amount = demand.pop(output, 0)
+            if not amount:
+                continue
+            batch = yields[output]
+            count = -(-amount // batch)
+            steps.append((producers[output].name, count))
+            if count * batch > amount:
+                leftovers[output] = count * batch - amount
+            for material, per_craft in ingredients[output]:
+                demand[material] = demand.get(material, 0) + count * per_craft
+        # What is left in demand cannot be crafted.
+        raw_materials = {material: amount for material, amount in demand.items() if amount}
+        steps.reverse()
+        return CraftingPlan(targets, raw_materials, steps, leftovers)
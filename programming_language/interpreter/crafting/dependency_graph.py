@@ -0,0 +1,173 @@
+from .crafting_error import CraftingError
+
+def _amount(value, description):
+    try:
+        amount = int(value)
+    except (TypeError, ValueError):
+        raise CraftingError(f"{description} must be a whole number, got '{value}'") from None
+    if amount <= 0:
+        raise CraftingError(f"{description} must be positive, got {amount}")
+    return amount
+
+def recipe_ingredients(recipe):
+    """
+    ((material, amount per craft), ...) of a recipe node, one entry per material in
+    first-use order.
+    """
+    amounts = {}
+    for item in recipe.input:
+        amount = _amount(item.quantity, f"Quantity of '{item.material}' in recipe '{recipe.name}'")
+        amounts[item.material] = amounts.get(item.material, 0) + amount
+    return tuple(amounts.items())
+
+def recipe_yield(recipe):
+    """
+    Items produced by one craft of a recipe node.
+    """
+    return _amount(recipe.quantity, f"Quantity of recipe '{recipe.name}'")
+
+class RecipeGraph:
+    """
+    Dependency graph of the recipes defined by "recipe" nodes. Each output is a node
+    whose edges go to the materials of its input, with the amount of each material
+    used by one craft; materials that no recipe produces are raw. When several
+    recipes produce the same output the first one is used and the others are
+    recorded in conflicts, as in RecipeRegistry.
+
+    Cycles and the topological order are computed once with Kahn's algorithm, so
+    building the graph is linear in the number of input items and never recurses.
+    """
+
+    def __init__(self):
+        # Output -> recipe node that produces it.
+        self.producers = {}
+        # Output -> ((material, amount per craft), ...), materials in first-use order.
+        self.ingredients = {}
+        # Output -> items produced by one craft (the recipe quantity).
+        self.yields = {}
+        self.conflicts = []
+        # Craftable outputs, every output after the outputs its input needs.
+        self.order = []
+        # Position of each output in order.
+        self.rank = {}
+        # Each cycle as [a, b, ..., a], where a needs b needs ... needs a.
+        self.cycles = []
+        # Output on a cycle -> that cycle.
+        self.cycle_of = {}
+        # Outputs that are on a cycle or need one.
+        self.cyclic = set()
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        graph = cls()
+        for node in nodes:
+            if node.node_type == "recipe":
+                graph.add(node)
+        graph.sort()
+        return graph
+
+    def add(self, recipe):
+        """
+        Adds a recipe node. Call sort() once every recipe has been added.
+        """
+        output = recipe.output
+        if output in self.producers:
+            self.conflicts.append(f"Recipes '{self.producers[output].name}' and '{recipe.name}' both produce "
+                                  f"'{output}'; '{self.producers[output].name}' is used")
+            return
+        self.producers[output] = recipe
+        self.ingredients[output] = recipe_ingredients(recipe)
+        self.yields[output] = recipe_yield(recipe)
+
+    def sort(self):
+        """
+        Computes order, rank, cycles and cyclic from the recipes added so far.
+        """
+        producers = self.producers
+        # Number of craftable ingredients still unsorted, and the outputs that use each one.
+        pending = {}
+        users = {}
+        for output, ingredients in self.ingredients.items():
+            count = 0
+            for material, _ in ingredients:
+                if material in producers:
+                    count += 1
+                    users.setdefault(material, []).append(output)
+            pending[output] = count
+
+        order = [output for output, count in pending.items() if count == 0]
+        index = 0
+        while index < len(order):
+            for user in users.get(order[index], ()):
+                pending[user] -= 1
+                if pending[user] == 0:
+                    order.append(user)
+            index += 1
+        self.order = order
+        self.rank = {output: position for position, output in enumerate(order)}
+
+        # Whatever Kahn's algorithm could not sort is on a cycle or depends on one.
+        self.cyclic = {output for output in producers if output not in self.rank}
+        self.cycles = []
+        self.cycle_of = {}
+        reported = set()
+        for start in producers:
+            if start not in self.cyclic or start in reported:
+                continue
+            # Follow unsorted ingredients until a material repeats; from there it is a cycle.
+            path = []
+            seen = {}
+            output = start
+            while output not in seen and output not in reported:
+                seen[output] = len(path)
+                path.append(output)
+                output = next(material for material, _ in self.ingredients[output] if material in self.cyclic)
+            reported.update(path)
+            if output in seen:
+                cycle = path[seen[output]:]
+                cycle.append(cycle[0])
+                self.cycles.append(cycle)
+                for member in cycle:
+                    self.cycle_of[member] = cycle
+        return self
+
+    def is_raw(self, material):
+        return material not in self.producers
+
+    def raw_materials(self):
+        """
+        Materials used by some recipe that no recipe produces, in first-use order.
+        """
+        raw = {}
+        for ingredients in self.ingredients.values():
+            for material, _ in ingredients:
+                if material not in self.producers:
+                    raw[material] = None
+        return list(raw)
+
+    def cycle_through(self, output):
+        """
+        A cycle that output is on or depends on, or None.
+        """
+        if output not in self.cyclic:
+            return None
+        # Breadth-first search over unsorted ingredients; the first cycle reached is reported.
+        visited = {output}
+        frontier = [output]
+        while frontier:
+            next_frontier = []
+            for material in frontier:
+                if material in self.cycle_of:
+                    return self.cycle_of[material]
+                for ingredient, _ in self.ingredients[material]:
+                    if ingredient in self.cyclic and ingredient not in visited:
+                        visited.add(ingredient)
+                        next_frontier.append(ingredient)
+            frontier = next_frontier
+        return None
+
+    def __len__(self):
+        return len(self.producers)
+
+    def __contains__(self, output):
+        return output in self.producers
@@ -0,0 +1,127 @@
+def grid_cells(grid):
+    """
+    Occupied cells of a grid as (row, col, material). The grid may be a sequence of
+    rows (None or "" for an empty cell) or a {(row, col): material} dict.
+    """
+    if isinstance(grid, dict):
+        return [(int(row), int(col), material) for (row, col), material in grid.items() if material]
+    return [
+        (row, col, material)
+        for row, cells in enumerate(grid)
+        for col, material in enumerate(cells)
+        if material
+    ]
+
+def shape_key(cells, mirrored=False):
+    """
+    Canonical, hashable key of a set of (row, col, material) cells: the shape is
+    moved to the top-left corner and flattened row by row into
+    (height, width, material or None, ...). With mirrored=True the shape is
+    flipped horizontally first. Returns None for an empty shape.
+    """
+    if not cells:
+        return None
+    top = min(row for row, _, _ in cells)
+    left = min(col for _, col, _ in cells)
+    height = max(row for row, _, _ in cells) - top + 1
+    width = max(col for _, col, _ in cells) - left + 1
+    flat = [None] * (height * width)
+    for row, col, material in cells:
+        col -= left
+        if mirrored:
+            col = width - 1 - col
+        flat[(row - top) * width + col] = material
+    return (height, width, *flat)
+
+class RecipeRegistry:
+    """
+    Index of the recipes defined by "recipe" nodes. Each recipe is stored under the
+    shape_key of its input (and of its mirror image when mirroring is allowed), so
+    matching a grid costs one normalization and one dict lookup regardless of how
+    many recipes there are. Recipes are also indexed by name for "craft recipe X;".
+    Duplicate names, positions used twice, non-integer positions and shapes (or
+    mirror images) claimed by two different recipes are recorded in conflicts;
+    the first definition always wins, and a recipe that cannot have all of its
+    shapes is only indexed by name.
+    """
+
+    def __init__(self, allow_mirroring=True):
+        self.allow_mirroring = allow_mirroring
+        self.by_name = {}
+        self.by_shape = {}
+        self.conflicts = []
+
+    @classmethod
+    def from_nodes(cls, nodes, allow_mirroring=True):
+        registry = cls(allow_mirroring)
+        for node in nodes:
+            if node.node_type == "recipe":
+                registry.add(node)
+        return registry
+
+    def add(self, recipe):
+        """
+        Registers a recipe node. Returns the conflicts it caused (also appended to
+        self.conflicts).
+        """
+        conflicts = []
+        name = recipe.name
+        if name in self.by_name:
+            conflicts.append(f"Duplicate recipe '{name}'; the first definition is kept")
+            self.conflicts.extend(conflicts)
+            return conflicts
+        self.by_name[name] = recipe
+
+        cells = []
+        occupied = set()
+        for item in recipe.input:
+            try:
+                row, col = int(item.position[0]), int(item.position[1])
+            except (TypeError, ValueError):
+                # Only crafting_table recipes have their positions checked by the
+                # semantic analyzer; a shape with other positions cannot be matched.
+                conflicts.append(f"Recipe '{name}' places '{item.material}' at a non-integer position "
+                                 f"({item.position[0]}, {item.position[1]}); it can only be crafted by name")
+                self.conflicts.extend(conflicts)
+                return conflicts
+            if (row, col) in occupied:
+                conflicts.append(f"Recipe '{name}' places two items at position ({row}, {col})")
+                continue
+            occupied.add((row, col))
+            cells.append((row, col, item.material))
+
+        # The shape, then its mirror image; the recipe is stored under both or neither.
+        keys = (shape_key(cells),)
+        if self.allow_mirroring:
+            mirrored = shape_key(cells, mirrored=True)
+            if mirrored != keys[0]:
+                keys += (mirrored,)
+        for index, key in enumerate(keys):
+            existing = self.by_shape.get(key)
+            if existing is not None:
+                shape = "the same shape" if index == 0 else "mirror-image shapes"
+                conflicts.append(f"Recipes '{existing.name}' and '{name}' have {shape}; '{existing.name}' is kept")
+                break
+        else:
+            for key in keys:
+                self.by_shape[key] = recipe
+        self.conflicts.extend(conflicts)
+        return conflicts
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def match(self, grid):
+        """
+        Returns the recipe whose input matches grid (anywhere in it), or None.
+        """
+        return self.by_shape.get(shape_key(grid_cells(grid)))
+
+    def match_key(self, key):
+        return self.by_shape.get(key)
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def __contains__(self, name):
+        return name in self.by_name
@@ -1 +1,16 @@
-__all__ = ["interpreter"]
\ No newline at end of file
+__all__ = [
+    "call_frame",
+    "code_cache",
+    "compiler",
+    "execution_limits",
+    "interpreter",
+    "memo_cache",
+    "opcodes",
+    "operations",
+    "output_sink",
+    "python_backend",
+    "python_transpiler",
+    "resource_limit_error",
+    "stack_interpreter",
+    "virtual_machine"
+]
\ No newline at end of file
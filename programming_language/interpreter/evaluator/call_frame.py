@@ -0,0 +1,42 @@
+from interpreter.syntax_analyzer.ast_nodes import FunctionDefinition
+
+# Nested calls allowed before "Maximum call depth exceeded"; the same limit in every
+# engine keeps their errors identical (and the tree-walker within Python's own limit).
+MAX_CALL_DEPTH = 100
+
+class CallFrame:
+    """
+    Activation record of a function call: the function's node, its local variable
+    slots (parameters first, as in FunctionDefinition.local_names) and, for the VM,
+    where to resume the caller. memo_key is set when the result will be memoized;
+    offset is the source offset of the call, used to locate resource limit errors.
+    """
+    __slots__ = ("function", "variables", "code", "pc", "memo_key", "offset")
+
+    def __init__(self, function, variables, code=None, pc=0, memo_key=None, offset=None):
+        self.function = function
+        self.variables = variables
+        self.code = code
+        self.pc = pc
+        self.memo_key = memo_key
+        self.offset = offset
+
+class ReturnSignal(Exception):
+    """
+    Raised by a return statement in the tree-walker and caught by the call.
+    """
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+def check_call(callee, name, arguments, depth):
+    """
+    Validates a call before its frame is pushed; depth is the number of active calls.
+    """
+    if not isinstance(callee, FunctionDefinition):
+        raise Exception(f"'{name}' is not a function")
+    if len(arguments) != len(callee.params):
+        raise Exception(f"Function '{name}' expects {len(callee.params)} arguments, got {len(arguments)}")
+    if depth >= MAX_CALL_DEPTH:
+        raise Exception(f"Maximum call depth exceeded in '{name}'")
@@ -0,0 +1,35 @@
+import hashlib
+from collections import OrderedDict
+
+def source_hash(code):
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+class CompiledCodeCache:
+    """
+    In-memory LRU cache of compiled artifacts keyed by the SHA-256 of the source,
+    so running an unchanged script again skips lexing, parsing and analysis.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, code):
+        key = source_hash(code)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, code, entry):
+        key = source_hash(code)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,186 @@
+from .opcodes import (
+    LOAD_CONST, LOAD_NAME, STORE_NAME, BINARY_OP, JUMP, POP_JUMP_IF_FALSE,
+    LOG, CRAFT, RECIPE, DEFINE_FUNCTION, FAIL, COERCE, LOAD_LOCAL, STORE_LOCAL, CALL, RETURN,
+    POP_TOP, LOOP, OPCODE_NAMES
+)
+from .operations import BINARY_OPERATIONS, literal_value
+from interpreter.semantic_analyzer.scope import LOCAL
+
+class Compiler:
+    """
+    Compiles the parser's AST into a flat list of (opcode, operand) slots for the
+    VirtualMachine. Literals are converted, operators resolved to their functions
+    and loop/branch targets patched in, so nothing is looked up again at run time.
+    """
+
+    def __init__(self):
+        self.code = []
+        # (start, end, offset) of every loop's instructions, to locate resource limit errors.
+        self.loops = []
+
+    def compile(self, abstract_syntax_tree):
+        for node in abstract_syntax_tree:
+            self.compile_node(node)
+        return self.code
+
+    def compile_function(self, node):
+        """
+        Compiles a function body; the VM does this on the function's first call.
+        Local variables use their frame slots, and falling off the end returns None.
+        """
+        self._compile_block(node.body)
+        self._emit(LOAD_CONST, None)
+        self._emit(RETURN)
+        return self.code
+
+    def compile_node(self, node):
+        node_type = node.node_type
+        method_name = "compile_" + node_type
+        compiler = getattr(self, method_name, self.generic_compile)
+        compiler(node)
+
+    def generic_compile(self, node):
+        # Same error as Interpreter.generic_visit, raised when the node is reached.
+        self._emit(FAIL, "No visitor method defined for node type: " + str(node.node_type))
+
+    # ------------------ Helpers ------------------
+
+    def _emit(self, opcode, operand=None):
+        self.code.append(opcode)
+        self.code.append(operand)
+        return len(self.code) - 1
+
+    def _patch(self, operand_index, target):
+        self.code[operand_index] = target
+
+    def _compile_block(self, statements):
+        for stmt in statements:
+            self.compile_node(stmt)
+
+    # ------------------ Statements ------------------
+
+    def compile_recipe(self, node):
+        self._emit(RECIPE, node)
+
+    def compile_function_definition(self, node):
+        self._emit(DEFINE_FUNCTION, node)
+
+    def compile_assignment(self, node):
+        self.compile_node(node.expression)
+        if node.coerce is not None:
+            self._emit(COERCE, (node.coerce, node.identifier))
+        if node.scope == LOCAL:
+            self._emit(STORE_LOCAL, node.slot)
+        else:
+            self._emit(STORE_NAME, node.identifier)
+
+    def compile_conditional(self, node):
+        self.compile_node(node.condition)
+        to_else = self._emit(POP_JUMP_IF_FALSE)
+        self._compile_block(node.then_branch)
+        if node.else_branch is not None:
+            to_end = self._emit(JUMP)
+            self._patch(to_else, len(self.code))
+            self._compile_block(node.else_branch)
+            self._patch(to_end, len(self.code))
+        else:
+            self._patch(to_else, len(self.code))
+
+    def compile_while_loop(self, node):
+        # Every test of the condition is a step: the first LOOP only counts it,
+        # the one at the end of the body counts it and jumps back.
+        start = len(self.code)
+        self._emit(LOOP, start + 2)
+        loop_start = len(self.code)
+        self.compile_node(node.condition)
+        to_end = self._emit(POP_JUMP_IF_FALSE)
+        self._compile_block(node.body)
+        self._emit(LOOP, loop_start)
+        self._patch(to_end, len(self.code))
+        self.loops.append((start, len(self.code), node.offset))
+
+    def compile_for_loop(self, node):
+        start = len(self.code)
+        self.compile_node(node.init)
+        self._emit(LOOP, len(self.code) + 2)
+        loop_start = len(self.code)
+        self.compile_node(node.condition)
+        to_end = self._emit(POP_JUMP_IF_FALSE)
+        self._compile_block(node.body)
+        self.compile_node(node.post)
+        self._emit(LOOP, loop_start)
+        self._patch(to_end, len(self.code))
+        self.loops.append((start, len(self.code), node.offset))
+
+    def compile_log(self, node):
+        self.compile_node(node.expression)
+        self._emit(LOG, node.offset)
+
+    def compile_return(self, node):
+        if node.expression is not None:
+            self.compile_node(node.expression)
+        else:
+            self._emit(LOAD_CONST, None)
+        self._emit(RETURN)
+
+    def compile_expression_statement(self, node):
+        self.compile_node(node.expression)
+        self._emit(POP_TOP)
+
+    def compile_craft_command(self, node):
+        self._emit(CRAFT, (node.recipe_name, node.offset))
+
+    # ------------------ Expressions ------------------
+
+    def compile_binary_expression(self, node):
+        # Left-leaning chains are compiled along their left spine without recursing.
+        spine = []
+        while node.node_type == "binary_expression":
+            spine.append(node)
+            node = node.left
+        self.compile_node(node)
+        for node in reversed(spine):
+            self.compile_node(node.right)
+            op = node.operator
+            operation = node.fast_operation or BINARY_OPERATIONS.get(op)
+            if operation is None:
+                self._emit(FAIL, "Unsupported operator: " + op)
+            else:
+                self._emit(BINARY_OP, operation)
+
+    def compile_literal(self, node):
+        self._emit(LOAD_CONST, literal_value(node.value))
+
+    def compile_call(self, node):
+        # The callee is loaded first, like any variable, so errors come in Interpreter's order.
+        self.compile_identifier(node)
+        for argument in node.arguments:
+            self.compile_node(argument)
+        self._emit(CALL, (node.name, len(node.arguments), node.offset))
+
+    def compile_identifier(self, node):
+        if node.scope == LOCAL:
+            self._emit(LOAD_LOCAL, node.slot)
+        else:
+            self._emit(LOAD_NAME, node.name)
+
+
+def disassemble(code):
+    """
+    Returns a readable listing of compiled code, one instruction per line.
+    """
+    lines = []
+    for index in range(0, len(code), 2):
+        opcode, operand = code[index], code[index + 1]
+        if opcode == BINARY_OP:
+            operand = operand.__name__
+        elif opcode == COERCE:
+            operand = f"{operand[0].__name__} {operand[1]}"
+        elif opcode == CALL:
+            operand = f"{operand[0]} ({operand[1]} arguments)"
+        elif opcode == CRAFT:
+            operand = operand[0]
+        elif opcode in (RECIPE, DEFINE_FUNCTION):
+            operand = operand.name
+        lines.append(f"{index:6d} {OPCODE_NAMES[opcode]:<18} {'' if operand is None else repr(operand)}")
+    return "\n".join(lines)
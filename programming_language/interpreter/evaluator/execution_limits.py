@@ -0,0 +1,169 @@
+import itertools
+import os
+import sys
+import threading
+import time
+from .resource_limit_error import ExecutionCancelled, ResourceLimitError
+
+# Steps between two checks of the clock and the memory (the step limit itself is exact).
+CHECK_INTERVAL = 1024
+# Reading the resident set size costs a system call, so it is sampled at most this often (seconds).
+MEMORY_SAMPLE_INTERVAL = 0.01
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+def memory_usage():
+    """
+    Resident set size of the process in bytes, or None where it cannot be read.
+    On Linux it is the current size; elsewhere the peak size getrusage() reports.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class _ActiveLimits(threading.local):
+    # Longest string '+' may build on this thread, lowered while an engine runs with max_memory.
+    max_string_length = sys.maxsize
+
+_active = _ActiveLimits()
+
+def check_string_length(length):
+    """
+    Called by the string operations before they build a string of that length:
+    a loop like "s = s + s;" doubles its memory on every step, faster than the
+    periodic checks could see it.
+    """
+    if length > _active.max_string_length:
+        raise ResourceLimitError(
+            f"memory limit of {_active.max_string_length} bytes exceeded by a string of {length} characters")
+
+class ExecutionLimits:
+    """
+    Resource limits of a script execution, accepted by every engine. None disables a limit.
+      - max_steps: steps the script may take. A step is one evaluation of a loop
+        condition or one function call, the only ways a program runs longer than
+        its own size. The limit is exact, and the same step fails on every engine.
+      - timeout: wall-clock seconds, counted from the first run.
+      - max_memory: bytes the process may grow by while the script runs (resident
+        set size above its level at the start), also the longest string '+' may build.
+      - cancellable: cancel(), from any thread, makes the next check raise
+        ExecutionCancelled; the checks then run even without any other limit.
+
+    Engines take one item from ticks() per step, or count steps down from what
+    grant() returns; grant() itself, which reads the clock and the memory, only
+    runs every check_interval steps. One object can span several runs of an
+    engine (e.g. iter_interpretation_process()), but not several engines.
+    """
+
+    def __init__(self, max_steps=None, timeout=None, max_memory=None, check_interval=CHECK_INTERVAL,
+                 cancellable=False):
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.check_interval = check_interval
+        self.cancellable = cancellable
+        # Set by cancel(); only read by the thread running the engine.
+        self.cancelled = False
+        # Steps handed out by grant() so far.
+        self.granted = 0
+        self.started = False
+        self.deadline = None
+        self.memory_baseline = None
+        self.next_memory_sample = 0.0
+        self._ticks = None
+        self._saved_string_lengths = []
+
+    @property
+    def unlimited(self):
+        return self.max_steps is None and self.timeout is None and self.max_memory is None and not self.cancellable
+
+    def cancel(self):
+        """
+        Makes the engine stop at its next check of the limits (at most
+        check_interval steps later) with ExecutionCancelled. Needs cancellable=True.
+        """
+        if not self.cancellable:
+            raise ValueError("These limits were not created with cancellable=True")
+        self.cancelled = True
+
+    def start(self):
+        """
+        Starts the clock and takes the memory baseline; later calls do nothing.
+        """
+        if self.started:
+            return
+        self.started = True
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        if self.max_memory is not None:
+            self.memory_baseline = memory_usage()
+
+    def __enter__(self):
+        # Engines run inside "with limits:", which bounds the strings built on their thread.
+        if self.cancelled:
+            raise ExecutionCancelled("stopped on request before the script started")
+        self.start()
+        self._saved_string_lengths.append(_active.max_string_length)
+        if self.max_memory is not None:
+            _active.max_string_length = min(_active.max_string_length, self.max_memory)
+        return self
+
+    def __exit__(self, *exc_info):
+        _active.max_string_length = self._saved_string_lengths.pop()
+        return False
+
+    def ticks(self):
+        """
+        Iterator that yields once per step and checks the limits between blocks
+        of steps. It is implemented in C, so a loop written as "for _ in ticks:"
+        costs almost nothing more than a while loop.
+        """
+        if self._ticks is None:
+            if self.unlimited:
+                self._ticks = itertools.repeat(None)
+            else:
+                self._ticks = itertools.chain.from_iterable(map(self._block, itertools.repeat(None)))
+        return self._ticks
+
+    def _block(self, _):
+        return itertools.repeat(None, self.grant())
+
+    def grant(self):
+        """
+        Checks the limits and returns how many steps may be taken before the next
+        call. Raises ResourceLimitError, without position, if a limit is exceeded.
+        """
+        if self.unlimited:
+            return sys.maxsize
+        if self.cancelled:
+            raise ExecutionCancelled("stopped on request")
+        self.start()
+        granted = self.granted
+        if self.max_steps is not None and granted >= self.max_steps:
+            raise ResourceLimitError(f"step limit of {self.max_steps} steps exceeded")
+        if self.deadline is not None or self.memory_baseline is not None:
+            now = time.monotonic()
+            if self.deadline is not None and now > self.deadline:
+                raise ResourceLimitError(f"time limit of {self.timeout} s exceeded")
+            if self.memory_baseline is not None and now >= self.next_memory_sample:
+                self.next_memory_sample = now + MEMORY_SAMPLE_INTERVAL
+                used = memory_usage() - self.memory_baseline
+                if used > self.max_memory:
+                    raise ResourceLimitError(f"memory limit of {self.max_memory} bytes exceeded ({used} bytes used)")
+        block = self.check_interval
+        if self.max_steps is not None:
+            block = min(block, self.max_steps - granted)
+        self.granted = granted + block
+        return block
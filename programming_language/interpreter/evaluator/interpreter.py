@@ -1,26 +1,78 @@
+import sys
+from .operations import BINARY_OPERATIONS, literal_value, register_recipe, craft_recipe
+from .call_frame import MAX_CALL_DEPTH, ReturnSignal, check_call
+from .memo_cache import MemoCache, memo_key
+from .execution_limits import ExecutionLimits
+from .output_sink import LOG, StdoutSink
+from .resource_limit_error import ResourceLimitError
+from interpreter.semantic_analyzer.scope import Scope, GLOBAL, LOCAL, UNDEFINED
+from interpreter.crafting.recipe_registry import RecipeRegistry
+
+# Python frames a single language call may use in the tree-walker (visit, visit_call,
+# the statement and expression visitors in between); run() raises Python's recursion
+# limit so MAX_CALL_DEPTH nested calls fit.
+FRAMES_PER_CALL = 30
+
 class Interpreter:
-    def __init__(self):
-        # Global environment to store variables, functions, recipes, etc.
-        self.global_env = {}
+    def __init__(self, global_scope=None, memo_size=0, limits=None, output=None):
+        # Variables live in list frames indexed by the (scope, slot) annotations that
+        # SemanticAnalyzer puts on the AST; global_scope maps slots back to names.
+        self.global_scope = global_scope if global_scope is not None else Scope()
+        self.global_frame = []
+        self.frames = [self.global_frame, None]
+        self.depth = 0
+        # Results of pure functions, by id(function); memo_size=0 disables memoization.
+        self.memo_size = memo_size
+        self.memo_caches = {}
+        # Recipes defined so far, used to resolve craft commands.
+        self.recipes = RecipeRegistry()
+        # Step, time and memory limits; loops and calls take one step each from ticks.
+        self.limits = limits if limits is not None else ExecutionLimits()
+        self.ticks = self.limits.ticks()
+        # OutputSink that receives what the script prints.
+        self.output = output if output is not None else StdoutSink()
+        # Raised by instrumentation, which puts a frame of its own around every visit.
+        self.frames_per_call = FRAMES_PER_CALL
+
+    @property
+    def global_env(self):
+        """
+        Global environment (variables, functions, recipes, etc.) as a name -> value dict.
+        """
+        frame = self.global_frame
+        return {
+            name: frame[slot]
+            for slot, name in enumerate(self.global_scope.names)
+            if slot < len(frame) and frame[slot] is not UNDEFINED
+        }
 
     def run(self, abstract_syntax_tree):
         """
-        Execute the Abstract Syntax Tree (AST), which is assumed to be a list of AST nodes.
+        Execute the Abstract Syntax Tree (AST), which is assumed to be a list of AST nodes
+        already resolved by SemanticAnalyzer.
         """
-        for node in abstract_syntax_tree:
-            self.visit(node)
+        self._grow_frame(self.global_frame, len(self.global_scope))
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, recursion_limit + MAX_CALL_DEPTH * self.frames_per_call))
+        try:
+            with self.limits:
+                for node in abstract_syntax_tree:
+                    self.visit(node)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+            self.output.flush()
 
     def visit(self, node):
         """
         Dispatch the node to the appropriate visitor method based on its 'node_type'.
         """
-        node_type = node.get("node_type")
+        node_type = node.node_type
         method_name = "visit_" + node_type
         visitor = getattr(self, method_name, self.generic_visit)
         return visitor(node)
 
     def generic_visit(self, node):
-        raise Exception("No visitor method defined for node type: " + str(node.get("node_type")))
+        raise Exception("No visitor method defined for node type: " + str(node.node_type))
 
     # ------------------ Visitor Methods for AST Nodes ------------------
 
@@ -29,18 +81,12 @@ class Interpreter:
         Processes a recipe node.
         Expected node structure:
           - "name": recipe name.
-          - "input": list of items (each item is a dict with "position", "quantity", "material").
+          - "input": list of Item nodes (with "position", "quantity", "material").
           - "output": name of the resulting item.
           - "tool_required": required tool.
           - "quantity": output quantity.
         """
-        print(f"Processing recipe: {node['name']}")
-        print("Input materials:")
-        for item in node["input"]:
-            print(f"  Place {item['quantity']} of {item['material']} at position {item['position']}")
-        print(f"Output: {node['output']}")
-        print(f"Required tool: {node['tool_required']}")
-        print(f"Quantity: {node['quantity']}")
+        register_recipe(self.recipes, node, self.output)
         return None
 
     def visit_function_definition(self, node):
@@ -52,8 +98,8 @@ class Interpreter:
           - "body": list of AST nodes representing the function body.
         """
         # Store the function definition in the global environment.
-        self.global_env[node["name"]] = node
-        print(f"Defined function: {node['name']}")
+        self._store(GLOBAL, node.slot, node)
+        self.output.write_line(f"Defined function: {node.name}", node.offset)
         return None
 
     def visit_assignment(self, node):
@@ -62,9 +108,12 @@ class Interpreter:
         Expected node structure:
           - "identifier": variable name.
           - "expression": AST node representing the expression.
+          - "coerce": (annotation) conversion for variables with a declared type.
         """
-        value = self.visit(node["expression"])
-        self.global_env[node["identifier"]] = value
+        value = self.visit(node.expression)
+        if node.coerce is not None:
+            value = node.coerce(value, node.identifier)
+        self._store(node.scope, node.slot, value)
         return value
 
     def visit_conditional(self, node):
@@ -75,12 +124,12 @@ class Interpreter:
           - "then_branch": list of AST nodes for the 'if' block.
           - "else_branch": (optional) list of AST nodes for the 'else' block.
         """
-        condition = self.visit(node["condition"])
+        condition = self.visit(node.condition)
         if condition:
-            for stmt in node["then_branch"]:
+            for stmt in node.then_branch:
                 self.visit(stmt)
-        elif node.get("else_branch") is not None:
-            for stmt in node["else_branch"]:
+        elif node.else_branch is not None:
+            for stmt in node.else_branch:
                 self.visit(stmt)
         return None
 
@@ -91,9 +140,16 @@ class Interpreter:
           - "condition": AST node for the loop condition.
           - "body": list of AST nodes for the loop body.
         """
-        while self.visit(node["condition"]):
-            for stmt in node["body"]:
-                self.visit(stmt)
+        # Each test of the condition is a step; the loop ends when ticks raises or the test fails.
+        try:
+            for _ in self.ticks:
+                if not self.visit(node.condition):
+                    break
+                for stmt in node.body:
+                    self.visit(stmt)
+        except ResourceLimitError as error:
+            error.locate(node.offset)
+            raise
         return None
 
     def visit_for_loop(self, node):
@@ -105,11 +161,17 @@ class Interpreter:
           - "post": AST node for the post-loop assignment.
           - "body": list of AST nodes for the loop body.
         """
-        self.visit(node["init"])
-        while self.visit(node["condition"]):
-            for stmt in node["body"]:
-                self.visit(stmt)
-            self.visit(node["post"])
+        try:
+            self.visit(node.init)
+            for _ in self.ticks:
+                if not self.visit(node.condition):
+                    break
+                for stmt in node.body:
+                    self.visit(stmt)
+                self.visit(node.post)
+        except ResourceLimitError as error:
+            error.locate(node.offset)
+            raise
         return None
 
     def visit_log(self, node):
@@ -118,18 +180,30 @@ class Interpreter:
         Expected node structure:
           - "expression": AST node to be evaluated and logged.
         """
-        value = self.visit(node["expression"])
-        print(f"LOG: {value}")
+        value = self.visit(node.expression)
+        self.output.write_line(f"LOG: {value}", node.offset, LOG)
         return value
 
+    def visit_return(self, node):
+        """
+        Processes a return statement node.
+        Expected node structure:
+          - "expression": AST node for the returned value, or None.
+        """
+        value = self.visit(node.expression) if node.expression is not None else None
+        raise ReturnSignal(value)
+
+    def visit_expression_statement(self, node):
+        self.visit(node.expression)
+        return None
+
     def visit_craft_command(self, node):
         """
         Processes a craft command node.
         Expected node structure:
           - "recipe_name": name of the recipe to craft.
         """
-        recipe_name = node["recipe_name"]
-        print(f"Craft command invoked for recipe: {recipe_name}")
+        craft_recipe(self.recipes, node.recipe_name, self.output, node.offset)
         return None
 
     def visit_binary_expression(self, node):
@@ -139,42 +213,72 @@ class Interpreter:
         - "operator": operator string (e.g., '+', '-', etc.).
         - "left": left operand (AST node).
         - "right": right operand (AST node).
+        - "fast_operation": (annotation) specialized operation chosen by TypeInference.
+        Operator chains lean left (a + b + c is (a + b) + c), so the left operands
+        are followed with a loop: a chain of any length takes one Python frame.
         """
-        left = self.visit(node["left"])
-        right = self.visit(node["right"])
-        op = node["operator"]
+        chain = []
+        while node.left.node_type == "binary_expression":
+            chain.append(node)
+            node = node.left
+        value = self._binary_operation(node, self.visit(node.left), self.visit(node.right))
+        for node in reversed(chain):
+            value = self._binary_operation(node, value, self.visit(node.right))
+        return value
 
-        if op == "+":
-            # Attempt numeric addition; if conversion fails, perform string concatenation.
-            try:
-                return float(left) + float(right)
-            except (ValueError, TypeError):
-                # Replace None with an empty string if necessary.
-                if left is None:
-                    left = ""
-                if right is None:
-                    right = ""
-                return str(left) + str(right)
-        elif op == "-":
-            return float(left) - float(right)
-        elif op == "*":
-            return float(left) * float(right)
-        elif op == "/":
-            return float(left) / float(right)
-        elif op == "==":
-            return left == right
-        elif op == "!=":
-            return left != right
-        elif op == "<":
-            return float(left) < float(right)
-        elif op == ">":
-            return float(left) > float(right)
-        elif op == "<=":
-            return float(left) <= float(right)
-        elif op == ">=":
-            return float(left) >= float(right)
-        else:
+    def _binary_operation(self, node, left, right):
+        if node.fast_operation is not None:
+            return node.fast_operation(left, right)
+        op = node.operator
+
+        operation = BINARY_OPERATIONS.get(op)
+        if operation is None:
             raise Exception("Unsupported operator: " + op)
+        return operation(left, right)
+
+    def visit_call(self, node):
+        """
+        Processes a function call node.
+        Expected node structure:
+          - "name": name of the variable holding the function.
+          - "arguments": list of AST nodes, bound in order to the function's params.
+        """
+        function = self.visit_identifier(node)
+        arguments = [self.visit(argument) for argument in node.arguments]
+        check_call(function, node.name, arguments, self.depth)
+        try:
+            next(self.ticks)
+            cache = key = None
+            if function.pure and self.memo_size:
+                key = memo_key(arguments)
+                if key is not None:
+                    cache = self._memo_cache(function)
+                    value = cache.get(key)
+                    if value is not MemoCache.MISSING:
+                        return value
+
+            # The new local frame: parameters first, then the other locals, unassigned.
+            variables = arguments + [UNDEFINED] * (len(function.local_names) - len(arguments))
+            frames = self.frames
+            caller_frame = frames[LOCAL]
+            frames[LOCAL] = variables
+            self.depth += 1
+            try:
+                for stmt in function.body:
+                    self.visit(stmt)
+                value = None
+            except ReturnSignal as signal:
+                value = signal.value
+            finally:
+                frames[LOCAL] = caller_frame
+                self.depth -= 1
+        except ResourceLimitError as error:
+            # The call is a step, and the innermost position for errors in its body outside loops.
+            error.locate(node.offset)
+            raise
+        if cache is not None:
+            cache.put(key, value)
+        return value
 
     def visit_literal(self, node):
         """
@@ -182,14 +286,7 @@ class Interpreter:
         Expected node structure:
           - "value": the literal value as a string.
         """
-        value = node["value"]
-        # If it's a string literal, remove quotes.
-        if isinstance(value, str) and value.startswith('"') and value.endswith('"'):
-            return value[1:-1]
-        try:
-            return float(value)
-        except ValueError:
-            return value
+        return literal_value(node.value)
 
     def visit_identifier(self, node):
         """
@@ -197,8 +294,32 @@ class Interpreter:
         Expected node structure:
           - "name": variable name.
         """
-        name = node["name"]
-        if name in self.global_env:
-            return self.global_env[name]
-        else:
-            raise Exception("Undefined variable: " + name)
+        try:
+            value = self.frames[node.scope][node.slot]
+        except (IndexError, TypeError):
+            value = UNDEFINED
+        if value is UNDEFINED:
+            raise Exception("Undefined variable: " + node.name)
+        return value
+
+    # ------------------ Frames ------------------
+
+    def _memo_cache(self, function):
+        cache = self.memo_caches.get(id(function))
+        if cache is None:
+            cache = self.memo_caches[id(function)] = MemoCache(function, self.memo_size)
+        return cache
+
+    def _store(self, scope, slot, value):
+        frame = self.frames[scope]
+        try:
+            frame[slot] = value
+        except IndexError:
+            # Slot resolved after the frame was sized (e.g. nodes analyzed one at a time).
+            self._grow_frame(frame, slot + 1)
+            frame[slot] = value
+
+    @staticmethod
+    def _grow_frame(frame, size):
+        if len(frame) < size:
+            frame.extend([UNDEFINED] * (size - len(frame)))
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+def memo_key(arguments):
+    """
+    Cache key for a call's arguments, or None if they cannot be hashed. Types are
+    part of the key because True == 1.0, yet "x" + True differs from "x" + 1.0.
+    """
+    key = tuple(arguments)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key, tuple(map(type, key))
+
+class MemoCache:
+    """
+    LRU cache of the results of one pure function, keyed by memo_key(arguments),
+    with hit/miss counters for reporting. Engines index their caches by
+    id(function); holding the function keeps that id from being reused.
+    """
+    MISSING = object()
+
+    def __init__(self, function, max_entries=128):
+        self.function = function
+        self.name = function.name
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key, self.MISSING)
+        if value is self.MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+def memo_statistics(memo_caches):
+    """
+    One "name: H hits, M misses" line per cache in an engine's memo_caches.
+    """
+    return [f"{cache.name}: {cache.hits} hits, {cache.misses} misses" for cache in memo_caches.values()]
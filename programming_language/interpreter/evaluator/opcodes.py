@@ -0,0 +1,27 @@
+# Instruction set of the bytecode VM. Each instruction takes two slots in the code
+# list: the opcode and its operand (None when unused). Jump operands are absolute
+# indexes into the code list.
+LOAD_CONST = 0         # push operand
+LOAD_NAME = 1          # push global_env[operand]
+STORE_NAME = 2         # global_env[operand] = pop
+BINARY_OP = 3          # right = pop, left = pop, push operand(left, right)
+JUMP = 4               # pc = operand
+POP_JUMP_IF_FALSE = 5  # if not pop: pc = operand
+LOG = 6                # operand = offset: write pop as "LOG: ..."
+CRAFT = 7              # operand = (name, offset): craft command for recipe name
+RECIPE = 8             # process recipe node operand
+DEFINE_FUNCTION = 9    # store function definition node operand
+FAIL = 10              # raise Exception(operand)
+COERCE = 11            # operand = (function, name): stack[-1] = function(stack[-1], name)
+LOAD_LOCAL = 12        # push current frame's variables[operand]
+STORE_LOCAL = 13       # current frame's variables[operand] = pop
+CALL = 14              # operand = (name, argc, offset): pop argc arguments and the function, enter it
+RETURN = 15            # leave the current function; its result stays on the stack
+POP_TOP = 16           # discard pop
+LOOP = 17              # take a step (a loop test), then pc = operand
+
+OPCODE_NAMES = (
+    "LOAD_CONST", "LOAD_NAME", "STORE_NAME", "BINARY_OP", "JUMP", "POP_JUMP_IF_FALSE",
+    "LOG", "CRAFT", "RECIPE", "DEFINE_FUNCTION", "FAIL", "COERCE",
+    "LOAD_LOCAL", "STORE_LOCAL", "CALL", "RETURN", "POP_TOP", "LOOP",
+)
@@ -0,0 +1,140 @@
+import operator
+from .execution_limits import check_string_length
+
+def add(left, right):
+    # Attempt numeric addition; if conversion fails, perform string concatenation.
+    try:
+        return float(left) + float(right)
+    except (ValueError, TypeError):
+        # Replace None with an empty string if necessary.
+        if left is None:
+            left = ""
+        if right is None:
+            right = ""
+        return concat(left, right)
+
+def subtract(left, right):
+    return float(left) - float(right)
+
+def multiply(left, right):
+    return float(left) * float(right)
+
+def divide(left, right):
+    return float(left) / float(right)
+
+def equal(left, right):
+    return left == right
+
+def not_equal(left, right):
+    return left != right
+
+def less(left, right):
+    return float(left) < float(right)
+
+def greater(left, right):
+    return float(left) > float(right)
+
+def less_equal(left, right):
+    return float(left) <= float(right)
+
+def greater_equal(left, right):
+    return float(left) >= float(right)
+
+# Operator lexeme -> implementation, shared by the tree-walking Interpreter and the VM.
+BINARY_OPERATIONS = {
+    "+": add,
+    "-": subtract,
+    "*": multiply,
+    "/": divide,
+    "==": equal,
+    "!=": not_equal,
+    "<": less,
+    ">": greater,
+    "<=": less_equal,
+    ">=": greater_equal,
+}
+
+# Conversion-free operations for operands TypeInference has proven numeric (always
+# float at run time); they give the same results as the generic ones above.
+NUMBER_OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+def concat(left, right):
+    """
+    '+' when one operand is proven to be a string float() rejects: add() would
+    always take its string fallback.
+    """
+    left = str(left)
+    right = str(right)
+    check_string_length(len(left) + len(right))
+    return left + right
+
+def to_number(value, name):
+    """
+    Coerces a value assigned to a variable declared int or float. Both hold a
+    float: int does not truncate.
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        raise Exception(f"Type error: cannot assign {value!r} to numeric variable '{name}'") from None
+
+def to_text(value, name):
+    """
+    Checks a value assigned to a variable declared char.
+    """
+    if not isinstance(value, str):
+        raise Exception(f"Type error: cannot assign {value!r} to char variable '{name}'")
+    return value
+
+def literal_value(value):
+    """
+    Runtime value of a literal node's "value": strings lose their quotes,
+    anything else is converted to float when possible. Booleans only come from
+    comparisons folded by the Optimizer and are kept as they are.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.startswith('"') and value.endswith('"'):
+        return value[1:-1]
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def register_recipe(registry, node, output):
+    """
+    Runs a recipe definition: writes it to output, an OutputSink, and adds it to
+    the engine's RecipeRegistry.
+    """
+    process_recipe(node, output)
+    for conflict in registry.add(node):
+        output.write_line(f"Recipe warning: {conflict}", node.offset)
+
+def craft_recipe(registry, name, output, position=None):
+    """
+    Runs "craft recipe name;", resolving the recipe through the engine's RecipeRegistry.
+    """
+    output.write_line(f"Craft command invoked for recipe: {name}", position)
+    recipe = registry.get(name)
+    if recipe is None:
+        raise Exception("Unknown recipe: " + name)
+    output.write_line(f"Crafted {recipe.quantity} {recipe.output} using {recipe.tool_required}", position)
+
+def process_recipe(node, output):
+    position = node.offset
+    output.write_line(f"Processing recipe: {node.name}", position)
+    output.write_line("Input materials:", position)
+    for item in node.input:
+        output.write_line(f"  Place {item.quantity} of {item.material} at position {item.position}", position)
+    output.write_line(f"Output: {node.output}", position)
+    output.write_line(f"Required tool: {node.tool_required}", position)
+    output.write_line(f"Quantity: {node.quantity}", position)
@@ -0,0 +1,141 @@
+import abc
+import collections
+import sys
+import time
+
+# Kind of each line: what "log" prints, what the rest of a script prints (function
+# definitions, recipes, crafting) and the pipeline's own progress messages.
+LOG = "log"
+PROGRAM = "program"
+PHASE = "phase"
+
+# Lines StdoutSink holds before writing them, and the longest it holds one (seconds).
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.05
+
+class OutputSink(abc.ABC):
+    """
+    Destination of everything the engines and run_interpretation_process() print.
+    write_line() receives one line without its newline, the source offset of the
+    statement that produced it (None for pipeline messages) and its kind. Engines
+    call flush() when a run ends, normally or not; the owner of a sink closes it.
+    """
+
+    @abc.abstractmethod
+    def write_line(self, text, position=None, kind=PROGRAM):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+class NullSink(OutputSink):
+    """
+    Discards every line, for benchmarks that only care about execution time.
+    """
+
+    def write_line(self, text, position=None, kind=PROGRAM):
+        pass
+
+class StdoutSink(OutputSink):
+    """
+    Writes lines to a stream in batches: one write() for up to batch_size lines,
+    or for whatever arrived in the last interval seconds, instead of one per
+    line. With stream=None the batch goes to the sys.stdout of the moment it is
+    written, so contextlib.redirect_stdout() still captures it.
+    """
+
+    def __init__(self, stream=None, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lines = []
+        self.last_flush = time.monotonic()
+
+    def write_line(self, text, position=None, kind=PROGRAM):
+        lines = self.lines
+        lines.append(text)
+        if len(lines) >= self.batch_size or time.monotonic() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.lines:
+            return
+        lines, self.lines = self.lines, []
+        stream = self.stream if self.stream is not None else sys.stdout
+        lines.append("")
+        stream.write("\n".join(lines))
+        stream.flush()
+
+class RingBufferSink(OutputSink):
+    """
+    Keeps the last capacity lines in memory (all of them with capacity=None); a
+    script that logs forever costs bounded memory and the tail stays readable.
+    dropped counts the lines pushed out.
+    """
+
+    def __init__(self, capacity=10000):
+        self.buffer = collections.deque(maxlen=capacity)
+        self.written = 0
+
+    @property
+    def dropped(self):
+        return self.written - len(self.buffer)
+
+    def write_line(self, text, position=None, kind=PROGRAM):
+        self.buffer.append(text)
+        self.written += 1
+
+    def lines(self):
+        return list(self.buffer)
+
+    def getvalue(self):
+        """
+        The buffered lines as the text print() would have written.
+        """
+        return "".join(line + "\n" for line in self.buffer)
+
+    def clear(self):
+        self.buffer.clear()
+        self.written = 0
+
+class OutputRecord:
+    """
+    One line kept by StructuredSink, with the source offset of the statement that
+    wrote it and the time.time() at which it was written.
+    """
+    __slots__ = ("text", "position", "kind", "timestamp")
+
+    def __init__(self, text, position, kind, timestamp):
+        self.text = text
+        self.position = position
+        self.kind = kind
+        self.timestamp = timestamp
+
+    def to_dict(self):
+        return {"text": self.text, "position": self.position, "kind": self.kind, "timestamp": self.timestamp}
+
+    def __repr__(self):
+        return f"OutputRecord({self.text!r}, position={self.position}, kind={self.kind!r})"
+
+class StructuredSink(RingBufferSink):
+    """
+    RingBufferSink of OutputRecord instead of plain lines, for callers (a server,
+    an editor) that map output back to the source or filter it by kind.
+    """
+
+    def write_line(self, text, position=None, kind=PROGRAM):
+        self.buffer.append(OutputRecord(text, position, kind, time.time()))
+        self.written += 1
+
+    def lines(self):
+        return [record.text for record in self.buffer]
+
+    def records(self, kind=None):
+        return [record for record in self.buffer if kind is None or record.kind == kind]
+
+    def getvalue(self):
+        return "".join(record.text + "\n" for record in self.buffer)
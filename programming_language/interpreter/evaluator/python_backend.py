@@ -0,0 +1,114 @@
+import re
+from .operations import BINARY_OPERATIONS, register_recipe, craft_recipe, to_number, to_text, concat
+from .call_frame import check_call
+from .memo_cache import MemoCache, memo_key
+from .execution_limits import ExecutionLimits
+from .output_sink import StdoutSink
+from .resource_limit_error import ResourceLimitError
+from .python_transpiler import PythonTranspiler, NAME_PREFIX
+from interpreter.crafting.recipe_registry import RecipeRegistry
+
+# Python reports a local (or, inside the lambdas of _chain(), a free variable) read
+# before assignment without setting NameError.name.
+UNBOUND_LOCAL_PATTERN = re.compile(r"(?:local|free) variable '(\w+)'")
+
+def _fail(message, *operands):
+    raise Exception(message)
+
+def _chain(value, steps):
+    # A long operator chain, see PythonTranspiler.visit_binary_expression().
+    for step in steps:
+        value = step(value)
+    return value
+
+class PythonBackend:
+    """
+    Execution engine that runs programs transpiled by PythonTranspiler with exec().
+    Variables live in a namespace shared by every run, so global_env carries over
+    between calls exactly as with Interpreter.
+    """
+
+    def __init__(self, memo_size=0, limits=None, output=None):
+        # Recipes defined so far, used to resolve craft commands.
+        self.recipes = RecipeRegistry()
+        # Step, time and memory limits; loops and calls take one step each from ticks.
+        self.limits = limits if limits is not None else ExecutionLimits()
+        self.ticks = self.limits.ticks()
+        # OutputSink that receives what the script prints.
+        self.output = output if output is not None else StdoutSink()
+        self.namespace = {
+            "_fail": _fail, "_chain": _chain, "_to_number": to_number, "_to_text": to_text, "_concat": concat,
+            "_process_recipe": lambda node: register_recipe(self.recipes, node, self.output),
+            "_craft": lambda name, offset: craft_recipe(self.recipes, name, self.output, offset),
+            "_write_line": self.output.write_line,
+            "_define": self._define, "_call": self._call, "float": float, "str": str,
+            "_ticks": self.ticks, "_ResourceLimitError": ResourceLimitError,
+        }
+        for operation in BINARY_OPERATIONS.values():
+            self.namespace["_" + operation.__name__] = operation
+        # Python function generated for each defined function, by id(function).
+        self.functions = {}
+        self.depth = 0
+        # Results of pure functions, by id(function); memo_size=0 disables memoization.
+        self.memo_size = memo_size
+        self.memo_caches = {}
+
+    @property
+    def global_env(self):
+        prefix_length = len(NAME_PREFIX)
+        return {name[prefix_length:]: value for name, value in self.namespace.items() if name.startswith(NAME_PREFIX)}
+
+    def run(self, abstract_syntax_tree):
+        """
+        Transpile and execute the Abstract Syntax Tree (AST), a list of AST nodes.
+        """
+        self.execute(PythonTranspiler().transpile(abstract_syntax_tree))
+
+    def execute(self, program):
+        self.namespace["_constants"] = program.constants
+        try:
+            with self.limits:
+                exec(program.code, self.namespace)
+        except NameError as e:
+            name = e.name
+            if name is None:
+                match = UNBOUND_LOCAL_PATTERN.search(str(e))
+                name = match.group(1) if match else None
+            if name is None or not name.startswith(NAME_PREFIX):
+                raise
+            raise Exception("Undefined variable: " + name[len(NAME_PREFIX):]) from None
+        finally:
+            self.output.flush()
+
+    # ------------------ Functions ------------------
+
+    def _define(self, function, python_function):
+        # The function is kept with its Python code so that its id cannot be reused.
+        self.functions[id(function)] = (function, python_function)
+        return function
+
+    def _call(self, function, name, offset, *arguments):
+        check_call(function, name, arguments, self.depth)
+        try:
+            next(self.ticks)
+            cache = key = None
+            if function.pure and self.memo_size:
+                key = memo_key(arguments)
+                if key is not None:
+                    cache = self.memo_caches.get(id(function))
+                    if cache is None:
+                        cache = self.memo_caches[id(function)] = MemoCache(function, self.memo_size)
+                    value = cache.get(key)
+                    if value is not MemoCache.MISSING:
+                        return value
+            self.depth += 1
+            try:
+                value = self.functions[id(function)][1](*arguments)
+            finally:
+                self.depth -= 1
+        except ResourceLimitError as error:
+            error.locate(offset)
+            raise
+        if cache is not None:
+            cache.put(key, value)
+        return value
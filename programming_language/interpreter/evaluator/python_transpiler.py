@@ -0,0 +1,235 @@
+import ast
+from .operations import BINARY_OPERATIONS, concat, literal_value
+from .output_sink import LOG
+
+# Language variables become Python globals with this prefix, so they never clash
+# with Python keywords, builtins or the helpers the generated code calls.
+NAME_PREFIX = "_v_"
+
+# Operators emitted as native Python operations when one operand is a numeric
+# constant; otherwise the shared function from BINARY_OPERATIONS is called.
+NATIVE_ARITHMETIC = {"-": ast.Sub, "*": ast.Mult, "/": ast.Div}
+NATIVE_COMPARISONS = {"==": ast.Eq, "!=": ast.NotEq, "<": ast.Lt, ">": ast.Gt, "<=": ast.LtE, ">=": ast.GtE}
+# Operands TypeInference proved numeric are already floats, so '+' is native too.
+NATIVE_NUMBER_ARITHMETIC = dict(NATIVE_ARITHMETIC, **{"+": ast.Add})
+
+# Operator chains (a + b + c is (a + b) + c) longer than this are emitted as a
+# call to _chain() with one lambda per operator instead of nested expressions,
+# which compile() cannot handle beyond a few hundred levels.
+MAX_NESTED_OPERATIONS = 100
+
+class TranspiledProgram:
+    """
+    A compiled Python code object plus the AST nodes it refers to by index
+    (recipes and function definitions cannot be embedded as constants).
+    """
+    __slots__ = ("code", "constants")
+
+    def __init__(self, code, constants):
+        self.code = code
+        self.constants = constants
+
+class PythonTranspiler:
+    """
+    Translates the parser's AST into a Python ast.Module and compiles it, so that
+    loops, conditionals and assignments run on CPython's own eval loop.
+    Operand evaluation order and error messages match Interpreter. Loops iterate
+    over the engine's _ticks (see ExecutionLimits.ticks()) so that every test of
+    their condition is a step, as in the other engines.
+    """
+
+    def __init__(self, filename="<script>"):
+        self.filename = filename
+        self.constants = []
+
+    def transpile(self, abstract_syntax_tree):
+        body = self._block(abstract_syntax_tree)
+        module = ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+        return TranspiledProgram(compile(module, self.filename, "exec"), self.constants)
+
+    def visit(self, node):
+        node_type = node.node_type
+        method_name = "visit_" + node_type
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node):
+        return ast.Expr(self._fail("No visitor method defined for node type: " + str(node.node_type)))
+
+    # ------------------ Helpers ------------------
+
+    def _block(self, statements):
+        body = []
+        for stmt in statements:
+            translated = self.visit(stmt)
+            if isinstance(translated, list):
+                body.extend(translated)
+            else:
+                body.append(translated)
+        return body or [ast.Pass()]
+
+    def _call(self, function_name, *args):
+        return ast.Call(func=ast.Name(id=function_name, ctx=ast.Load()), args=list(args), keywords=[])
+
+    def _fail(self, message, *operands):
+        return self._call("_fail", ast.Constant(message), *operands)
+
+    def _constant_node(self, node):
+        self.constants.append(node)
+        return ast.Subscript(
+            value=ast.Name(id="_constants", ctx=ast.Load()),
+            slice=ast.Constant(len(self.constants) - 1),
+            ctx=ast.Load()
+        )
+
+    def _store(self, name, value):
+        return ast.Assign(targets=[ast.Name(id=NAME_PREFIX + name, ctx=ast.Store())], value=value)
+
+    def _loop(self, condition, body):
+        # for _ in _ticks: if not condition: break; body
+        test = ast.If(test=ast.UnaryOp(op=ast.Not(), operand=condition), body=[ast.Break()], orelse=[])
+        return ast.For(target=ast.Name(id="_", ctx=ast.Store()), iter=ast.Name(id="_ticks", ctx=ast.Load()),
+                       body=[test] + body, orelse=[])
+
+    def _locate(self, statements, node):
+        # try: statements; except _ResourceLimitError as _error: _error.locate(offset); raise
+        locate = ast.Call(
+            func=ast.Attribute(value=ast.Name(id="_error", ctx=ast.Load()), attr="locate", ctx=ast.Load()),
+            args=[ast.Constant(node.offset)], keywords=[]
+        )
+        handler = ast.ExceptHandler(type=ast.Name(id="_ResourceLimitError", ctx=ast.Load()), name="_error",
+                                    body=[ast.Expr(locate), ast.Raise(exc=None, cause=None)])
+        return ast.Try(body=statements, handlers=[handler], orelse=[], finalbody=[])
+
+    # ------------------ Statements ------------------
+
+    def visit_recipe(self, node):
+        return ast.Expr(self._call("_process_recipe", self._constant_node(node)))
+
+    def visit_function_definition(self, node):
+        # The body becomes a Python function whose parameters and locals are Python
+        # locals. As in Interpreter, the definition node itself is what gets stored;
+        # _define() registers the Python function for _call() and returns the node.
+        constant = self._constant_node(node)
+        function_name = f"_f_{len(self.constants) - 1}"
+        arguments = ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=NAME_PREFIX + param) for param in node.params],
+            vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+        )
+        return [
+            ast.FunctionDef(name=function_name, args=arguments, body=self._block(node.body),
+                            decorator_list=[], returns=None),
+            self._store(node.name, self._call("_define", constant, ast.Name(id=function_name, ctx=ast.Load()))),
+            ast.Expr(self._call("_write_line", ast.Constant(f"Defined function: {node.name}"), ast.Constant(node.offset))),
+        ]
+
+    def visit_assignment(self, node):
+        value = self.visit(node.expression)
+        if node.coerce is not None:
+            value = self._call("_" + node.coerce.__name__, value, ast.Constant(node.identifier))
+        return self._store(node.identifier, value)
+
+    def visit_conditional(self, node):
+        else_branch = node.else_branch
+        return ast.If(
+            test=self.visit(node.condition),
+            body=self._block(node.then_branch),
+            orelse=self._block(else_branch) if else_branch is not None else []
+        )
+
+    def visit_while_loop(self, node):
+        return self._locate([self._loop(self.visit(node.condition), self._block(node.body))], node)
+
+    def visit_for_loop(self, node):
+        body = self._block(node.body)
+        body.append(self.visit(node.post))
+        return self._locate([self.visit(node.init), self._loop(self.visit(node.condition), body)], node)
+
+    def visit_log(self, node):
+        message = ast.JoinedStr(values=[
+            ast.Constant("LOG: "),
+            ast.FormattedValue(value=self.visit(node.expression), conversion=-1, format_spec=None),
+        ])
+        return ast.Expr(self._call("_write_line", message, ast.Constant(node.offset), ast.Constant(LOG)))
+
+    def visit_return(self, node):
+        value = self.visit(node.expression) if node.expression is not None else ast.Constant(None)
+        return ast.Return(value=value)
+
+    def visit_expression_statement(self, node):
+        return ast.Expr(self.visit(node.expression))
+
+    def visit_craft_command(self, node):
+        return ast.Expr(self._call("_craft", ast.Constant(node.recipe_name), ast.Constant(node.offset)))
+
+    # ------------------ Expressions ------------------
+
+    def visit_binary_expression(self, node):
+        chain = []
+        while node.left.node_type == "binary_expression":
+            chain.append(node)
+            node = node.left
+        value = self._binary_operation(node, self.visit(node.left), self.visit(node.right))
+        if len(chain) < MAX_NESTED_OPERATIONS:
+            for node in reversed(chain):
+                value = self._binary_operation(node, value, self.visit(node.right))
+            return value
+        # _chain(value, (lambda _left: value op right, ...)): each right operand is
+        # still evaluated after the operations to its left, as in Interpreter.
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg="_left")], vararg=None, kwonlyargs=[],
+                                  kw_defaults=[], kwarg=None, defaults=[])
+        steps = [
+            ast.Lambda(args=arguments, body=self._binary_operation(
+                node, ast.Name(id="_left", ctx=ast.Load()), self.visit(node.right)))
+            for node in reversed(chain)
+        ]
+        return self._call("_chain", value, ast.Tuple(elts=steps, ctx=ast.Load()))
+
+    def _binary_operation(self, node, left, right):
+        op = node.operator
+
+        if op == "==" or op == "!=":
+            return ast.Compare(left=left, ops=[NATIVE_COMPARISONS[op]()], comparators=[right])
+        fast_operation = node.fast_operation
+        if fast_operation is concat:
+            return self._call("_concat", left, right)
+        if fast_operation is not None:
+            if op in NATIVE_NUMBER_ARITHMETIC:
+                return ast.BinOp(left=left, op=NATIVE_NUMBER_ARITHMETIC[op](), right=right)
+            return ast.Compare(left=left, ops=[NATIVE_COMPARISONS[op]()], comparators=[right])
+        operation = BINARY_OPERATIONS.get(op)
+        if operation is None:
+            return self._fail("Unsupported operator: " + op, left, right)
+
+        # Interpreter evaluates both operands before converting either to float.
+        # The native form converts the left one first, which is only equivalent
+        # when the other operand is a constant that cannot raise.
+        if op in NATIVE_ARITHMETIC or op in NATIVE_COMPARISONS:
+            left_number = self._float_constant(left)
+            right_number = self._float_constant(right)
+            if left_number is not None or right_number is not None:
+                left = left_number if left_number is not None else self._call("float", left)
+                right = right_number if right_number is not None else self._call("float", right)
+                if op in NATIVE_ARITHMETIC:
+                    return ast.BinOp(left=left, op=NATIVE_ARITHMETIC[op](), right=right)
+                return ast.Compare(left=left, ops=[NATIVE_COMPARISONS[op]()], comparators=[right])
+        return self._call("_" + operation.__name__, left, right)
+
+    def _float_constant(self, expression):
+        if not isinstance(expression, ast.Constant):
+            return None
+        try:
+            return ast.Constant(float(expression.value))
+        except (ValueError, TypeError):
+            return None
+
+    def visit_call(self, node):
+        arguments = [self.visit(argument) for argument in node.arguments]
+        return self._call("_call", self.visit_identifier(node), ast.Constant(node.name), ast.Constant(node.offset),
+                          *arguments)
+
+    def visit_literal(self, node):
+        return ast.Constant(literal_value(node.value))
+
+    def visit_identifier(self, node):
+        return ast.Name(id=NAME_PREFIX + node.name, ctx=ast.Load())
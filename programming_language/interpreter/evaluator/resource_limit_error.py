@@ -0,0 +1,38 @@
+class ResourceLimitError(Exception):
+    """
+    Raised when a script exceeds one of its ExecutionLimits. The position is the
+    source offset of the innermost loop or call that was running; errors raised
+    where the engine does not know it yet are located on the way out.
+    """
+
+    def __init__(self, message, position=None):
+        super().__init__(self._format(message, position))
+        self.message = message
+        self.position = position
+
+    @staticmethod
+    def _format(message, position):
+        if position is None:
+            return f"Resource limit exceeded: {message}"
+        return f"Resource limit exceeded at position {position}: {message}"
+
+    def locate(self, position):
+        """
+        Sets the position if it is still unknown (the innermost handler wins).
+        """
+        if self.position is None and position is not None:
+            self.position = position
+            self.args = (self._format(self.message, position),)
+        return self
+
+class ExecutionCancelled(ResourceLimitError):
+    """
+    Raised by ExecutionLimits.grant() after cancel(), at the next check of the
+    limits, so the engines stop (and locate it) as for any exceeded limit.
+    """
+
+    @staticmethod
+    def _format(message, position):
+        if position is None:
+            return f"Execution cancelled: {message}"
+        return f"Execution cancelled at position {position}: {message}"
@@ -0,0 +1,222 @@
+from .interpreter import Interpreter
+from .operations import BINARY_OPERATIONS, literal_value
+from .call_frame import CallFrame, check_call
+from .memo_cache import MemoCache, memo_key
+from .resource_limit_error import ResourceLimitError
+from .output_sink import LOG
+from interpreter.semantic_analyzer.scope import LOCAL, UNDEFINED
+
+# Work item actions. VISIT starts a node; the others finish one once the values
+# of its children are on the value stack.
+VISIT = 0
+APPLY = 1        # binary expression: combine the two operands on top
+STORE = 2        # assignment: store the value on top
+BRANCH = 3       # conditional: push the branch chosen by the value on top
+WHILE_TEST = 4   # while loop: run the body and test again if the value on top is true
+FOR_TEST = 5     # for loop: run the body, then FOR_NEXT, if the value on top is true
+FOR_NEXT = 6     # for loop: run post and test again
+LOG_VALUE = 7    # log the value on top
+DISCARD = 8      # drop the value of an expression statement
+CALL = 9         # enter the function below the arguments on top
+RETURN = 10      # leave the current function; node is None when falling off its end
+WHILE_CONDITION = 11  # while loop: take a step and evaluate the condition
+FOR_CONDITION = 12    # for loop: take a step and evaluate the condition
+
+# Pending actions that mean the loop in their node is running.
+LOOP_ACTIONS = (WHILE_TEST, FOR_TEST, FOR_NEXT, WHILE_CONDITION, FOR_CONDITION)
+
+class StackInterpreter(Interpreter):
+    """
+    Tree-walking interpreter that keeps its own work stack and value stack instead
+    of recursing through visit(): every node is handled by the same loop, so
+    deeply nested expressions, long statement lists and deep call chains use
+    bounded Python stack, and no Python frame is paid per node. Output, errors,
+    frames and memoization match Interpreter.
+    """
+
+    def run(self, abstract_syntax_tree):
+        """
+        Execute the Abstract Syntax Tree (AST), which is assumed to be a list of AST nodes
+        already resolved by SemanticAnalyzer.
+        """
+        try:
+            with self.limits:
+                self._run(abstract_syntax_tree)
+        finally:
+            self.output.flush()
+
+    def _run(self, abstract_syntax_tree):
+        self._grow_frame(self.global_frame, len(self.global_scope))
+        frames = self.frames
+        memo_size = self.memo_size
+        values = []
+        push_value = values.append
+        pop_value = values.pop
+        work = [(VISIT, node) for node in reversed(abstract_syntax_tree)]
+        push = work.append
+        pop = work.pop
+        call_stack = []
+        tick = self.ticks.__next__
+        write_line = self.output.write_line
+        # Work items of each statement list, built once per run and keyed by id(list).
+        blocks = {}
+
+        def block(statements):
+            items = blocks.get(id(statements))
+            if items is None:
+                items = blocks[id(statements)] = (statements, [(VISIT, stmt) for stmt in reversed(statements)])
+            return items[1]
+
+        action = node = None
+        try:
+            while work:
+                action, node = pop()
+                if action == VISIT:
+                    node_type = node.node_type
+                    # Ordered by how often each node shows up inside loops.
+                    if node_type == "identifier":
+                        try:
+                            value = frames[node.scope][node.slot]
+                        except (IndexError, TypeError):
+                            value = UNDEFINED
+                        if value is UNDEFINED:
+                            raise Exception("Undefined variable: " + node.name)
+                        push_value(value)
+                    elif node_type == "literal":
+                        push_value(literal_value(node.value))
+                    elif node_type == "binary_expression":
+                        push((APPLY, node))
+                        push((VISIT, node.right))
+                        push((VISIT, node.left))
+                    elif node_type == "assignment":
+                        push((STORE, node))
+                        push((VISIT, node.expression))
+                    elif node_type == "conditional":
+                        push((BRANCH, node))
+                        push((VISIT, node.condition))
+                    elif node_type == "call":
+                        # The callee is loaded before the arguments are evaluated.
+                        try:
+                            value = frames[node.scope][node.slot]
+                        except (IndexError, TypeError):
+                            value = UNDEFINED
+                        if value is UNDEFINED:
+                            raise Exception("Undefined variable: " + node.name)
+                        push_value(value)
+                        push((CALL, node))
+                        work.extend((VISIT, argument) for argument in reversed(node.arguments))
+                    elif node_type == "return":
+                        push((RETURN, node))
+                        if node.expression is not None:
+                            push((VISIT, node.expression))
+                        else:
+                            push_value(None)
+                    elif node_type == "while_loop":
+                        push((WHILE_CONDITION, node))
+                    elif node_type == "for_loop":
+                        push((FOR_CONDITION, node))
+                        push((VISIT, node.init))
+                    elif node_type == "log":
+                        push((LOG_VALUE, node))
+                        push((VISIT, node.expression))
+                    elif node_type == "expression_statement":
+                        push((DISCARD, node))
+                        push((VISIT, node.expression))
+                    elif node_type == "function_definition":
+                        self.visit_function_definition(node)
+                    elif node_type == "craft_command":
+                        self.visit_craft_command(node)
+                    elif node_type == "recipe":
+                        self.visit_recipe(node)
+                    else:
+                        self.generic_visit(node)
+                elif action == APPLY:
+                    right = pop_value()
+                    operation = node.fast_operation or BINARY_OPERATIONS.get(node.operator)
+                    if operation is None:
+                        raise Exception("Unsupported operator: " + node.operator)
+                    values[-1] = operation(values[-1], right)
+                elif action == STORE:
+                    value = pop_value()
+                    if node.coerce is not None:
+                        value = node.coerce(value, node.identifier)
+                    self._store(node.scope, node.slot, value)
+                elif action == FOR_TEST:
+                    if pop_value():
+                        push((FOR_NEXT, node))
+                        work.extend(block(node.body))
+                elif action == FOR_NEXT:
+                    push((FOR_CONDITION, node))
+                    push((VISIT, node.post))
+                elif action == FOR_CONDITION:
+                    tick()
+                    push((FOR_TEST, node))
+                    push((VISIT, node.condition))
+                elif action == WHILE_TEST:
+                    if pop_value():
+                        push((WHILE_CONDITION, node))
+                        work.extend(block(node.body))
+                elif action == WHILE_CONDITION:
+                    tick()
+                    push((WHILE_TEST, node))
+                    push((VISIT, node.condition))
+                elif action == BRANCH:
+                    if pop_value():
+                        work.extend(block(node.then_branch))
+                    elif node.else_branch is not None:
+                        work.extend(block(node.else_branch))
+                elif action == CALL:
+                    argument_count = len(node.arguments)
+                    split = len(values) - argument_count
+                    arguments = values[split:]
+                    del values[split:]
+                    function = pop_value()
+                    check_call(function, node.name, arguments, len(call_stack))
+                    tick()
+                    key = None
+                    if function.pure and memo_size:
+                        key = memo_key(arguments)
+                        if key is not None:
+                            value = self._memo_cache(function).get(key)
+                            if value is not MemoCache.MISSING:
+                                push_value(value)
+                                continue
+                    variables = arguments + [UNDEFINED] * (len(function.local_names) - argument_count)
+                    # pc is the height of the work stack to unwind to on return.
+                    call_stack.append(CallFrame(function, variables, None, len(work), key, node.offset))
+                    frames[LOCAL] = variables
+                    push((RETURN, None))
+                    work.extend(block(function.body))
+                elif action == RETURN:
+                    if node is None:
+                        push_value(None)
+                    frame = call_stack.pop()
+                    del work[frame.pc:]
+                    if frame.memo_key is not None:
+                        self._memo_cache(frame.function).put(frame.memo_key, values[-1])
+                    frames[LOCAL] = call_stack[-1].variables if call_stack else None
+                elif action == LOG_VALUE:
+                    write_line(f"LOG: {pop_value()}", node.offset, LOG)
+                elif action == DISCARD:
+                    pop_value()
+        except ResourceLimitError as error:
+            error.locate(self._limit_position(action, node, work, call_stack))
+            raise
+        finally:
+            frames[LOCAL] = None
+
+    @staticmethod
+    def _limit_position(action, node, work, call_stack):
+        """
+        Source offset of the innermost loop or call running when a limit was hit,
+        as the tree-walker reports it: the step itself, else the closest pending
+        loop item of the current function, else the current call.
+        """
+        if action in (CALL, WHILE_CONDITION, FOR_CONDITION):
+            return node.offset
+        base = call_stack[-1].pc if call_stack else 0
+        for index in range(len(work) - 1, base - 1, -1):
+            pending_action, pending = work[index]
+            if pending_action in LOOP_ACTIONS:
+                return pending.offset
+        return call_stack[-1].offset if call_stack else None
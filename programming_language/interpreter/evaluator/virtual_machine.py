@@ -0,0 +1,194 @@
+from .compiler import Compiler
+from .operations import register_recipe, craft_recipe
+from .call_frame import CallFrame, check_call
+from .memo_cache import MemoCache, memo_key
+from .execution_limits import ExecutionLimits
+from .output_sink import LOG as LOG_LINE, StdoutSink
+from .resource_limit_error import ResourceLimitError
+from .opcodes import (
+    LOAD_CONST, LOAD_NAME, STORE_NAME, BINARY_OP, JUMP, POP_JUMP_IF_FALSE,
+    LOG, CRAFT, RECIPE, DEFINE_FUNCTION, FAIL, COERCE, LOAD_LOCAL, STORE_LOCAL, CALL, RETURN, POP_TOP, LOOP
+)
+from interpreter.semantic_analyzer.scope import UNDEFINED
+from interpreter.crafting.recipe_registry import RecipeRegistry
+
+class VirtualMachine:
+    """
+    Stack-based alternative to Interpreter: compiles the AST with Compiler and runs
+    the resulting code in a single dispatch loop. Produces the same output and the
+    same global_env as the tree-walker. Function calls push a CallFrame instead of
+    recursing in Python, so the loop never re-enters itself.
+    """
+
+    def __init__(self, memo_size=0, limits=None, output=None):
+        # Global environment to store variables, functions, recipes, etc.
+        self.global_env = {}
+        # Compiled body of each function called so far, by id(function).
+        self.function_code = {}
+        # Loop ranges of every compiled code list, by id(code), to locate resource limit errors.
+        self.code_loops = {}
+        # Results of pure functions, by id(function); memo_size=0 disables memoization.
+        self.memo_size = memo_size
+        self.memo_caches = {}
+        # Recipes defined so far, used to resolve craft commands.
+        self.recipes = RecipeRegistry()
+        # Step, time and memory limits; remaining is how many steps grant() still allows.
+        self.limits = limits if limits is not None else ExecutionLimits()
+        self.remaining = 0
+        # OutputSink that receives what the script prints.
+        self.output = output if output is not None else StdoutSink()
+
+    def run(self, abstract_syntax_tree):
+        """
+        Compile and execute the Abstract Syntax Tree (AST), a list of AST nodes.
+        """
+        compiler = Compiler()
+        code = compiler.compile(abstract_syntax_tree)
+        self.code_loops[id(code)] = (code, compiler.loops)
+        self.execute(code)
+
+    def execute(self, code):
+        try:
+            with self.limits:
+                self._execute(code)
+        finally:
+            self.output.flush()
+
+    def _execute(self, code):
+        env = self.global_env
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        call_stack = []
+        variables = None
+        memo_size = self.memo_size
+        grant = self.limits.grant
+        remaining = self.remaining
+        output = self.output
+        write_line = output.write_line
+        pc = 0
+        end = len(code)
+        opcode = operand = None
+        try:
+            while pc < end:
+                opcode = code[pc]
+                operand = code[pc + 1]
+                pc += 2
+                # Ordered by how often each instruction shows up inside loops.
+                if opcode == LOAD_LOCAL:
+                    value = variables[operand]
+                    if value is UNDEFINED:
+                        raise Exception("Undefined variable: " + call_stack[-1].function.local_names[operand])
+                    push(value)
+                elif opcode == LOAD_NAME:
+                    try:
+                        push(env[operand])
+                    except KeyError:
+                        raise Exception("Undefined variable: " + operand) from None
+                elif opcode == LOAD_CONST:
+                    push(operand)
+                elif opcode == BINARY_OP:
+                    right = pop()
+                    stack[-1] = operand(stack[-1], right)
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        pc = operand
+                elif opcode == LOOP:
+                    if remaining:
+                        remaining -= 1
+                    else:
+                        remaining = grant() - 1
+                    pc = operand
+                elif opcode == JUMP:
+                    pc = operand
+                elif opcode == STORE_LOCAL:
+                    variables[operand] = pop()
+                elif opcode == STORE_NAME:
+                    env[operand] = pop()
+                elif opcode == CALL:
+                    name, argument_count, offset = operand
+                    split = len(stack) - argument_count
+                    arguments = stack[split:]
+                    del stack[split:]
+                    function = pop()
+                    check_call(function, name, arguments, len(call_stack))
+                    if remaining:
+                        remaining -= 1
+                    else:
+                        remaining = grant() - 1
+                    key = None
+                    if function.pure and memo_size:
+                        key = memo_key(arguments)
+                        if key is not None:
+                            value = self._memo_cache(function).get(key)
+                            if value is not MemoCache.MISSING:
+                                push(value)
+                                continue
+                    variables = arguments + [UNDEFINED] * (len(function.local_names) - argument_count)
+                    # The frame remembers where to resume the caller.
+                    call_stack.append(CallFrame(function, variables, code, pc, key, offset))
+                    code = self._function_code(function)
+                    pc = 0
+                    end = len(code)
+                elif opcode == RETURN:
+                    frame = call_stack.pop()
+                    if frame.memo_key is not None:
+                        self._memo_cache(frame.function).put(frame.memo_key, stack[-1])
+                    code = frame.code
+                    pc = frame.pc
+                    end = len(code)
+                    variables = call_stack[-1].variables if call_stack else None
+                elif opcode == POP_TOP:
+                    pop()
+                elif opcode == COERCE:
+                    stack[-1] = operand[0](stack[-1], operand[1])
+                elif opcode == LOG:
+                    write_line(f"LOG: {pop()}", operand, LOG_LINE)
+                elif opcode == CRAFT:
+                    craft_recipe(self.recipes, operand[0], output, operand[1])
+                elif opcode == RECIPE:
+                    register_recipe(self.recipes, operand, output)
+                elif opcode == DEFINE_FUNCTION:
+                    env[operand.name] = operand
+                    write_line(f"Defined function: {operand.name}", operand.offset)
+                elif opcode == FAIL:
+                    raise Exception(operand)
+                else:
+                    raise Exception(f"Unknown opcode {opcode} at {pc - 2}")
+        except ResourceLimitError as error:
+            error.locate(self._limit_position(code, pc - 2, opcode, operand, call_stack))
+            raise
+        finally:
+            # Steps left over are kept for the next run with the same limits.
+            self.remaining = remaining
+
+    def _limit_position(self, code, index, opcode, operand, call_stack):
+        """
+        Source offset of the innermost loop or call running at code[index], as the
+        tree-walker reports it.
+        """
+        if opcode == CALL:
+            return operand[2]
+        innermost = None
+        for start, end, offset in self.code_loops.get(id(code), (None, ()))[1]:
+            if start <= index < end and (innermost is None or start > innermost[0]):
+                innermost = (start, offset)
+        if innermost is not None:
+            return innermost[1]
+        return call_stack[-1].offset if call_stack else None
+
+    def _function_code(self, function):
+        entry = self.function_code.get(id(function))
+        if entry is None:
+            compiler = Compiler()
+            code = compiler.compile_function(function)
+            # The function is kept with its code so that its id cannot be reused.
+            entry = self.function_code[id(function)] = (function, code)
+            self.code_loops[id(code)] = (code, compiler.loops)
+        return entry[1]
+
+    def _memo_cache(self, function):
+        cache = self.memo_caches.get(id(function))
+        if cache is None:
+            cache = self.memo_caches[id(function)] = MemoCache(function, self.memo_size)
+        return cache
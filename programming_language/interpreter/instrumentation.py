@@ -0,0 +1,230 @@
+"""
+Opt-in instrumentation of the pipeline.
+
+A PipelineStats passed to run_interpretation_process() collects the wall time
+and the memory allocated by every phase (lexing, parsing, analysis, type
+inference, optimization, execution) and, for the semantic analyzer and the
+tree-walking Interpreter, how many nodes of each node_type were visited and how
+long they took. Visitors are instrumented by replacing their visit method (or
+the work list of IterativeSemanticAnalyzer) on the instance when they are
+created, so a run without stats executes exactly the same code as before.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class PhaseStats:
+    """
+    Wall time of a phase, and the bytes it allocated at its peak and still held at its end.
+    """
+    __slots__ = ("name", "seconds", "allocated", "retained")
+
+    def __init__(self, name, seconds=0.0, allocated=None, retained=None):
+        self.name = name
+        self.seconds = seconds
+        self.allocated = allocated
+        self.retained = retained
+
+    def to_dict(self):
+        return {"name": self.name, "seconds": self.seconds, "allocated": self.allocated, "retained": self.retained}
+
+class NodeStats:
+    """
+    Visits of one node_type (the class name for nodes without one, like recipe
+    items). seconds is the cumulative time, including the nodes nested inside (a
+    node nested in one of its own type is only counted once); self_seconds leaves
+    the nested visits out. For a visitor that does not recurse
+    (IterativeSemanticAnalyzer) both are the time spent on the node itself.
+    Interpreter evaluates a chain of operators (a + b + c) in a single visit, so
+    the chain counts as one binary_expression.
+    """
+    __slots__ = ("count", "seconds", "self_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.self_seconds = 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "seconds": self.seconds, "self_seconds": self.self_seconds}
+
+class PipelineStats:
+    """
+    Statistics of one run of the pipeline. phases lists the PhaseStats in the
+    order they ran; nodes maps the class name of each instrumented visitor to a
+    {node_type: NodeStats} dict. With allocations=True every phase runs under
+    tracemalloc, which makes it (and the node times) several times slower; pass
+    allocations=False to get times closer to an uninstrumented run.
+    """
+
+    def __init__(self, allocations=True):
+        self.allocations = allocations
+        self.phases = []
+        self.nodes = {}
+
+    @contextmanager
+    def phase(self, name):
+        stats = PhaseStats(name)
+        self.phases.append(stats)
+        tracing = self.allocations
+        started = tracing and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                stats.allocated = peak - before
+                stats.retained = current - before
+            if started:
+                tracemalloc.stop()
+
+    @property
+    def total_seconds(self):
+        return sum(phase.seconds for phase in self.phases)
+
+    def instrument(self, visitor):
+        """
+        Makes visitor (a SemanticAnalyzer or an Interpreter) count and time the
+        nodes it visits into self.nodes[class name]. Returns the visitor.
+        """
+        table = self.nodes.setdefault(type(visitor).__name__, {})
+        if hasattr(visitor, "work_list"):
+            _instrument_work_list(visitor, table)
+        else:
+            _instrument_visit(visitor, table)
+        return visitor
+
+    def node_rows(self, visitor):
+        """
+        (node_type, NodeStats) of a visitor, the most expensive first.
+        """
+        return sorted(self.nodes.get(visitor, {}).items(), key=lambda item: item[1].self_seconds, reverse=True)
+
+    def to_dict(self):
+        return {
+            "phases": [phase.to_dict() for phase in self.phases],
+            "nodes": {
+                visitor: {node_type: stats.to_dict() for node_type, stats in table.items()}
+                for visitor, table in self.nodes.items()
+            },
+        }
+
+    def format_table(self, limit=10):
+        """
+        The statistics as lines of plain text: the phases, then the limit most
+        expensive node types of each instrumented visitor.
+        """
+        lines = [f"{'Phase':<20}{'Time (ms)':>12}{'Allocated (KB)':>16}{'Retained (KB)':>16}"]
+        for phase in self.phases:
+            lines.append(f"{phase.name:<20}{phase.seconds * 1000:>12.2f}"
+                         f"{_kilobytes(phase.allocated):>16}{_kilobytes(phase.retained):>16}")
+        lines.append(f"{'total':<20}{self.total_seconds * 1000:>12.2f}")
+        for visitor in self.nodes:
+            lines.append("")
+            lines.append(f"{visitor}:")
+            lines.append(f"{'Node type':<20}{'Count':>12}{'Cumulative (ms)':>16}{'Self (ms)':>16}")
+            for node_type, stats in self.node_rows(visitor)[:limit]:
+                lines.append(f"{node_type:<20}{stats.count:>12}{stats.seconds * 1000:>16.2f}"
+                             f"{stats.self_seconds * 1000:>16.2f}")
+        return lines
+
+def _kilobytes(size):
+    return "-" if size is None else f"{size / 1024:.1f}"
+
+def _instrument_visit(visitor, table):
+    # The instance attribute shadows the class's visit, so the visitor's own
+    # recursive self.visit() calls go through timed_visit too.
+    visit = visitor.visit
+    clock = time.perf_counter
+    depths = {}
+    # Time of the visits nested in the one in progress.
+    nested = [0.0]
+
+    def timed_visit(node):
+        if node is None:
+            return visit(node)
+        node_type = node.node_type or type(node).__name__
+        stats = table.get(node_type)
+        if stats is None:
+            stats = table[node_type] = NodeStats()
+        depth = depths.get(node_type, 0)
+        depths[node_type] = depth + 1
+        outer = nested[0]
+        nested[0] = 0.0
+        start = clock()
+        try:
+            return visit(node)
+        finally:
+            elapsed = clock() - start
+            stats.count += 1
+            stats.self_seconds += elapsed - nested[0]
+            if depth == 0:
+                stats.seconds += elapsed
+            depths[node_type] = depth
+            nested[0] = outer + elapsed
+
+    visitor.visit = timed_visit
+    # Every language call now goes through twice as many Python frames.
+    if hasattr(visitor, "frames_per_call"):
+        visitor.frames_per_call *= 2
+
+def _instrument_work_list(visitor, table):
+    # IterativeSemanticAnalyzer pops every node from its work list: the time from
+    # one pop to the next is the time spent on the popped node.
+    timer = _WorkTimer(table)
+    visit = visitor.visit
+    visitor.work_list = lambda items: _TimedWorkList(items, timer)
+
+    def timed_visit(node):
+        try:
+            return visit(node)
+        finally:
+            timer.switch(None)
+
+    visitor.visit = timed_visit
+
+class _WorkTimer:
+    __slots__ = ("table", "current", "start")
+
+    def __init__(self, table):
+        self.table = table
+        self.current = None
+        self.start = 0.0
+
+    def switch(self, item):
+        now = time.perf_counter()
+        if self.current is not None:
+            elapsed = now - self.start
+            self.current.seconds += elapsed
+            self.current.self_seconds += elapsed
+        if item is None:
+            self.current = None
+            return
+        # Tuples mark the end of a function body, whose bookkeeping belongs to the definition.
+        node_type = "function_definition" if type(item) is tuple else item.node_type or type(item).__name__
+        stats = self.table.get(node_type)
+        if stats is None:
+            stats = self.table[node_type] = NodeStats()
+        if type(item) is not tuple:
+            stats.count += 1
+        self.current = stats
+        self.start = now
+
+class _TimedWorkList(list):
+    __slots__ = ("timer",)
+
+    def __init__(self, items, timer):
+        super().__init__(items)
+        self.timer = timer
+
+    def pop(self):
+        item = list.pop(self)
+        self.timer.switch(item)
+        return item
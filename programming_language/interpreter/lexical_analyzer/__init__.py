@@ -1,5 +1,7 @@
 __all__ = [
     "lexeme",
     "lexer",
-    "lexical_error"
+    "lexical_error",
+    "line_index",
+    "token_buffer"
 ]
\ No newline at end of file
@@ -11,3 +11,32 @@ TOKEN_PATTERNS = [
     ("OPERATOR", re.compile(r"[=+*/<>!%\-]{1,2}")),
 ]
 
+# Todos los patrones combinados en una sola expresión con grupos nombrados.
+# La alternancia de 're' prueba las ramas en orden, igual que recorrer
+# TOKEN_PATTERNS, y 'lastgroup' indica qué patrón produjo el token.
+MASTER_PATTERN = re.compile(
+    "|".join(f"(?P<{token_name}>{pattern.pattern})" for token_name, pattern in TOKEN_PATTERNS)
+)
+
+SKIPPED_TOKENS = frozenset(("WHITESPACE", "COMMENT"))
+
+# Palabras clave que declaran el tipo de una variable: "int x = 1;".
+TYPE_KEYWORDS = frozenset(("int", "float", "char"))
+
+# Tipos de token como enteros pequeños (índice en TOKEN_PATTERNS), usados por TokenBuffer y Parser.
+TOKEN_TYPES = tuple(token_name for token_name, _ in TOKEN_PATTERNS)
+TOKEN_KINDS = {token_name: kind for kind, token_name in enumerate(TOKEN_TYPES)}
+
+COMMENT = TOKEN_KINDS["COMMENT"]
+WHITESPACE = TOKEN_KINDS["WHITESPACE"]
+KEYWORD = TOKEN_KINDS["KEYWORD"]
+NUMBER = TOKEN_KINDS["NUMBER"]
+STRING = TOKEN_KINDS["STRING"]
+IDENTIFIER = TOKEN_KINDS["IDENTIFIER"]
+SYMBOL = TOKEN_KINDS["SYMBOL"]
+OPERATOR = TOKEN_KINDS["OPERATOR"]
+
+# Índice de grupo de MASTER_PATTERN (match.lastindex) -> tipo de token.
+GROUP_KINDS = [None] * (MASTER_PATTERN.groups + 1)
+for token_name, group_index in MASTER_PATTERN.groupindex.items():
+    GROUP_KINDS[group_index] = TOKEN_KINDS[token_name]
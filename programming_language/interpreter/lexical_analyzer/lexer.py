@@ -1,7 +1,17 @@
-from .lexeme import TOKEN_PATTERNS
+from .lexeme import TOKEN_PATTERNS, TOKEN_TYPES, MASTER_PATTERN, SKIPPED_TOKENS, GROUP_KINDS, NUMBER, STRING
 from .lexical_error import LexicalError
+from .token_buffer import TokenBuffer
+import codecs
 import re
 
+# Caracteres de texto leído de más necesarios para que un token sea definitivo:
+# NUMBER puede crecer con '.' y un dígito, y '\b' mira un carácter más.
+STREAM_LOOKAHEAD = 2
+STREAM_CHUNK_SIZE = 1 << 16
+# Un STRING solo es un token cuando llega su comilla de cierre, así que se sigue
+# leyendo mientras falte; como mucho hasta este número de caracteres.
+STREAM_MAX_STRING = 1 << 20
+
 class Lexer:
     def __init__(self, code):
         self.code = code
@@ -9,6 +19,131 @@ class Lexer:
         self.tokens = []
 
     def tokenize(self):
+        code = self.code
+        length = len(code)
+        match_token = MASTER_PATTERN.match
+        append_token = self.tokens.append
+        position = self.position
+        while position < length:
+            match = match_token(code, position)
+            if match is None:
+                self.position = position
+                self._handle_invalid_character()
+            token_name = match.lastgroup
+            end = match.end()
+            if token_name not in SKIPPED_TOKENS:
+                lexeme = code[position:end]
+                if token_name == "NUMBER" or token_name == "STRING":
+                    self._validate_token(token_name, lexeme, position)
+                append_token((token_name, lexeme, position))
+            position = end
+        self.position = position
+        return self.tokens
+
+    def tokenize_buffer(self):
+        """
+        Same scan as tokenize(), but stores the tokens in a TokenBuffer
+        (small-int kinds and array offsets) instead of a list of tuples.
+        """
+        code = self.code
+        length = len(code)
+        match_token = MASTER_PATTERN.match
+        buffer = TokenBuffer(code)
+        append_kind = buffer.kinds.append
+        append_start = buffer.starts.append
+        append_end = buffer.ends.append
+        group_kinds = GROUP_KINDS
+        skipped_kinds = [TOKEN_TYPES[kind] in SKIPPED_TOKENS for kind in range(len(TOKEN_TYPES))]
+        position = self.position
+        while position < length:
+            match = match_token(code, position)
+            if match is None:
+                self.position = position
+                self._handle_invalid_character()
+            kind = group_kinds[match.lastindex]
+            end = match.end()
+            if not skipped_kinds[kind]:
+                if kind == NUMBER or kind == STRING:
+                    self._validate_token(TOKEN_TYPES[kind], code[position:end], position)
+                append_kind(kind)
+                append_start(position)
+                append_end(end)
+            position = end
+        self.position = position
+        return buffer
+
+    def iter_tokens(self, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Generator version of tokenize(). Besides a str, the source may be a file object
+        or an mmap (anything with read(size) returning str or UTF-8 bytes); it is read
+        in chunks and only the unconsumed tail of the current chunk is kept in memory.
+        Positions are character offsets from the start of the source. Text that
+        matches no token raises as soon as it is read, except for an opening quote,
+        which waits for its closing one up to STREAM_MAX_STRING characters.
+        """
+        match_token = MASTER_PATTERN.match
+        if isinstance(self.code, str):
+            text, eof = self.code, True
+        else:
+            text, eof = "", False
+            read = self.code.read
+            decoder = codecs.getincrementaldecoder("utf-8")()
+        offset = 0
+        position = self.position
+        while True:
+            match = match_token(text, position) if position < len(text) else None
+            if eof:
+                cut_off = False
+            elif match is not None:
+                cut_off = match.end() + STREAM_LOOKAHEAD > len(text)
+            else:
+                # Sin coincidencia, solo más texto puede cambiar el resultado cerca del
+                # final del bloque, o en un STRING cuya comilla de cierre aún no se leyó.
+                cut_off = (position + STREAM_LOOKAHEAD >= len(text)
+                           or text[position] == '"' and len(text) - position <= STREAM_MAX_STRING)
+            if cut_off:
+                string_pending = match is None and position < len(text) and text[position] == '"'
+                # Se conserva un carácter anterior para '\b' y la lookbehind de NUMBER.
+                keep = max(position - 1, 0)
+                parts = [text[keep:]]
+                size = len(parts[0])
+                while True:
+                    chunk = read(chunk_size)
+                    eof = not chunk
+                    if isinstance(chunk, bytes):
+                        chunk = decoder.decode(chunk, final=eof)
+                    parts.append(chunk)
+                    size += len(chunk)
+                    # Un STRING largo se reúne entero antes de volver a aplicar el patrón.
+                    if not string_pending or eof or '"' in chunk or size > STREAM_MAX_STRING:
+                        break
+                text = "".join(parts)
+                offset += keep
+                position -= keep
+                continue
+            if match is None:
+                if position >= len(text):
+                    break
+                self.position = offset + position
+                if text[position] == '"' and not eof:
+                    raise LexicalError(f"Unterminated string literal: no closing quote within "
+                                       f"{STREAM_MAX_STRING} characters", offset + position)
+                self._raise_invalid_character(text[position], offset + position)
+            token_name = match.lastgroup
+            end = match.end()
+            if token_name not in SKIPPED_TOKENS:
+                lexeme = text[position:end]
+                if token_name == "NUMBER" or token_name == "STRING":
+                    self._validate_token(token_name, lexeme, offset + position)
+                yield token_name, lexeme, offset + position
+            position = end
+            self.position = offset + position
+
+    def tokenize_sequential(self):
+        """
+        Reference implementation that tries every entry of TOKEN_PATTERNS in order
+        at each position. Produces exactly the same tokens as tokenize().
+        """
         while self.position < len(self.code):
             match_found = self._match_next_token()
             if not match_found:
@@ -25,7 +160,7 @@ class Lexer:
                 
                 self._validate_token(token_name, lexeme, position)
 
-                if token_name not in ("WHITESPACE", "COMMENT"):
+                if token_name not in SKIPPED_TOKENS:
                     self.tokens.append((token_name, lexeme, position))
                 return True
         return False
@@ -40,9 +175,9 @@ class Lexer:
                 raise LexicalError("Number literal overflow or invalid format", position)
     
     def _handle_invalid_character(self):
-        current_char = self.code[self.position]
-        position = self.position
-        
+        self._raise_invalid_character(self.code[self.position], self.position)
+
+    def _raise_invalid_character(self, current_char, position):
         if current_char.isprintable():
             raise LexicalError(f"Invalid character '{current_char}'", position)
         else:
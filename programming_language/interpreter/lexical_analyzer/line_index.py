@@ -0,0 +1,37 @@
+from bisect import bisect_right
+
+class LineIndex:
+    """
+    Maps the character offsets that tokens and AST nodes carry to 1-based
+    (line, column) pairs. The offsets where lines start are computed once, so
+    each lookup is a binary search instead of a scan of the source.
+    """
+    __slots__ = ("source", "starts")
+
+    def __init__(self, source):
+        self.source = source
+        starts = [0]
+        find = source.find
+        position = find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = find("\n", position + 1)
+        self.starts = starts
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line(self, offset):
+        return bisect_right(self.starts, offset)
+
+    def line_column(self, offset):
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def line_text(self, line):
+        """
+        Text of a 1-based line, without its line break.
+        """
+        start = self.starts[line - 1]
+        end = self.starts[line] - 1 if line < len(self.starts) else len(self.source)
+        return self.source[start:end].rstrip("\r")
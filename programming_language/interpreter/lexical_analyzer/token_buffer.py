@@ -0,0 +1,62 @@
+from array import array
+from .lexeme import TOKEN_TYPES, TOKEN_KINDS
+
+class TokenBuffer:
+    """
+    Compact token storage: one small-int kind and two offsets per token, kept in
+    typed arrays. Lexemes are sliced from the source only when requested.
+    """
+    __slots__ = ("source", "kinds", "starts", "ends")
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+
+    def append(self, kind, start, end):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        return self.kinds[index], self.lexeme(index), self.starts[index]
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def kind(self, index):
+        return self.kinds[index]
+
+    def lexeme(self, index):
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def position(self, index):
+        return self.starts[index]
+
+    def to_tuples(self):
+        """
+        Returns the tokens in the (type name, lexeme, position) format of Lexer.tokenize().
+        """
+        return [(TOKEN_TYPES[kind], lexeme, position) for kind, lexeme, position in self]
+
+    @classmethod
+    def from_tuples(cls, tokens):
+        """
+        Builds a buffer from (type, lexeme, position) tuples, where type is either a
+        name from TOKEN_TYPES or a kind. The source is rebuilt by placing every
+        lexeme at its original position, so offsets and error positions are kept.
+        """
+        length = max((position + len(lexeme) for _, lexeme, position in tokens), default=0)
+        chars = [" "] * length
+        for _, lexeme, position in tokens:
+            chars[position:position + len(lexeme)] = lexeme
+        buffer = cls("".join(chars))
+        for token_type, lexeme, position in tokens:
+            kind = TOKEN_KINDS[token_type] if isinstance(token_type, str) else token_type
+            buffer.append(kind, position, position + len(lexeme))
+        return buffer
@@ -0,0 +1 @@
+__all__ = ["optimizer"]
\ No newline at end of file
@@ -0,0 +1,141 @@
+from interpreter.evaluator.operations import BINARY_OPERATIONS, literal_value
+from interpreter.syntax_analyzer.ast_nodes import (
+    Node, FunctionDefinition, Assignment, Conditional, WhileLoop, ForLoop, Log, Return, ExpressionStatement,
+    BinaryExpr, Call, Literal
+)
+
+def count_nodes(node):
+    if isinstance(node, list):
+        return sum(count_nodes(item) for item in node)
+    if not isinstance(node, Node):
+        return 0
+    return 1 + sum(count_nodes(value) for _, value in node.fields())
+
+class Optimizer:
+    """
+    AST pass run after semantic analysis. Folds binary expressions whose operands
+    are literals, using the same operations as Interpreter, replaces conditionals
+    with a constant condition by the branch that would run, and drops loops whose
+    condition is constant false. The input tree is not modified: changed nodes
+    are rebuilt (keeping their source offset) and the rest are shared.
+    """
+
+    def __init__(self):
+        self.eliminated_nodes = 0
+
+    def optimize(self, abstract_syntax_tree):
+        return self._block(abstract_syntax_tree)
+
+    def visit(self, node):
+        node_type = node.node_type
+        method_name = "visit_" + node_type if node_type else "generic_visit"
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node):
+        return node
+
+    # ------------------ Helpers ------------------
+
+    def _block(self, statements):
+        """
+        Optimizes a statement list. A visitor may return a list of statements
+        (the surviving branch of a conditional), which is spliced in place.
+        """
+        result = []
+        for stmt in statements:
+            optimized = self.visit(stmt)
+            if isinstance(optimized, list):
+                result.extend(optimized)
+            else:
+                result.append(optimized)
+        return result
+
+    def _constant_truth(self, expression):
+        """
+        Returns True/False when the expression is a literal, None otherwise.
+        """
+        if isinstance(expression, Literal):
+            return bool(literal_value(expression.value))
+        return None
+
+    def _eliminate(self, node, kept=()):
+        self.eliminated_nodes += count_nodes(node) - count_nodes(list(kept))
+
+    # ------------------ Statements ------------------
+
+    def visit_function_definition(self, node):
+        return FunctionDefinition(node.name, node.params, self._block(node.body),
+                                  node.scope, node.slot, node.local_names, node.pure).at(node.offset)
+
+    def visit_assignment(self, node):
+        return Assignment(node.identifier, self.visit(node.expression), node.declared_type,
+                          node.scope, node.slot, node.coerce).at(node.offset)
+
+    def visit_conditional(self, node):
+        condition = self.visit(node.condition)
+        then_branch = self._block(node.then_branch)
+        else_branch = self._block(node.else_branch) if node.else_branch is not None else None
+        optimized = Conditional(condition, then_branch, else_branch).at(node.offset)
+        truth = self._constant_truth(condition)
+        if truth is None:
+            return optimized
+        kept = then_branch if truth else (else_branch or [])
+        self._eliminate(optimized, kept)
+        return kept
+
+    def visit_while_loop(self, node):
+        optimized = WhileLoop(self.visit(node.condition), self._block(node.body)).at(node.offset)
+        if self._constant_truth(optimized.condition) is False:
+            self._eliminate(optimized)
+            return []
+        return optimized
+
+    def visit_for_loop(self, node):
+        optimized = ForLoop(self.visit(node.init), self.visit(node.condition), self.visit(node.post),
+                            self._block(node.body)).at(node.offset)
+        # The initialization still runs once even if the loop body never does.
+        if self._constant_truth(optimized.condition) is False:
+            self._eliminate(optimized, [optimized.init])
+            return optimized.init
+        return optimized
+
+    def visit_log(self, node):
+        return Log(self.visit(node.expression)).at(node.offset)
+
+    def visit_return(self, node):
+        return Return(self.visit(node.expression) if node.expression is not None else None).at(node.offset)
+
+    def visit_expression_statement(self, node):
+        return ExpressionStatement(self.visit(node.expression)).at(node.offset)
+
+    # ------------------ Expressions ------------------
+
+    def visit_binary_expression(self, node):
+        # Left-leaning chains (a + b + c ...) are folded iteratively along their left
+        # spine, so their length is not limited by Python's recursion limit.
+        spine = []
+        while node.node_type == "binary_expression":
+            spine.append(node)
+            node = node.left
+        left = self.visit(node)
+        for node in reversed(spine):
+            left = self._fold(node, left, self.visit(node.right))
+        return left
+
+    def _fold(self, node, left, right):
+        operation = BINARY_OPERATIONS.get(node.operator)
+        if operation is not None and isinstance(left, Literal) and isinstance(right, Literal):
+            try:
+                value = operation(literal_value(left.value), literal_value(right.value))
+            except Exception:
+                # Errors such as division by zero are left for run time, where they belong.
+                pass
+            else:
+                self.eliminated_nodes += 2
+                return Literal(f'"{value}"' if isinstance(value, str) else value)
+        return BinaryExpr(node.operator, left, right, node.fast_operation)
+
+    def visit_call(self, node):
+        return Call(node.name, [self.visit(argument) for argument in node.arguments],
+                    node.scope, node.slot).at(node.offset)
@@ -0,0 +1,274 @@
+"""
+Source-level profiler for scripts run on the tree-walking Interpreter.
+
+ScriptProfiler(code).attach(interpreter) makes the interpreter time every
+statement it executes, so the cost of a script is reported in terms of its own
+lines, functions and loops rather than of Python frames:
+  - collapsed_stacks(): one "frame;frame;...;frame value" line per distinct
+    stack, the input of Brendan Gregg's flamegraph.pl and compatible viewers.
+    The root frame is <script>; a call adds "func name" under the line that
+    made it, a loop adds "for line N" or "while line N", and the leaf is the
+    line of the statement that was running.
+  - annotated_source(): the source with the hits, self time and total time of
+    every line, followed by the totals of every function and loop.
+Time is charged to the innermost statement running, including the evaluation
+of its expressions; nested statements and the bodies of the functions it calls
+are charged to their own lines. The header of a loop is not a statement: its
+condition tests, and the init and post assignments of a for loop, are the self
+time of the loop's line. Like PipelineStats, the interpreter is instrumented by
+replacing its visit method on the instance.
+"""
+import time
+from interpreter.lexical_analyzer.line_index import LineIndex
+
+SCRIPT_FRAME = "<script>"
+LOOP_TYPES = {"while_loop": "while", "for_loop": "for"}
+
+class LineStats:
+    """
+    hits: executions of the statements starting on the line. seconds includes the
+    statements nested inside and the functions they call (a line running inside
+    itself, e.g. through recursion, is only counted once); self_seconds does not.
+    """
+    __slots__ = ("hits", "seconds", "self_seconds", "depth")
+
+    def __init__(self):
+        self.hits = 0
+        self.seconds = 0.0
+        self.self_seconds = 0.0
+        self.depth = 0
+
+class ScopeStats(LineStats):
+    """
+    A function or a loop: hits are calls or runs of the loop, seconds the time spent inside.
+    """
+    __slots__ = ("kind", "name", "line")
+
+    def __init__(self, kind, name, line):
+        super().__init__()
+        self.kind = kind
+        self.name = name
+        self.line = line
+
+    @property
+    def label(self):
+        return f"func {self.name}" if self.kind == "func" else f"{self.kind} line {self.line}"
+
+class StackFrame:
+    """
+    Node of the tree of the stacks seen so far; self_seconds and hits belong to
+    the stack that ends at this frame.
+    """
+    __slots__ = ("label", "parent", "children", "self_seconds", "hits")
+
+    def __init__(self, label, parent=None):
+        self.label = label
+        self.parent = parent
+        self.children = {}
+        self.self_seconds = 0.0
+        self.hits = 0
+
+    def child(self, label):
+        frame = self.children.get(label)
+        if frame is None:
+            frame = self.children[label] = StackFrame(label, self)
+        return frame
+
+class _StatementInfo:
+    # Static facts of a statement, found once before the run. parent is the
+    # _StatementInfo of the loop or conditional whose block holds it, or None at
+    # the top of the script or of a function body; function_scope is the
+    # ScopeStats of the enclosing function, loop_scope that of the statement itself
+    # if it is a loop; first marks the first statement of a function body.
+    __slots__ = ("line", "label", "parent", "function", "function_scope", "loop_scope", "first")
+
+class ScriptProfiler:
+    def __init__(self, code):
+        self.code = code
+        self.index = LineIndex(code)
+        self.lines = {}
+        self.scopes = {}
+        self.root = StackFrame(SCRIPT_FRAME)
+        self.statements = {}
+        self.wall_seconds = 0.0
+
+    def attach(self, interpreter):
+        """
+        Instruments interpreter, which must run trees parsed from this profiler's
+        code. Returns the interpreter.
+        """
+        visit = interpreter.visit
+        run = interpreter.run
+        statements = self.statements
+        clock = time.perf_counter
+        # (StatementInfo, scope frame, leaf frame, LineStats) of the statements running, innermost last.
+        active = []
+        # Time up to which the innermost statement has already been charged.
+        charged = [0.0]
+
+        def profiled_visit(node):
+            info = statements.get(id(node))
+            if info is None:
+                return visit(node)
+            now = clock()
+            if active:
+                top = active[-1]
+                top[2].self_seconds += now - charged[0]
+                top[3].self_seconds += now - charged[0]
+            else:
+                top = None
+            if info.parent is None:
+                if info.function is None:
+                    scope = self.root
+                else:
+                    # First statement of a call: the function goes under the line that called it.
+                    caller = top[2] if top is not None else self.root
+                    scope = caller.child(info.function_scope.label)
+            elif info.parent.loop_scope is not None:
+                scope = top[2]
+            else:
+                scope = top[1]
+            leaf = scope.child(info.label)
+            leaf.hits += 1
+            line_stats = self.lines[info.line]
+            line_stats.hits += 1
+            # Line, function and loop whose total time includes this statement.
+            entered = [line_stats]
+            if info.parent is None and info.function_scope is not None:
+                if info.first:
+                    info.function_scope.hits += 1
+                entered.append(info.function_scope)
+            if info.loop_scope is not None:
+                info.loop_scope.hits += 1
+                entered.append(info.loop_scope)
+            for stats in entered:
+                stats.depth += 1
+            active.append((info, scope, leaf, line_stats))
+            charged[0] = start = now
+            try:
+                return visit(node)
+            finally:
+                now = clock()
+                leaf.self_seconds += now - charged[0]
+                line_stats.self_seconds += now - charged[0]
+                charged[0] = now
+                active.pop()
+                elapsed = now - start
+                for stats in entered:
+                    stats.depth -= 1
+                    if stats.depth == 0:
+                        stats.seconds += elapsed
+
+        def profiled_run(abstract_syntax_tree):
+            self._index_statements(abstract_syntax_tree)
+            start = clock()
+            try:
+                return run(abstract_syntax_tree)
+            finally:
+                self.wall_seconds += clock() - start
+
+        interpreter.visit = profiled_visit
+        interpreter.run = profiled_run
+        # Every language call now goes through twice as many Python frames.
+        interpreter.frames_per_call *= 2
+        return interpreter
+
+    def _index_statements(self, abstract_syntax_tree):
+        # Blocks to index: (statements, enclosing loop or conditional, function definition).
+        blocks = [(abstract_syntax_tree, None, None)]
+        while blocks:
+            block, parent, function = blocks.pop()
+            for position, node in enumerate(block):
+                offset = node.offset
+                if offset is None:
+                    continue
+                info = _StatementInfo()
+                info.line = line = self.index.line(offset)
+                info.parent = parent
+                info.function = function
+                info.first = function is not None and parent is None and position == 0
+                info.function_scope = None
+                if function is not None:
+                    info.function_scope = self._scope("func", function.name, self.index.line(function.offset))
+                info.loop_scope = None
+                kind = LOOP_TYPES.get(node.node_type)
+                if kind is not None:
+                    info.loop_scope = self._scope(kind, None, line)
+                    info.label = info.loop_scope.label
+                else:
+                    info.label = f"line {line}"
+                self.lines.setdefault(line, LineStats())
+                self.statements[id(node)] = info
+                if node.node_type == "function_definition":
+                    blocks.append((node.body, None, node))
+                elif kind is not None:
+                    blocks.append((node.body, info, function))
+                elif node.node_type == "conditional":
+                    blocks.append((node.then_branch, info, function))
+                    if node.else_branch is not None:
+                        blocks.append((node.else_branch, info, function))
+
+    def _scope(self, kind, name, line):
+        key = (kind, name, line)
+        scope = self.scopes.get(key)
+        if scope is None:
+            scope = self.scopes[key] = ScopeStats(kind, name, line)
+        return scope
+
+    def collapsed_stacks(self, weight="time"):
+        """
+        Lines of collapsed-stack output. weight is "time" (microseconds of self
+        time) or "hits" (executions of the leaf statement).
+        """
+        if weight not in ("time", "hits"):
+            raise ValueError(f"Unknown weight '{weight}', expected 'time' or 'hits'")
+        lines = []
+        # (frame, labels of the path to it)
+        pending = [(self.root, (SCRIPT_FRAME,))]
+        while pending:
+            frame, path = pending.pop()
+            value = round(frame.self_seconds * 1_000_000) if weight == "time" else frame.hits
+            if value > 0:
+                lines.append(f"{';'.join(path)} {value}")
+            for label, child in frame.children.items():
+                pending.append((child, path + (label,)))
+        lines.sort()
+        return lines
+
+    def write_collapsed(self, path, weight="time"):
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.collapsed_stacks(weight):
+                f.write(line + "\n")
+
+    def annotated_source(self):
+        """
+        Lines of a report with the hits, self time and total time next to every
+        source line, then the functions and loops sorted by total time, and a
+        note on the self time of loop lines if there are any.
+        """
+        total = self.wall_seconds
+        # A final line break does not start another line.
+        line_count = len(self.index) - (1 if self.code.endswith("\n") else 0)
+        lines = [f"Profile of {line_count} lines, {total * 1000:.2f} ms in the interpreter",
+                 f"{'Line':>6}{'Hits':>10}{'Self (ms)':>12}{'Total (ms)':>12}{'Self %':>8}  Source"]
+        for number in range(1, line_count + 1):
+            text = self.index.line_text(number)
+            stats = self.lines.get(number)
+            if stats is None or not stats.hits:
+                lines.append(f"{number:>6}{'':>42}  {text}")
+                continue
+            share = stats.self_seconds / total * 100 if total else 0.0
+            lines.append(f"{number:>6}{stats.hits:>10}{stats.self_seconds * 1000:>12.3f}"
+                         f"{stats.seconds * 1000:>12.3f}{share:>7.1f}%  {text}")
+        lines.append("")
+        lines.append(f"{'Scope':<24}{'Line':>6}{'Hits':>10}{'Total (ms)':>12}{'Total %':>9}")
+        scopes = [scope for scope in self.scopes.values() if scope.hits]
+        for scope in sorted(scopes, key=lambda scope: scope.seconds, reverse=True):
+            share = scope.seconds / total * 100 if total else 0.0
+            lines.append(f"{scope.label:<24}{scope.line:>6}{scope.hits:>10}{scope.seconds * 1000:>12.3f}"
+                         f"{share:>8.1f}%")
+        if any(scope.kind != "func" for scope in scopes):
+            lines.append("")
+            lines.append("The self time of a loop's line is its header: the condition tests, and the init "
+                         "and post of a for loop.")
+        return lines
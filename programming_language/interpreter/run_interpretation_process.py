@@ -1,28 +1,202 @@
+import contextlib
+import importlib
+import mmap
+import os
 from interpreter.lexical_analyzer.lexer import Lexer
-from interpreter.syntax_analyzer.parser import Parser
-from interpreter.semantic_analyzer.semantic_analyzer import SemanticAnalyzer
-from interpreter.evaluator.interpreter import Interpreter
+from interpreter.syntax_analyzer.parser import Parser, nesting_headroom
+from interpreter.syntax_analyzer.streaming_parser import StreamingParser
+from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+from interpreter.semantic_analyzer.type_inference import TypeInference
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.evaluator.code_cache import CompiledCodeCache
+from interpreter.evaluator.memo_cache import memo_statistics
+from interpreter.evaluator.output_sink import PHASE, StdoutSink
+from interpreter.artifact_cache import ArtifactCache
 
-def run_interpretation_process(code):
-    lexer = Lexer(code)
-    tokens = lexer.tokenize()
+# Execution engines: "tree" walks the AST, "stack" walks it with an explicit work
+# stack (no recursion limit on nesting), "vm" compiles it to bytecode first,
+# "python" transpiles it to a Python code object. Each is (module, class) and is
+# only imported when first used, so a run pays for the engine it picks.
+ENGINES = {
+    "tree": ("interpreter.evaluator.interpreter", "Interpreter"),
+    "stack": ("interpreter.evaluator.stack_interpreter", "StackInterpreter"),
+    "vm": ("interpreter.evaluator.virtual_machine", "VirtualMachine"),
+    "python": ("interpreter.evaluator.python_backend", "PythonBackend"),
+}
+# Engines that read variables from the slots SemanticAnalyzer resolved.
+TREE_WALKERS = ("tree", "stack")
 
-    parser = Parser(tokens)
-    abstract_syntax_tree = parser.parse()
-    print("Syntactic analysis completed successfully.")
+# (TranspiledProgram, AST) per source hash, used by the "python" engine.
+PYTHON_CODE_CACHE = CompiledCodeCache()
 
-    semantic_analyzer = SemanticAnalyzer()
-    semantic_analyzer.analyze(abstract_syntax_tree)
-    print("Semantic analysis completed successfully.")
+# Analyzed and optimized trees on disk, shared by every engine and every process.
+ARTIFACT_CACHE = ArtifactCache()
 
-    interpreter = Interpreter()
-    interpreter.run(abstract_syntax_tree)
+def create_engine(engine, global_scope=None, memo_size=0, limits=None, output=None):
+    """
+    Instantiates an engine. The tree-walkers read variables from the slots that
+    SemanticAnalyzer resolved, so they need the analyzer's global_scope. With
+    memo_size > 0, calls to functions SemanticAnalyzer proved pure are memoized
+    in an LRU cache of that many results per function. limits, an
+    ExecutionLimits, bounds the steps, time and memory of the execution. output,
+    an OutputSink, receives what the script prints (a StdoutSink by default).
+    """
+    if engine in TREE_WALKERS:
+        return engine_class(engine)(global_scope, memo_size, limits, output)
+    return engine_class(engine)(memo_size, limits, output)
+
+def engine_class(engine):
+    """
+    Imports and returns the class of an engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown execution engine '{engine}', expected one of: {', '.join(ENGINES)}")
+    module, name = ENGINES[engine]
+    return getattr(importlib.import_module(module), name)
+
+def run_interpretation_process(code, engine="tree", memo_size=0, cache=ARTIFACT_CACHE, limits=None, output=None,
+                               stats=None, profiler=None):
+    """
+    Lexes, parses, analyzes, optimizes and runs code with the given engine. The
+    analyzed trees are looked up in (and stored to) cache, an ArtifactCache, so
+    an unchanged source skips straight to execution; cache=None disables it,
+    along with the in-memory PYTHON_CODE_CACHE of the "python" engine.
+    A script that exceeds limits raises ResourceLimitError. The phase messages
+    and the script's own output go to output, an OutputSink, which is flushed
+    (not closed) before returning. stats, a PipelineStats, receives the time and
+    allocations of every phase and the node counts of the semantic analyzer and
+    of the "tree" engine; without it nothing is instrumented. profiler, a
+    ScriptProfiler built from code, times the script's own lines, functions and
+    loops; it needs the "tree" engine.
+    """
+    if profiler is not None and engine != "tree":
+        raise ValueError(f"The profiler needs the 'tree' engine, not '{engine}'")
+    if output is None:
+        output = StdoutSink()
+    try:
+        with nesting_headroom():
+            return _run_interpretation_process(code, engine, memo_size, cache, limits, output, stats, profiler)
+    finally:
+        output.flush()
+
+def _run_interpretation_process(code, engine, memo_size, cache, limits, output, stats, profiler):
+    phase = stats.phase if stats is not None else _no_phase
+    if engine == "python" and cache is not None:
+        cached = PYTHON_CODE_CACHE.get(code)
+        if cached is not None:
+            program, abstract_syntax_tree = cached
+            backend = create_engine(engine, None, memo_size, limits, output)
+            with phase("run"):
+                backend.execute(program)
+            _print_memo_statistics(backend)
+            return _interpretation_result(abstract_syntax_tree)
+
+    artifact = None
+    if cache is not None:
+        with phase("cache lookup"):
+            artifact = cache.get(code)
+    if artifact is not None:
+        abstract_syntax_tree, optimized_tree, global_scope = artifact
+        output.write_line("Analyzed program loaded from the artifact cache.", kind=PHASE)
+    else:
+        abstract_syntax_tree, optimized_tree, global_scope = _analyze(code, output, stats)
+        if cache is not None:
+            # Trees and scope are pickled together so the slot annotations keep pointing at global_scope.
+            with phase("cache store"):
+                cache.put(code, (abstract_syntax_tree, optimized_tree, global_scope))
+
+    interpreter = create_engine(engine, global_scope, memo_size, limits, output)
+    if engine == "python":
+        from interpreter.evaluator.python_transpiler import PythonTranspiler
+        with phase("transpile"):
+            program = PythonTranspiler().transpile(optimized_tree)
+        if cache is not None:
+            PYTHON_CODE_CACHE.put(code, (program, abstract_syntax_tree))
+        with phase("run"):
+            interpreter.execute(program)
+    else:
+        if stats is not None and engine == "tree":
+            stats.instrument(interpreter)
+        if profiler is not None:
+            profiler.attach(interpreter)
+        with phase("run"):
+            interpreter.run(optimized_tree)
+    _print_memo_statistics(interpreter)
+
+    return _interpretation_result(abstract_syntax_tree)
 
+def _analyze(code, output, stats=None):
+    phase = stats.phase if stats is not None else _no_phase
+    with phase("lex"):
+        lexer = Lexer(code)
+        tokens = lexer.tokenize_buffer()
+
+    with phase("parse"):
+        parser = Parser(tokens)
+        abstract_syntax_tree = parser.parse()
+    output.write_line("Syntactic analysis completed successfully.", kind=PHASE)
+
+    semantic_analyzer = IterativeSemanticAnalyzer()
+    if stats is not None:
+        stats.instrument(semantic_analyzer)
+    with phase("analyze"):
+        semantic_analyzer.analyze(abstract_syntax_tree)
+    output.write_line("Semantic analysis completed successfully.", kind=PHASE)
+
+    type_inference = TypeInference()
+    with phase("infer"):
+        type_inference.infer(abstract_syntax_tree)
+    output.write_line(f"Type inference completed: {type_inference.fast_paths} specialized operations.", kind=PHASE)
+
+    optimizer = Optimizer()
+    with phase("optimize"):
+        optimized_tree = optimizer.optimize(abstract_syntax_tree)
+    output.write_line(f"Optimization completed: {optimizer.eliminated_nodes} nodes eliminated.", kind=PHASE)
+    return abstract_syntax_tree, optimized_tree, semantic_analyzer.global_scope
+
+def _no_phase(name):
+    return contextlib.nullcontext()
+
+def _print_memo_statistics(engine):
+    for line in memo_statistics(engine.memo_caches):
+        engine.output.write_line(f"Memoized {line}", kind=PHASE)
+
+def _interpretation_result(abstract_syntax_tree):
     if isinstance(abstract_syntax_tree, dict) and "recipe" in abstract_syntax_tree:
         return abstract_syntax_tree["recipe"]
     else:
         return abstract_syntax_tree
 
+def iter_interpretation_process(source, execute=True, engine="tree", memo_size=0, limits=None, output=None):
+    """
+    Streaming version of run_interpretation_process(). The source may be a str, a file
+    object or an mmap; tokens are pulled lazily and every top-level node is analyzed
+    (and executed, unless execute is False) and yielded as soon as it is parsed, with
+    its output already flushed to output.
+    Unlike the batch version, nodes before an error have already been processed.
+    """
+    parser = StreamingParser(Lexer(source).iter_tokens())
+    semantic_analyzer = IterativeSemanticAnalyzer()
+    type_inference = TypeInference()
+    optimizer = Optimizer()
+    interpreter = create_engine(engine, semantic_analyzer.global_scope, memo_size, limits, output) if execute else None
+    for node in parser.iter_nodes():
+        with nesting_headroom():
+            semantic_analyzer.visit(node)
+            type_inference.infer([node], complete=False)
+            if interpreter is not None:
+                interpreter.run(optimizer.optimize([node]))
+        yield node
+
+def iter_interpretation_file(path, execute=True, engine="tree", memo_size=0, limits=None, output=None):
+    """
+    Runs iter_interpretation_process() over a memory-mapped file.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+        yield from iter_interpretation_process(source, execute, engine, memo_size, limits, output)
+
 if __name__ == "__main__":
     code = """
         func calculate_area(length, width) {
@@ -65,4 +239,5 @@ if __name__ == "__main__":
     """
     ast = run_interpretation_process(code)
     print("AST returned:", ast)
+    print(f"Artifact cache: {ARTIFACT_CACHE.statistics()}")
 
@@ -1 +1 @@
-__all__ = ["semantic_analyzer", "semantic_error"]
\ No newline at end of file
+__all__ = ["iterative_semantic_analyzer", "scope", "semantic_analyzer", "semantic_error", "type_inference"]
\ No newline at end of file
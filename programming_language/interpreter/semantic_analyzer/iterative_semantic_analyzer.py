@@ -0,0 +1,75 @@
+from interpreter.semantic_analyzer.semantic_analyzer import SemanticAnalyzer
+from interpreter.syntax_analyzer.ast_nodes import Node
+
+class IterativeSemanticAnalyzer(SemanticAnalyzer):
+    """
+    SemanticAnalyzer that walks the AST with an explicit work stack instead of
+    recursing, so arbitrarily long expression chains (a + b + c + ... with
+    thousands of terms) are analyzed in bounded Python stack. Nodes are checked
+    with the same _check_* methods and in the same order as the recursive
+    visitors, so annotations and errors are identical.
+    """
+    # Type of the work stack; instrumentation replaces it on the instance with one
+    # that times every pop.
+    work_list = list
+
+    def __init__(self, check_undefined=True):
+        super().__init__(check_undefined)
+        self.checks = {
+            "assignment": self._check_assignment,
+            "identifier": self._check_identifier,
+            "call": self._check_call,
+            "return": self._check_return,
+            "log": self._check_effect,
+            "craft_command": self._check_effect,
+            "recipe": self._check_recipe,
+        }
+
+    def visit(self, node):
+        if node is None:
+            return None
+        enclosing_scope, enclosing_effects = self.local_scope, self.function_effects
+        checks = self.checks
+        # Items are nodes, or (function, enclosing_scope, effects) once a body is done.
+        work = self.work_list((node,))
+        push = work.append
+        pop = work.pop
+        try:
+            while work:
+                item = pop()
+                if type(item) is tuple:
+                    function, enclosing_scope_of_function, effects = item
+                    self._leave_function(enclosing_scope_of_function)
+                    self._finish_function(function, effects)
+                    continue
+                node_type = item.node_type
+                # The most common nodes skip the generic field walk.
+                if node_type == "binary_expression":
+                    push(item.right)
+                    push(item.left)
+                    continue
+                if node_type == "identifier":
+                    self._check_identifier(item)
+                    continue
+                if node_type == "literal":
+                    continue
+                if node_type == "function_definition":
+                    enclosing_scope_of_function, effects = self._enter_function(item)
+                    push((item, enclosing_scope_of_function, effects))
+                    work.extend(reversed(item.body))
+                    continue
+                check = checks.get(node_type)
+                if check is not None:
+                    check(item)
+                # Children are pushed in reverse so they are popped in field order.
+                children = []
+                for _, value in item.fields():
+                    if isinstance(value, Node):
+                        children.append(value)
+                    elif isinstance(value, list):
+                        children.extend(child for child in value if isinstance(child, Node))
+                children.reverse()
+                work.extend(children)
+        finally:
+            self.local_scope, self.function_effects = enclosing_scope, enclosing_effects
+        return node
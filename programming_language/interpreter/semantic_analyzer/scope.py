@@ -0,0 +1,37 @@
+# Scope kinds stored in the "scope" annotation of Identifier, Assignment and
+# FunctionDefinition nodes; they index Interpreter.frames.
+GLOBAL = 0
+LOCAL = 1
+
+# Value of a frame slot whose variable has not been assigned yet.
+UNDEFINED = object()
+
+class Scope:
+    """
+    Maps the variable names of one frame (the global frame or a function's
+    frame) to consecutive slot indexes, in order of first appearance.
+    """
+    __slots__ = ("names", "slots")
+
+    def __init__(self, names=()):
+        self.names = []
+        self.slots = {}
+        for name in names:
+            self.resolve(name)
+
+    def resolve(self, name):
+        """
+        Returns the slot of name, allocating the next one if it is new.
+        """
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.slots[name] = slot
+            self.names.append(name)
+        return slot
+
+    def __contains__(self, name):
+        return name in self.slots
+
+    def __len__(self):
+        return len(self.names)
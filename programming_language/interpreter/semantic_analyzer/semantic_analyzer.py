@@ -1,10 +1,34 @@
 from interpreter.semantic_analyzer.semantic_error import SemanticError
+from interpreter.semantic_analyzer.scope import Scope, GLOBAL, LOCAL
+from interpreter.syntax_analyzer.ast_nodes import Node
 
 class SemanticAnalyzer:
-    def __init__(self):
+    def __init__(self, check_undefined=True):
         self.symbol_table = {}
+        # Además de validar, resuelve cada variable a (scope, slot) y lo anota en el AST.
+        self.global_scope = Scope()
+        self.local_scope = None
+        self.check_undefined = check_undefined
+        # Pureza: una función es pura si no hace log/craft, no lee variables globales
+        # y solo llama a funciones puras (o a sí misma) cuyo nombre es estable.
+        self.pure_functions = set()
+        self.stable_names = frozenset()
+        self.function_effects = None
 
     def analyze(self, abstract_syntax_tree):
+        # Las funciones pueden llamarse antes de su definición (recursión mutua).
+        # Un nombre es estable si se define con func una sola vez y nunca se asigna;
+        # procesando nodo a nodo (visit) no se conoce el resto y ninguno lo es.
+        definitions = {}
+        assigned = Scope()
+        for node in abstract_syntax_tree:
+            if node.node_type == "function_definition":
+                self.symbol_table[node.name] = True
+                definitions[node.name] = definitions.get(node.name, 0) + 1
+        self._collect_assigned(abstract_syntax_tree, assigned)
+        self.stable_names = frozenset(
+            name for name, count in definitions.items() if count == 1 and name not in assigned
+        )
         for node in abstract_syntax_tree:
             self.visit(node)
         return abstract_syntax_tree
@@ -12,7 +36,7 @@ class SemanticAnalyzer:
     def visit(self, node):
         if node is None:
             return None
-        node_type = node.get("node_type")
+        node_type = node.node_type
         # Si el nodo es una receta, usaremos el método visit_recipe
         if node_type == "recipe":
             return self.visit_recipe(node)
@@ -23,48 +47,151 @@ class SemanticAnalyzer:
     def generic_visit(self, node):
         if node is None:
             return None
-        for key, value in node.items():
+        for _, value in node.fields():
             if isinstance(value, list):
                 for item in value:
-                    if isinstance(item, dict):
+                    if isinstance(item, Node):
                         self.visit(item)
-            elif isinstance(value, dict):
+            elif isinstance(value, Node):
                 self.visit(value)
         return node
 
+    # Cada visit_* valida el propio nodo con su _check_* y luego visita los hijos;
+    # IterativeSemanticAnalyzer reutiliza los _check_* con una pila explícita.
+
     def visit_assignment(self, node):
-        identifier = node.get("identifier")
-        self.symbol_table[identifier] = True
-        self.visit(node.get("expression"))
+        self._check_assignment(node)
+        self.visit(node.expression)
         return node
 
     def visit_identifier(self, node):
-        name = node.get("name")
-        if name not in self.symbol_table:
-            raise SemanticError(f"Undefined variable '{name}'")
+        self._check_identifier(node)
+        return node
+
+    def visit_call(self, node):
+        self._check_call(node)
+        for argument in node.arguments:
+            self.visit(argument)
+        return node
+
+    def visit_return(self, node):
+        self._check_return(node)
+        return self.generic_visit(node)
+
+    def visit_log(self, node):
+        self._check_effect(node)
+        return self.generic_visit(node)
+
+    def visit_craft_command(self, node):
+        self._check_effect(node)
         return node
 
     def visit_function_definition(self, node):
-        self.symbol_table[node.get("name")] = True
-        for param in node.get("params", []):
-            self.symbol_table[param] = True
-        for stmt in node.get("body", []):
-            self.visit(stmt)
+        enclosing_scope, effects = self._enter_function(node)
+        try:
+            for stmt in node.body:
+                self.visit(stmt)
+        finally:
+            self._leave_function(enclosing_scope)
+        self._finish_function(node, effects)
         return node
 
+    def _check_assignment(self, node):
+        identifier = node.identifier
+        self.symbol_table[identifier] = True
+        node.scope, node.slot = self._resolve(identifier)
+
+    def _check_identifier(self, node):
+        name = node.name
+        if self.check_undefined and name not in self.symbol_table:
+            raise SemanticError(f"Undefined variable '{name}'")
+        node.scope, node.slot = self._resolve(name)
+        if self.function_effects is not None and node.scope == GLOBAL:
+            self.function_effects["impure"] = True
+
+    def _check_call(self, node):
+        name = node.name
+        if self.check_undefined and name not in self.symbol_table:
+            raise SemanticError(f"Undefined function '{name}'")
+        node.scope, node.slot = self._resolve(name)
+        if self.function_effects is not None:
+            if node.scope == GLOBAL:
+                self.function_effects["callees"].add(name)
+            else:
+                self.function_effects["impure"] = True
+
+    def _check_return(self, node):
+        if self.local_scope is None:
+            raise SemanticError("'return' outside of a function")
+
+    def _check_effect(self, node):
+        # log y craft hacen que la función que los contiene no sea pura.
+        if self.function_effects is not None:
+            self.function_effects["impure"] = True
+
+    def _enter_function(self, node):
+        self.symbol_table[node.name] = True
+        node.scope, node.slot = GLOBAL, self.global_scope.resolve(node.name)
+        for param in node.params:
+            self.symbol_table[param] = True
+        # Parámetros y variables asignadas en el cuerpo son locales a la función;
+        # el resto de nombres se resuelven en el scope global.
+        local_scope = Scope(node.params)
+        self._collect_assigned(node.body, local_scope)
+        node.local_names = local_scope.names
+        enclosing_scope, self.local_scope = self.local_scope, local_scope
+        effects = self.function_effects = {"impure": False, "callees": set()}
+        return enclosing_scope, effects
+
+    def _leave_function(self, enclosing_scope):
+        self.local_scope = enclosing_scope
+        self.function_effects = None
+
+    def _finish_function(self, node, effects):
+        node.pure = not effects["impure"] and all(
+            callee in self.stable_names and (callee == node.name or callee in self.pure_functions)
+            for callee in effects["callees"]
+        )
+        if node.pure:
+            self.pure_functions.add(node.name)
+        else:
+            self.pure_functions.discard(node.name)
+
+    def _resolve(self, name):
+        if self.local_scope is not None and name in self.local_scope:
+            return LOCAL, self.local_scope.slots[name]
+        return GLOBAL, self.global_scope.resolve(name)
+
+    def _collect_assigned(self, statements, scope):
+        for stmt in statements:
+            node_type = stmt.node_type
+            if node_type == "assignment":
+                scope.resolve(stmt.identifier)
+            elif node_type == "conditional":
+                self._collect_assigned(stmt.then_branch, scope)
+                self._collect_assigned(stmt.else_branch or [], scope)
+            elif node_type == "while_loop":
+                self._collect_assigned(stmt.body, scope)
+            elif node_type == "for_loop":
+                self._collect_assigned([stmt.init, stmt.post], scope)
+                self._collect_assigned(stmt.body, scope)
+
     def visit_recipe(self, node):
         """
         Valida que, si la herramienta requerida es 'crafting_table', las posiciones en el input estén entre 0 y 2.
         """
-        if node.get("tool_required", "").lower() == "crafting_table":
-            input_items = node.get("input", [])
+        self._check_recipe(node)
+        # Continúa visitando los subnodos, si existen
+        return self.generic_visit(node)
+
+    def _check_recipe(self, node):
+        if node.tool_required.lower() == "crafting_table":
+            input_items = node.input
             for item in input_items:
                 try:
-                    row = int(item["position"][0])
-                    col = int(item["position"][1])
+                    row = int(item.position[0])
+                    col = int(item.position[1])
                 except Exception as e:
                     raise SemanticError(f"Invalid position format for item: {item}")
                 if row < 0 or row > 2 or col < 0 or col > 2:
-                    raise SemanticError(f"Invalid position {item['position']} for item '{item.get('material', 'unknown')}'. Indices must be between 0 and 2.")
-        # Continúa visitando los subnodos, si existen
-        return self.generic_visit(node)
+                    raise SemanticError(f"Invalid position {item.position} for item '{item.material}'. Indices must be between 0 and 2.")
@@ -0,0 +1,225 @@
+from interpreter.semantic_analyzer.semantic_error import SemanticError
+from interpreter.semantic_analyzer.scope import LOCAL
+from interpreter.evaluator.operations import NUMBER_OPERATIONS, concat, to_number, to_text, literal_value
+
+# Static types. TEXT is a string that float() rejects, so '+' with it always
+# concatenates; STRING is any string. None (no assignment seen yet) is the bottom.
+NUMBER = "number"
+TEXT = "text"
+STRING = "string"
+BOOL = "bool"
+UNKNOWN = "unknown"
+
+# Every number of the language is a float, so "int" is the same type as "float":
+# it checks that the value is numeric but does not truncate it.
+DECLARED_TYPES = {"int": NUMBER, "float": NUMBER, "char": STRING}
+COMPARISON_OPERATORS = frozenset(("==", "!=", "<", ">", "<=", ">="))
+
+def join(first, second):
+    if first is None:
+        return second
+    if second is None or first == second:
+        return first
+    if first in (TEXT, STRING) and second in (TEXT, STRING):
+        return STRING
+    return UNKNOWN
+
+class TypeInference:
+    """
+    Flow-insensitive type inference over an AST already resolved by SemanticAnalyzer.
+    A variable's type is the join of everything assigned to it, or its declared type
+    ("int x = ...;"). Binary expressions whose operand types make the generic
+    conversions redundant get a fast_operation; assignments to declared variables
+    whose value is not proven to fit get a coerce function. Variable types persist
+    across calls, so nodes can be processed one at a time; with complete=False the
+    program may continue after the nodes given, so function bodies, which can run
+    later, treat global variables as UNKNOWN.
+    """
+
+    def __init__(self):
+        self.complete = True
+        self.variable_types = {}
+        self.declared_types = {}
+        self.fast_paths = 0
+        self.function_name = None
+
+    def infer(self, abstract_syntax_tree, complete=True):
+        self.complete = complete
+        for node in abstract_syntax_tree:
+            self._collect_declarations(node)
+        # Repeat until the variable types stop changing, then annotate with the final types.
+        changed = True
+        while changed:
+            before = dict(self.variable_types)
+            for node in abstract_syntax_tree:
+                self.visit(node, annotate=False)
+            changed = before != self.variable_types
+        for node in abstract_syntax_tree:
+            self.visit(node, annotate=True)
+        return abstract_syntax_tree
+
+    def visit(self, node, annotate):
+        node_type = node.node_type
+        method_name = "visit_" + node_type if node_type else "generic_visit"
+        visitor = getattr(self, method_name, self.generic_visit)
+        return visitor(node, annotate)
+
+    def generic_visit(self, node, annotate):
+        return UNKNOWN
+
+    # ------------------ Helpers ------------------
+
+    def _key(self, node, name):
+        return (self.function_name if node.scope == LOCAL else None, name)
+
+    def _block(self, statements, annotate):
+        for stmt in statements:
+            self.visit(stmt, annotate)
+
+    def _collect_declarations(self, node):
+        node_type = node.node_type
+        if node_type == "assignment":
+            if node.declared_type is not None:
+                declared = DECLARED_TYPES[node.declared_type]
+                key = self._key(node, node.identifier)
+                if self.declared_types.setdefault(key, declared) != declared:
+                    raise SemanticError(f"Variable '{node.identifier}' redeclared with a different type")
+                self.variable_types[key] = declared
+        elif node_type == "function_definition":
+            enclosing, self.function_name = self.function_name, node.name
+            for stmt in node.body:
+                self._collect_declarations(stmt)
+            self.function_name = enclosing
+        elif node_type == "conditional":
+            for stmt in node.then_branch + (node.else_branch or []):
+                self._collect_declarations(stmt)
+        elif node_type == "while_loop":
+            for stmt in node.body:
+                self._collect_declarations(stmt)
+        elif node_type == "for_loop":
+            for stmt in [node.init, node.post] + node.body:
+                self._collect_declarations(stmt)
+
+    # ------------------ Statements ------------------
+
+    def visit_function_definition(self, node, annotate):
+        self.variable_types[(None, node.name)] = UNKNOWN
+        enclosing, self.function_name = self.function_name, node.name
+        # Parameters receive values of any type and are never coerced.
+        for param in node.params:
+            self.variable_types[(node.name, param)] = UNKNOWN
+        self._block(node.body, annotate)
+        self.function_name = enclosing
+        return None
+
+    def visit_assignment(self, node, annotate):
+        value_type = self.visit(node.expression, annotate)
+        key = self._key(node, node.identifier)
+        declared = self.declared_types.get(key)
+        if declared is None:
+            self.variable_types[key] = join(self.variable_types.get(key), value_type)
+            return None
+        if annotate:
+            node.coerce = self._coercion(node.identifier, declared, value_type)
+        return None
+
+    def _coercion(self, name, declared, value_type):
+        if declared == NUMBER:
+            if value_type == TEXT:
+                raise SemanticError(f"Cannot assign a string to numeric variable '{name}'")
+            return None if value_type == NUMBER else to_number
+        if value_type in (NUMBER, BOOL):
+            raise SemanticError(f"Cannot assign a number to char variable '{name}'")
+        return None if value_type in (TEXT, STRING) else to_text
+
+    def visit_conditional(self, node, annotate):
+        self.visit(node.condition, annotate)
+        self._block(node.then_branch, annotate)
+        if node.else_branch is not None:
+            self._block(node.else_branch, annotate)
+        return None
+
+    def visit_while_loop(self, node, annotate):
+        self.visit(node.condition, annotate)
+        self._block(node.body, annotate)
+        return None
+
+    def visit_for_loop(self, node, annotate):
+        self.visit(node.init, annotate)
+        self.visit(node.condition, annotate)
+        self._block(node.body, annotate)
+        self.visit(node.post, annotate)
+        return None
+
+    def visit_log(self, node, annotate):
+        self.visit(node.expression, annotate)
+        return None
+
+    def visit_return(self, node, annotate):
+        if node.expression is not None:
+            self.visit(node.expression, annotate)
+        return None
+
+    def visit_expression_statement(self, node, annotate):
+        self.visit(node.expression, annotate)
+        return None
+
+    # ------------------ Expressions ------------------
+
+    def visit_binary_expression(self, node, annotate):
+        # Left-leaning chains (a + b + c ...) are walked iteratively along their left
+        # spine, so their length is not limited by Python's recursion limit.
+        spine = []
+        while node.node_type == "binary_expression":
+            spine.append(node)
+            node = node.left
+        result = self.visit(node, annotate)
+        for node in reversed(spine):
+            result = self._binary_type(node, result, self.visit(node.right, annotate), annotate)
+        return result
+
+    def _binary_type(self, node, left, right, annotate):
+        op = node.operator
+        fast_operation = None
+        if left == NUMBER and right == NUMBER and op in NUMBER_OPERATIONS:
+            fast_operation = NUMBER_OPERATIONS[op]
+        elif op == "+" and TEXT in (left, right) and UNKNOWN not in (left, right) and None not in (left, right):
+            fast_operation = concat
+        if annotate:
+            node.fast_operation = fast_operation
+            if fast_operation is not None:
+                self.fast_paths += 1
+
+        if op in COMPARISON_OPERATORS:
+            return BOOL
+        if op in ("-", "*", "/"):
+            return NUMBER
+        if op == "+":
+            if left in (NUMBER, BOOL) and right in (NUMBER, BOOL):
+                return NUMBER
+            if fast_operation is concat:
+                return STRING
+        return UNKNOWN
+
+    def visit_call(self, node, annotate):
+        for argument in node.arguments:
+            self.visit(argument, annotate)
+        return UNKNOWN
+
+    def visit_literal(self, node, annotate):
+        value = literal_value(node.value)
+        if isinstance(value, bool):
+            return BOOL
+        if isinstance(value, float):
+            return NUMBER
+        try:
+            float(value)
+        except ValueError:
+            return TEXT
+        return STRING
+
+    def visit_identifier(self, node, annotate):
+        if not self.complete and self.function_name is not None and node.scope != LOCAL:
+            return UNKNOWN
+        variable_type = self.variable_types.get(self._key(node, node.name))
+        return UNKNOWN if variable_type is None else variable_type
@@ -0,0 +1,486 @@
+"""
+Local interpretation service: JSON over HTTP (TCP or a Unix socket) on asyncio.
+
+Jobs are run by a fleet of worker processes that import the whole pipeline (and
+run a script through every engine) before taking their first job, so a request
+only pays for its own work. A script that outlives its timeout is stopped by
+ExecutionLimits inside its worker; one stuck where the limits cannot see it is
+killed with its worker, which is replaced. Jobs wait in a bounded queue, and a
+request that finds it full is refused at once (503) instead of piling up.
+
+    POST /check  {"code": "..."}
+    POST /run    {"code": "...", "engine": "vm", "timeout": 5, "max_steps": 100000,
+                  "max_memory": 67108864, "memo_size": 0, "cache": true, "records": false}
+    GET  /health
+
+Every job answers {"ok": bool, "output": [lines], "dropped": n, "error": null or
+{"type", "message", "position", "line", "column"}, "queued": s, "elapsed": s};
+with "records": true the output lines also come as {"text", "position", "kind"}.
+
+Run from the programming_language directory:
+    python -m interpreter.service --port 8765 --workers 4
+    python -m interpreter.service --unix /tmp/interpreter.sock
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TIMEOUT = 10.0
+MAX_TIMEOUT = 300.0
+# A worker still busy this long after its job's timeout is killed.
+KILL_GRACE = 1.0
+# Seconds between two attempts to start a replacement worker, doubled up to the maximum.
+RESPAWN_DELAY = 0.5
+MAX_RESPAWN_DELAY = 30.0
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_MAX_MEMORY = 256 * 1024 * 1024
+MAX_BODY = 1024 * 1024
+# Output lines kept per job (the last ones); the rest are counted in "dropped".
+MAX_OUTPUT_LINES = 10000
+COMMANDS = ("check", "run")
+
+# Modules the forkserver imports once, so every worker it forks starts with them.
+PRELOAD = [
+    "interpreter.run_interpretation_process",
+    "interpreter.evaluator.interpreter",
+    "interpreter.evaluator.stack_interpreter",
+    "interpreter.evaluator.virtual_machine",
+    "interpreter.evaluator.python_backend",
+    "interpreter.evaluator.python_transpiler",
+]
+
+WARM_UP_PROGRAM = 'func f(n) { return n * 2; } for (i = 0; i < 3; i = i + 1) { log("x" + f(i)); }'
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+class JobRejected(Exception):
+    """
+    A request the service refuses, answered with status and {"error": message}.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# ------------------ Worker side ------------------
+
+def error_details(error, code):
+    """
+    JSON description of an exception raised by the pipeline, with the line and
+    column of its position when it has one.
+    """
+    position = getattr(error, "position", None)
+    line = column = None
+    if position is not None and code is not None:
+        from interpreter.lexical_analyzer.line_index import LineIndex
+        line, column = LineIndex(code).line_column(position)
+    return {"type": type(error).__name__, "message": str(error), "position": position, "line": line, "column": column}
+
+def execute_job(job):
+    """
+    Runs one validated job and returns its JSON result. Runs in a worker process.
+    """
+    from interpreter.evaluator.execution_limits import ExecutionLimits
+    from interpreter.evaluator.output_sink import PHASE, StructuredSink
+    from interpreter.run_interpretation_process import ARTIFACT_CACHE, run_interpretation_process
+
+    code = job["code"]
+    output = StructuredSink(MAX_OUTPUT_LINES)
+    start = time.perf_counter()
+    error = None
+    try:
+        if job["command"] == "check":
+            from interpreter.lexical_analyzer.lexer import Lexer
+            from interpreter.syntax_analyzer.parser import Parser, nesting_headroom
+            from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+            from interpreter.semantic_analyzer.type_inference import TypeInference
+            abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+            with nesting_headroom():
+                IterativeSemanticAnalyzer().analyze(abstract_syntax_tree)
+                TypeInference().infer(abstract_syntax_tree)
+        else:
+            limits = ExecutionLimits(job["max_steps"], job["timeout"], job["max_memory"])
+            run_interpretation_process(code, job["engine"], job["memo_size"],
+                                       ARTIFACT_CACHE if job["cache"] else None, limits, output)
+    except Exception as e:
+        error = error_details(e, code)
+    records = [record for record in output.records() if record.kind != PHASE]
+    result = {
+        "ok": error is None,
+        "output": [record.text for record in records],
+        "dropped": output.dropped,
+        "error": error,
+        "elapsed": time.perf_counter() - start,
+    }
+    if job["records"]:
+        result["records"] = [{"text": record.text, "position": record.position, "kind": record.kind}
+                             for record in records]
+    return result
+
+def _warm_up():
+    from interpreter.evaluator.output_sink import NullSink
+    from interpreter.run_interpretation_process import ENGINES, ARTIFACT_CACHE, run_interpretation_process
+    from interpreter.artifact_cache import interpreter_version
+
+    interpreter_version()
+    for engine in ENGINES:
+        run_interpretation_process(WARM_UP_PROGRAM, engine, cache=ARTIFACT_CACHE, output=NullSink())
+
+def _worker_main(connection):
+    # Ctrl+C is for the service, which stops the workers itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _warm_up()
+    connection.send("ready")
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        connection.send(execute_job(job))
+
+# ------------------ Service side ------------------
+
+def _context(start_method=None):
+    """
+    multiprocessing context for the workers: a forkserver that preloads the
+    pipeline where available, so a replacement worker starts warm.
+    """
+    if start_method is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        context.set_forkserver_preload(PRELOAD)
+    return context
+
+class WorkerProcess:
+    """
+    One worker process and the pipe to it. The blocking pipe calls run on the
+    pool's thread executor.
+    """
+
+    def __init__(self, context):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection,), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def wait_ready(self):
+        if self.connection.recv() != "ready":
+            raise RuntimeError("worker failed to start")
+
+    def round_trip(self, job):
+        self.connection.send(job)
+        return self.connection.recv()
+
+    def stop(self, timeout=1.0):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.connection.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class WorkerPool:
+    """
+    Fleet of worker processes fed from a bounded queue. submit() raises
+    JobRejected(503) when the queue is full. A job that runs kill_grace seconds
+    past its timeout, or whose worker dies, gets an error result and its worker
+    is replaced; a replacement that fails to start is retried, with a growing
+    delay, by the same dispatcher.
+    """
+
+    def __init__(self, workers=None, queue_size=DEFAULT_QUEUE_SIZE, kill_grace=KILL_GRACE, start_method=None):
+        self.size = workers or os.cpu_count() or 1
+        self.queue = asyncio.Queue(queue_size)
+        self.kill_grace = kill_grace
+        self.context = _context(start_method)
+        # One thread waits on each busy worker, plus room for replacements starting
+        # while the thread of a killed worker is still returning.
+        self.executor = ThreadPoolExecutor(2 * self.size, thread_name_prefix="interpreter-worker")
+        self.workers = []
+        self.tasks = []
+        self.busy = 0
+        self.statistics = dict(submitted=0, completed=0, failed=0, rejected=0, killed=0, crashed=0, respawned=0,
+                               respawn_failed=0)
+
+    async def start(self):
+        self.workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        self.tasks = [asyncio.create_task(self._dispatch(index)) for index in range(self.size)]
+
+    async def _spawn(self):
+        loop = asyncio.get_running_loop()
+        worker = WorkerProcess(self.context)
+        try:
+            await loop.run_in_executor(self.executor, worker.wait_ready)
+        except BaseException:
+            worker.kill()
+            raise
+        return worker
+
+    async def submit(self, job):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((job, time.perf_counter(), future))
+        except asyncio.QueueFull:
+            self.statistics["rejected"] += 1
+            raise JobRejected(503, f"queue full ({self.queue.maxsize} jobs waiting)") from None
+        self.statistics["submitted"] += 1
+        return await future
+
+    async def _dispatch(self, index):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, queued_at, future = await self.queue.get()
+            worker = self.workers[index]
+            queued = time.perf_counter() - queued_at
+            self.busy += 1
+            replace = False
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(self.executor, worker.round_trip, job),
+                                                job["timeout"] + self.kill_grace)
+            except asyncio.TimeoutError:
+                self.statistics["killed"] += 1
+                result = self._failure("TimeoutError", f"job still running {self.kill_grace} s after its "
+                                                       f"{job['timeout']} s timeout; its worker was killed")
+                replace = True
+            except Exception as e:
+                # EOFError when the worker died, anything else when the pipe broke: either way it is replaced.
+                self.statistics["crashed"] += 1
+                result = self._failure("WorkerCrashed", f"worker process failed ({type(e).__name__}: {e})")
+                replace = True
+            finally:
+                self.busy -= 1
+                self.queue.task_done()
+            self.statistics["completed" if result["ok"] else "failed"] += 1
+            result["queued"] = queued
+            # The client is answered before the replacement starts, which may take a while.
+            if not future.done():
+                future.set_result(result)
+            if replace:
+                await self._replace(index, worker)
+
+    async def _replace(self, index, worker):
+        """
+        Kills worker and starts the one that takes its place, retrying until it
+        starts; meanwhile this dispatcher takes no jobs.
+        """
+        worker.kill()
+        delay = RESPAWN_DELAY
+        while True:
+            try:
+                self.workers[index] = await self._spawn()
+            except Exception as e:
+                self.statistics["respawn_failed"] += 1
+                print(f"worker {index} failed to start ({type(e).__name__}: {e}); retrying in {delay:g} s",
+                      file=sys.stderr, flush=True)
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, MAX_RESPAWN_DELAY)
+            else:
+                break
+        self.statistics["respawned"] += 1
+
+    @staticmethod
+    def _failure(error_type, message):
+        error = {"type": error_type, "message": message, "position": None, "line": None, "column": None}
+        return {"ok": False, "output": [], "dropped": 0, "error": error, "elapsed": None}
+
+    def health(self):
+        return dict(self.statistics, workers=self.size, busy=self.busy, queued=self.queue.qsize(),
+                    queue_size=self.queue.maxsize)
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for worker in self.workers:
+            worker.stop()
+        self.executor.shutdown(wait=False)
+
+def validate_job(command, body, default_timeout=DEFAULT_TIMEOUT):
+    """
+    Parses a request body into a job dict, raising JobRejected(400) for anything
+    the worker should not see.
+    """
+    from interpreter.run_interpretation_process import ENGINES
+
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError as e:
+        raise JobRejected(400, f"invalid JSON: {e}") from None
+    if not isinstance(request, dict) or not isinstance(request.get("code"), str):
+        raise JobRejected(400, 'expected a JSON object with a "code" string')
+    job = {
+        "command": command,
+        "code": request["code"],
+        "engine": request.get("engine", "tree"),
+        "timeout": request.get("timeout", default_timeout),
+        "max_steps": request.get("max_steps"),
+        "max_memory": request.get("max_memory", DEFAULT_MAX_MEMORY),
+        "memo_size": request.get("memo_size", 0),
+        "cache": bool(request.get("cache", True)),
+        "records": bool(request.get("records", False)),
+    }
+    if job["engine"] not in ENGINES:
+        raise JobRejected(400, f"unknown engine '{job['engine']}', expected one of: {', '.join(ENGINES)}")
+    # bool is a subclass of int, so true and false are ruled out explicitly.
+    timeout = job["timeout"]
+    if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or not 0 < timeout <= MAX_TIMEOUT:
+        raise JobRejected(400, f'"timeout" must be a number of seconds in (0, {MAX_TIMEOUT}]')
+    for name in ("max_steps", "max_memory"):
+        value = job[name]
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            raise JobRejected(400, f'"{name}" must be a non-negative integer or null')
+    memo_size = job["memo_size"]
+    if not isinstance(memo_size, int) or isinstance(memo_size, bool) or memo_size < 0:
+        raise JobRejected(400, '"memo_size" must be a non-negative integer')
+    return job
+
+class InterpretationService:
+    """
+    HTTP/1.1 front end of a WorkerPool, with keep-alive connections.
+    """
+
+    def __init__(self, pool, default_timeout=DEFAULT_TIMEOUT):
+        self.pool = pool
+        self.default_timeout = default_timeout
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    self._respond(writer, 400, {"error": "malformed request"}, False)
+                    break
+                if length > MAX_BODY:
+                    self._respond(writer, 413, {"error": f"request body over {MAX_BODY} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.route(method, target, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # The service is shutting down with this request still waiting for its job.
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body):
+        path = target.split("?", 1)[0].rstrip("/")
+        try:
+            if path == "/health":
+                if method != "GET":
+                    raise JobRejected(405, "use GET")
+                return 200, self.pool.health()
+            command = path[1:]
+            if command not in COMMANDS:
+                raise JobRejected(404, f"unknown endpoint '{path}', expected /check, /run or /health")
+            if method != "POST":
+                raise JobRejected(405, "use POST")
+            result = await self.pool.submit(validate_job(command, body, self.default_timeout))
+        except JobRejected as e:
+            return e.status, {"error": e.message}
+        if result["error"] is not None and result["error"]["type"] in ("TimeoutError", "WorkerCrashed"):
+            return (504 if result["error"]["type"] == "TimeoutError" else 500), result
+        return 200, result
+
+    @staticmethod
+    def _respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+async def start_service(host="127.0.0.1", port=8765, unix_path=None, workers=None, queue_size=DEFAULT_QUEUE_SIZE,
+                        default_timeout=DEFAULT_TIMEOUT, kill_grace=KILL_GRACE):
+    """
+    Starts the worker pool and the server; returns (server, pool). The caller
+    closes the server and then the pool.
+    """
+    pool = WorkerPool(workers, queue_size, kill_grace)
+    await pool.start()
+    service = InterpretationService(pool, default_timeout)
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.handle_connection, unix_path)
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+    return server, pool
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, workers=None, queue_size=DEFAULT_QUEUE_SIZE,
+                default_timeout=DEFAULT_TIMEOUT):
+    server, pool = await start_service(host, port, unix_path, workers, queue_size, default_timeout)
+    address = unix_path if unix_path is not None else f"http://{host}:{port}"
+    print(f"Interpretation service on {address} with {pool.size} workers (queue of {queue_size})", flush=True)
+    # SIGTERM (docker stop, systemd) shuts down as cleanly as Ctrl+C.
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await pool.close()
+        if unix_path is not None and os.path.exists(unix_path):
+            os.remove(unix_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m interpreter.service",
+                                     description="Local JSON interpretation service")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="jobs that may wait")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="default job timeout, in seconds")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.queue_size, args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 __all__ = [
+    "ast_nodes",
     "parser",
+    "streaming_parser",
     "syntax_error"
 ]
\ No newline at end of file
@@ -0,0 +1,201 @@
+class Node:
+    """
+    Base class of the AST nodes built by Parser. Every subclass lists its fields in
+    __slots__, so nodes carry no per-instance dict; node_type names the visitor
+    method ("visit_" + node_type) exactly as the "node_type" key of the old dicts.
+    Slots named in _annotations are filled in by later passes (e.g. the variable
+    slots assigned by SemanticAnalyzer) and are not part of the node's structure.
+    Statements and calls also remember the source offset of their first token,
+    which is not part of the structure either.
+    """
+    __slots__ = ("_offset",)
+    _annotations = ()
+    node_type = None
+
+    @property
+    def offset(self):
+        """
+        Source offset of the node's first token, or None if it was not set.
+        """
+        return getattr(self, "_offset", None)
+
+    def at(self, offset):
+        self._offset = offset
+        return self
+
+    def fields(self):
+        return ((field, getattr(self, field)) for field in self.__slots__ if field not in self._annotations)
+
+    def to_dict(self):
+        """
+        Returns the node as the plain dict the parser used to build, for JSON output.
+        """
+        result = {"node_type": self.node_type} if self.node_type is not None else {}
+        for field, value in self.fields():
+            result[field] = _to_plain(value)
+        return result
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(value == getattr(other, field) for field, value in self.fields())
+
+    __hash__ = None
+
+    def __repr__(self):
+        arguments = ", ".join(f"{field}={value!r}" for field, value in self.fields())
+        return f"{type(self).__name__}({arguments})"
+
+def _to_plain(value):
+    if isinstance(value, Node):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    return value
+
+# --------------------- DECLARATIONS ---------------------
+class FunctionDefinition(Node):
+    __slots__ = ("name", "params", "body", "scope", "slot", "local_names", "pure")
+    _annotations = ("scope", "slot", "local_names", "pure")
+    node_type = "function_definition"
+
+    def __init__(self, name, params, body, scope=None, slot=None, local_names=None, pure=False):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.scope = scope
+        self.slot = slot
+        self.local_names = local_names
+        self.pure = pure
+
+class Recipe(Node):
+    __slots__ = ("name", "input", "output", "tool_required", "quantity")
+    node_type = "recipe"
+
+    def __init__(self, name, input, output, tool_required, quantity):
+        self.name = name
+        self.input = input
+        self.output = output
+        self.tool_required = tool_required
+        self.quantity = quantity
+
+class Item(Node):
+    # Input entry of a recipe; not a statement, so it has no node_type.
+    __slots__ = ("position", "quantity", "material")
+
+    def __init__(self, position, quantity, material):
+        self.position = position
+        self.quantity = quantity
+        self.material = material
+
+# --------------------- STATEMENTS ---------------------
+class Assignment(Node):
+    __slots__ = ("identifier", "expression", "declared_type", "scope", "slot", "coerce")
+    _annotations = ("scope", "slot", "coerce")
+    node_type = "assignment"
+
+    def __init__(self, identifier, expression, declared_type=None, scope=None, slot=None, coerce=None):
+        self.identifier = identifier
+        self.expression = expression
+        self.declared_type = declared_type
+        self.scope = scope
+        self.slot = slot
+        self.coerce = coerce
+
+class Conditional(Node):
+    __slots__ = ("condition", "then_branch", "else_branch")
+    node_type = "conditional"
+
+    def __init__(self, condition, then_branch, else_branch):
+        self.condition = condition
+        self.then_branch = then_branch
+        self.else_branch = else_branch
+
+class WhileLoop(Node):
+    __slots__ = ("condition", "body")
+    node_type = "while_loop"
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+class ForLoop(Node):
+    __slots__ = ("init", "condition", "post", "body")
+    node_type = "for_loop"
+
+    def __init__(self, init, condition, post, body):
+        self.init = init
+        self.condition = condition
+        self.post = post
+        self.body = body
+
+class Log(Node):
+    __slots__ = ("expression",)
+    node_type = "log"
+
+    def __init__(self, expression):
+        self.expression = expression
+
+class Return(Node):
+    __slots__ = ("expression",)
+    node_type = "return"
+
+    def __init__(self, expression):
+        # None for a bare "return;", which returns None.
+        self.expression = expression
+
+class ExpressionStatement(Node):
+    # A call used as a statement ("f(x);"); its value is discarded.
+    __slots__ = ("expression",)
+    node_type = "expression_statement"
+
+    def __init__(self, expression):
+        self.expression = expression
+
+class CraftCommand(Node):
+    __slots__ = ("recipe_name",)
+    node_type = "craft_command"
+
+    def __init__(self, recipe_name):
+        self.recipe_name = recipe_name
+
+# --------------------- EXPRESSIONS ---------------------
+class BinaryExpr(Node):
+    __slots__ = ("operator", "left", "right", "fast_operation")
+    _annotations = ("fast_operation",)
+    node_type = "binary_expression"
+
+    def __init__(self, operator, left, right, fast_operation=None):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.fast_operation = fast_operation
+
+class Call(Node):
+    # scope/slot locate the callee like an Identifier: functions are values.
+    __slots__ = ("name", "arguments", "scope", "slot")
+    _annotations = ("scope", "slot")
+    node_type = "call"
+
+    def __init__(self, name, arguments, scope=None, slot=None):
+        self.name = name
+        self.arguments = arguments
+        self.scope = scope
+        self.slot = slot
+
+class Literal(Node):
+    __slots__ = ("value",)
+    node_type = "literal"
+
+    def __init__(self, value):
+        self.value = value
+
+class Identifier(Node):
+    __slots__ = ("name", "scope", "slot")
+    _annotations = ("scope", "slot")
+    node_type = "identifier"
+
+    def __init__(self, name, scope=None, slot=None):
+        self.name = name
+        self.scope = scope
+        self.slot = slot
@@ -1,257 +1,318 @@
+import contextlib
+import sys
 from .syntax_error import SyntaxError
+from .ast_nodes import (
+    FunctionDefinition, Recipe, Item, Assignment, Conditional, WhileLoop, ForLoop,
+    Log, Return, ExpressionStatement, CraftCommand, BinaryExpr, Call, Literal, Identifier
+)
+from interpreter.lexical_analyzer.lexeme import TOKEN_TYPES, TYPE_KEYWORDS, KEYWORD, NUMBER, STRING, IDENTIFIER, SYMBOL, OPERATOR
+from interpreter.lexical_analyzer.token_buffer import TokenBuffer
+
+# Default max_nesting of Parser. Expressions are parsed with an explicit stack, but
+# the passes after the parser (type inference, optimizer, compilers, tree-walker,
+# to_dict) recurse a few Python frames per level: up to 6 for "f(y + f(y + ...))",
+# where every "(" holds a call and an operation. NESTING_FRAMES leaves a margin.
+MAX_NESTING_DEPTH = 500
+NESTING_FRAMES = 8
+
+@contextlib.contextmanager
+def nesting_headroom(max_nesting=MAX_NESTING_DEPTH):
+    """
+    Raises Python's recursion limit so the recursive passes fit trees nested
+    max_nesting levels deep; used around the passes run after a Parser.
+    """
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(recursion_limit + max_nesting * NESTING_FRAMES)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(recursion_limit)
 
 class Parser:
-    def __init__(self, tokens):
+    """
+    Recursive descent parser over a TokenBuffer; expressions are parsed with an
+    explicit stack, so their nesting costs no Python frames. Parenthesized
+    expressions and call arguments nested more than max_nesting levels deep are
+    a SyntaxError, so the passes after the parser can run inside
+    nesting_headroom(max_nesting).
+    """
+
+    def __init__(self, tokens, max_nesting=MAX_NESTING_DEPTH):
+        # Se admite también la lista de tuplas de Lexer.tokenize(); se convierte a TokenBuffer.
+        if not isinstance(tokens, TokenBuffer):
+            tokens = TokenBuffer.from_tuples(tokens)
         self.tokens = tokens
+        self.source = tokens.source
+        self.kinds = tokens.kinds
+        self.starts = tokens.starts
+        self.ends = tokens.ends
         self.position = 0
+        # Parentheses and call argument lists open around the current token.
+        self.nesting = 0
+        self.max_nesting = max_nesting
 
     def parse(self):
-        nodes = []
-        while self.position < len(self.tokens):
+        return list(self.iter_nodes())
+
+    def iter_nodes(self):
+        """
+        Yields the top-level nodes one at a time, as soon as each one is parsed.
+        """
+        while not self._at_end():
+            offset = self._current_position()
             if self._peek_lexeme() == "func":
-                nodes.append(self._parse_function_definition())
+                yield self._parse_function_definition().at(offset)
             elif self._peek_lexeme() == "recipe":
-                nodes.append(self._parse_recipe())
+                yield self._parse_recipe().at(offset)
             else:
-                nodes.append(self._parse_statement())
-        return nodes
+                yield self._parse_statement()
 
     # --------------------- FUNCTIONS ---------------------
     def _parse_function_definition(self):
-        self._consume("KEYWORD", "func")
-        name = self._consume("IDENTIFIER")
-        self._consume("SYMBOL", "(")
+        self._consume(KEYWORD, "func")
+        name = self._consume(IDENTIFIER)
+        self._consume(SYMBOL, "(")
         params = self._parse_parameter_list()
-        self._consume("SYMBOL", ")")
-        self._consume("SYMBOL", "{")
+        self._consume(SYMBOL, ")")
+        self._consume(SYMBOL, "{")
         body = self._parse_statement_list()
-        self._consume("SYMBOL", "}")
-        return {
-            "node_type": "function_definition",
-            "name": name,
-            "params": params,
-            "body": body
-        }
+        self._consume(SYMBOL, "}")
+        return FunctionDefinition(name, params, body)
 
     def _parse_parameter_list(self):
         params = []
         if self._peek_lexeme() != ")":
-            params.append(self._consume("IDENTIFIER"))
+            params.append(self._consume(IDENTIFIER))
             while self._peek_lexeme() == ",":
-                self._consume("SYMBOL", ",")
-                params.append(self._consume("IDENTIFIER"))
+                self._consume(SYMBOL, ",")
+                params.append(self._consume(IDENTIFIER))
         return params
 
     # --------------------- RECIPES ---------------------
     def _parse_recipe(self):
-        self._consume("KEYWORD", "recipe")
-        name = self._consume("IDENTIFIER")
-        self._consume("SYMBOL", "{")
+        self._consume(KEYWORD, "recipe")
+        name = self._consume(IDENTIFIER)
+        self._consume(SYMBOL, "{")
         recipe_body = self._parse_recipe_body()
-        self._consume("SYMBOL", "}")
-        return {
-            "node_type": "recipe",
-            "name": name,
-            "input": recipe_body["input"],
-            "output": recipe_body["output"],
-            "tool_required": recipe_body["tool_required"],
-            "quantity": recipe_body["quantity"]
-        }
+        self._consume(SYMBOL, "}")
+        return Recipe(name, *recipe_body)
 
     def _parse_recipe_body(self):
         input_clause = self._parse_input_clause()
-        self._consume("SYMBOL", ";")
+        self._consume(SYMBOL, ";")
         output_clause = self._parse_output_clause()
-        self._consume("SYMBOL", ";")
+        self._consume(SYMBOL, ";")
         tool_clause = self._parse_tool_clause()
-        self._consume("SYMBOL", ";")
+        self._consume(SYMBOL, ";")
         quantity_clause = self._parse_quantity_clause()
-        self._consume("SYMBOL", ";")
-        return {
-            "input": input_clause,
-            "output": output_clause,
-            "tool_required": tool_clause,
-            "quantity": quantity_clause
-        }
+        self._consume(SYMBOL, ";")
+        return input_clause, output_clause, tool_clause, quantity_clause
 
     def _parse_input_clause(self):
-        self._consume("KEYWORD", "input")
-        self._consume("SYMBOL", ":")
-        self._consume("SYMBOL", "[")
+        self._consume(KEYWORD, "input")
+        self._consume(SYMBOL, ":")
+        self._consume(SYMBOL, "[")
         items = self._parse_item_list()
-        self._consume("SYMBOL", "]")
+        self._consume(SYMBOL, "]")
         return items
 
     def _parse_output_clause(self):
-        self._consume("KEYWORD", "output")
-        self._consume("SYMBOL", ":")
-        return self._consume("IDENTIFIER")
+        self._consume(KEYWORD, "output")
+        self._consume(SYMBOL, ":")
+        return self._consume(IDENTIFIER)
 
     def _parse_tool_clause(self):
-        self._consume("KEYWORD", "tool_required")
-        self._consume("SYMBOL", ":")
-        return self._consume("IDENTIFIER")
+        self._consume(KEYWORD, "tool_required")
+        self._consume(SYMBOL, ":")
+        return self._consume(IDENTIFIER)
 
     def _parse_quantity_clause(self):
-        self._consume("KEYWORD", "quantity")
-        self._consume("SYMBOL", ":")
-        return self._consume("NUMBER")
+        self._consume(KEYWORD, "quantity")
+        self._consume(SYMBOL, ":")
+        return self._consume(NUMBER)
 
     def _parse_item_list(self):
         items = [self._parse_item()]
         while self._peek_lexeme() == ",":
-            self._consume("SYMBOL", ",")
+            self._consume(SYMBOL, ",")
             items.append(self._parse_item())
         return items
 
     def _parse_item(self):
-        self._consume("SYMBOL", "(")
-        row = self._consume("NUMBER")
-        self._consume("SYMBOL", ",")
-        col = self._consume("NUMBER")
-        self._consume("SYMBOL", ")")
-        quantity = self._consume("NUMBER")
-        material = self._consume("IDENTIFIER")
-        return {
-            "position": (row, col),
-            "quantity": quantity,
-            "material": material
-        }
+        self._consume(SYMBOL, "(")
+        row = self._consume(NUMBER)
+        self._consume(SYMBOL, ",")
+        col = self._consume(NUMBER)
+        self._consume(SYMBOL, ")")
+        quantity = self._consume(NUMBER)
+        material = self._consume(IDENTIFIER)
+        return Item((row, col), quantity, material)
 
     # --------------------- STATEMENTS AND CONTROL STRUCTURES ---------------------
     def _parse_statement_list(self):
         stmts = []
-        while self.position < len(self.tokens) and self._peek_lexeme() != "}":
+        while not self._at_end() and self._peek_lexeme() != "}":
             stmts.append(self._parse_statement())
         return stmts
 
     def _parse_statement(self):
-        token_type, lexeme, _ = self._peek()
-        if token_type == "IDENTIFIER":
+        # Cada sentencia guarda el offset de su primer token (para los errores en tiempo de ejecución).
+        token_type, lexeme, offset = self._peek()
+        if token_type == IDENTIFIER:
             if self._lookahead_is_operator("="):
-                return self._parse_assignment()
+                node = self._parse_assignment()
+            elif self._lookahead_is_symbol("("):
+                expr = self._parse_call()
+                self._consume(SYMBOL, ";")
+                node = ExpressionStatement(expr)
             else:
                 raise SyntaxError("Unexpected statement: an unassigned identifier was found.", self._current_position())
-        elif token_type == "KEYWORD":
+        elif token_type == KEYWORD:
             if lexeme == "if":
-                return self._parse_conditional()
+                node = self._parse_conditional()
             elif lexeme in ("while", "for"):
-                return self._parse_loop()
+                node = self._parse_loop()
             elif lexeme == "log":
-                return self._parse_log_command()
+                node = self._parse_log_command()
             elif lexeme == "craft":
-                return self._parse_craft_command()
+                node = self._parse_craft_command()
+            elif lexeme == "return":
+                node = self._parse_return()
+            elif lexeme in TYPE_KEYWORDS:
+                node = self._parse_assignment()
             else:
                 raise SyntaxError(f"Invalid statement starting with '{lexeme}'", self._current_position())
         else:
             raise SyntaxError("Invalid statement", self._current_position())
+        return node.at(offset)
 
     def _parse_assignment(self, require_semicolon=True):
-        identifier = self._consume("IDENTIFIER")
-        self._consume("OPERATOR", "=")
+        # Declaración tipada opcional: "int x = 1;", también en el init de un for.
+        declared_type = None
+        if self._peek_type() == KEYWORD and self._peek_lexeme() in TYPE_KEYWORDS:
+            declared_type = self._consume(KEYWORD)
+        identifier = self._consume(IDENTIFIER)
+        self._consume(OPERATOR, "=")
         expr = self._parse_expression()
         if require_semicolon:
-            self._consume("SYMBOL", ";")
-        return {
-            "node_type": "assignment",
-            "identifier": identifier,
-            "expression": expr
-        }
+            self._consume(SYMBOL, ";")
+        return Assignment(identifier, expr, declared_type)
 
     def _parse_conditional(self):
-        self._consume("KEYWORD", "if")
-        self._consume("SYMBOL", "(")
+        self._consume(KEYWORD, "if")
+        self._consume(SYMBOL, "(")
         condition = self._parse_expression()
-        self._consume("SYMBOL", ")")
-        self._consume("SYMBOL", "{")
+        self._consume(SYMBOL, ")")
+        self._consume(SYMBOL, "{")
         then_branch = self._parse_statement_list()
-        self._consume("SYMBOL", "}")
+        self._consume(SYMBOL, "}")
         else_branch = None
         if self._peek_lexeme() == "else":
-            self._consume("KEYWORD", "else")
-            self._consume("SYMBOL", "{")
+            self._consume(KEYWORD, "else")
+            self._consume(SYMBOL, "{")
             else_branch = self._parse_statement_list()
-            self._consume("SYMBOL", "}")
-        return {
-            "node_type": "conditional",
-            "condition": condition,
-            "then_branch": then_branch,
-            "else_branch": else_branch
-        }
+            self._consume(SYMBOL, "}")
+        return Conditional(condition, then_branch, else_branch)
 
     def _parse_loop(self):
         if self._peek_lexeme() == "while":
-            self._consume("KEYWORD", "while")
-            self._consume("SYMBOL", "(")
+            self._consume(KEYWORD, "while")
+            self._consume(SYMBOL, "(")
             condition = self._parse_expression()
-            self._consume("SYMBOL", ")")
-            self._consume("SYMBOL", "{")
+            self._consume(SYMBOL, ")")
+            self._consume(SYMBOL, "{")
             body = self._parse_statement_list()
-            self._consume("SYMBOL", "}")
-            return {
-                "node_type": "while_loop",
-                "condition": condition,
-                "body": body
-            }
+            self._consume(SYMBOL, "}")
+            return WhileLoop(condition, body)
         elif self._peek_lexeme() == "for":
-            self._consume("KEYWORD", "for")
-            self._consume("SYMBOL", "(")
+            self._consume(KEYWORD, "for")
+            self._consume(SYMBOL, "(")
             init = self._parse_assignment(require_semicolon=False)
-            self._consume("SYMBOL", ";")
+            self._consume(SYMBOL, ";")
             condition = self._parse_expression()
-            self._consume("SYMBOL", ";")
+            self._consume(SYMBOL, ";")
             post = self._parse_assignment(require_semicolon=False)
-            self._consume("SYMBOL", ")")
-            self._consume("SYMBOL", "{")
+            self._consume(SYMBOL, ")")
+            self._consume(SYMBOL, "{")
             body = self._parse_statement_list()
-            self._consume("SYMBOL", "}")
-            return {
-                "node_type": "for_loop",
-                "init": init,
-                "condition": condition,
-                "post": post,
-                "body": body
-            }
+            self._consume(SYMBOL, "}")
+            return ForLoop(init, condition, post, body)
 
     def _parse_log_command(self):
-        self._consume("KEYWORD", "log")
-        self._consume("SYMBOL", "(")
+        self._consume(KEYWORD, "log")
+        self._consume(SYMBOL, "(")
         expr = self._parse_expression()
-        self._consume("SYMBOL", ")")
-        self._consume("SYMBOL", ";")
-        return {
-            "node_type": "log",
-            "expression": expr
-        }
+        self._consume(SYMBOL, ")")
+        self._consume(SYMBOL, ";")
+        return Log(expr)
+
+    def _parse_return(self):
+        self._consume(KEYWORD, "return")
+        expr = None
+        if self._peek_lexeme() != ";":
+            expr = self._parse_expression()
+        self._consume(SYMBOL, ";")
+        return Return(expr)
 
     def _parse_craft_command(self):
-        self._consume("KEYWORD", "craft")
-        self._consume("KEYWORD", "recipe")
-        recipe_name = self._consume("IDENTIFIER")
-        self._consume("SYMBOL", ";")
-        return {
-            "node_type": "craft_command",
-            "recipe_name": recipe_name
-        }
-
-    def _parse_expression(self):
-        # Construye un árbol binario para expresiones
-        left = self._parse_term()
-        while self.position < len(self.tokens) and self._peek_type() == "OPERATOR":
-            op = self._consume("OPERATOR")
-            right = self._parse_term()
-            left = {
-                "node_type": "binary_expression",
-                "operator": op,
-                "left": left,
-                "right": right
-            }
-        return left
-
-    def _parse_term(self):
-        token_type, lexeme, _ = self._peek()
-        if token_type == "NUMBER":
-            value_str = self._consume("NUMBER")
+        self._consume(KEYWORD, "craft")
+        self._consume(KEYWORD, "recipe")
+        recipe_name = self._consume(IDENTIFIER)
+        self._consume(SYMBOL, ";")
+        return CraftCommand(recipe_name)
+
+    def _parse_expression(self, stack=None):
+        # Construye un árbol binario para expresiones sin recursión: cada "(" o lista de
+        # argumentos abierta guarda en stack el operando izquierdo y el operador que la
+        # rodean, como (left, op, call) con call None para un paréntesis.
+        # Con stack dado (una llamada como sentencia) termina al cerrar su último nivel.
+        statement_call = stack is not None
+        if stack is None:
+            stack = []
+        left = op = None
+        while True:
+            token_type, lexeme, _ = self._peek()
+            if token_type == SYMBOL and lexeme == "(":
+                self._enter_nesting()
+                self._consume(SYMBOL, "(")
+                stack.append((left, op, None))
+                left = op = None
+                continue
+            if token_type == IDENTIFIER and self._lookahead_is_symbol("("):
+                term, closed = self._open_call()
+                if not closed:
+                    stack.append((left, op, term))
+                    left = op = None
+                    continue
+            else:
+                term = self._parse_term(token_type)
+            # Combina el término y cierra los niveles que terminan tras él.
+            while True:
+                left = term if op is None else BinaryExpr(op, left, term)
+                if self._peek_type() == OPERATOR:
+                    op = self._consume(OPERATOR)
+                    break
+                if not stack:
+                    return left
+                outer_left, outer_op, call = stack[-1]
+                if call is not None:
+                    call.arguments.append(left)
+                    if self._peek_lexeme() == ",":
+                        self._consume(SYMBOL, ",")
+                        left = op = None
+                        break
+                self._consume(SYMBOL, ")")
+                self.nesting -= 1
+                stack.pop()
+                term = left if call is None else call
+                if statement_call and not stack:
+                    return term
+                left, op = outer_left, outer_op
+
+    def _parse_term(self, token_type):
+        # Términos sin anidamiento; "(" y las llamadas los abre _parse_expression.
+        if token_type == NUMBER:
+            value_str = self._consume(NUMBER)
             # Convertir el valor a número (int o float) según corresponda
             if "." in value_str:
                 try:
@@ -263,50 +324,90 @@ class Parser:
                     value = int(value_str)
                 except ValueError:
                     raise SyntaxError("Invalid integer number: " + value_str, self._current_position())
-            return {"node_type": "literal", "value": value}
-        elif token_type == "STRING":
-            value = self._consume("STRING")
-            return {"node_type": "literal", "value": value}
-        elif token_type == "IDENTIFIER":
-            name = self._consume("IDENTIFIER")
-            return {"node_type": "identifier", "name": name}
-        elif token_type == "SYMBOL" and lexeme == "(":
-            self._consume("SYMBOL", "(")
-            expr = self._parse_expression()
-            self._consume("SYMBOL", ")")
-            return expr
+            return Literal(value)
+        elif token_type == STRING:
+            value = self._consume(STRING)
+            return Literal(value)
+        elif token_type == IDENTIFIER:
+            name = self._consume(IDENTIFIER)
+            return Identifier(name)
         else:
             raise SyntaxError("Invalid term in the expression", self._current_position())
 
+    def _parse_call(self):
+        call, closed = self._open_call()
+        if not closed:
+            self._parse_expression([(None, None, call)])
+        return call
+
+    def _open_call(self):
+        # Consume "name(" y, si no tiene argumentos, también ")". Devuelve (call, cerrada).
+        offset = self._current_position()
+        call = Call(self._consume(IDENTIFIER), []).at(offset)
+        self._enter_nesting()
+        self._consume(SYMBOL, "(")
+        if self._peek_lexeme() != ")":
+            return call, False
+        self._consume(SYMBOL, ")")
+        self.nesting -= 1
+        return call, True
+
+    def _enter_nesting(self):
+        # Called on the "(" that opens the level.
+        self.nesting += 1
+        if self.nesting > self.max_nesting:
+            raise SyntaxError(f"Expression nested more than {self.max_nesting} levels deep",
+                              self._current_position())
+
     # --------------------- AUX FUNCTIONS ---------------------
-    def _consume(self, expected_type, expected_lexeme=None):
-        if self.position >= len(self.tokens):
+    def _at_end(self):
+        return self.position >= len(self.kinds)
+
+    def _consume(self, expected_kind, expected_lexeme=None):
+        index = self.position
+        if index >= len(self.kinds):
             raise SyntaxError("Unexpected end of input", self._current_position())
-        token_type, lexeme, position = self.tokens[self.position]
-        if token_type != expected_type or (expected_lexeme is not None and lexeme != expected_lexeme):
+        kind = self.kinds[index]
+        start = self.starts[index]
+        lexeme = self.source[start:self.ends[index]]
+        if kind != expected_kind or (expected_lexeme is not None and lexeme != expected_lexeme):
+            expected_type = TOKEN_TYPES[expected_kind]
             expected_info = f"{expected_type} '{expected_lexeme}'" if expected_lexeme else expected_type
-            raise SyntaxError(f"Expected {expected_info}, found {token_type} '{lexeme}'", position)
-        self.position += 1
+            raise SyntaxError(f"Expected {expected_info}, found {TOKEN_TYPES[kind]} '{lexeme}'", start)
+        self.position = index + 1
         return lexeme
 
     def _peek(self):
-        if self.position >= len(self.tokens):
-            return None, None, self.position
-        return self.tokens[self.position]
+        index = self.position
+        if index >= len(self.kinds):
+            return None, None, index
+        start = self.starts[index]
+        return self.kinds[index], self.source[start:self.ends[index]], start
 
     def _peek_type(self):
-        return self._peek()[0]
+        if self.position >= len(self.kinds):
+            return None
+        return self.kinds[self.position]
 
     def _peek_lexeme(self):
-        return self._peek()[1]
+        index = self.position
+        if index >= len(self.kinds):
+            return None
+        return self.source[self.starts[index]:self.ends[index]]
 
     def _current_position(self):
-        if self.position < len(self.tokens):
-            return self.tokens[self.position][2]
-        return self.tokens[-1][2] if self.tokens else 0
+        if self.position < len(self.starts):
+            return self.starts[self.position]
+        return self.starts[-1] if len(self.starts) else 0
 
     def _lookahead_is_operator(self, op):
-        if self.position + 1 < len(self.tokens):
-            next_token = self.tokens[self.position + 1]
-            return next_token[0] == "OPERATOR" and next_token[1] == op
-        return False
\ No newline at end of file
+        index = self.position + 1
+        if index < len(self.kinds):
+            return self.kinds[index] == OPERATOR and self.source[self.starts[index]:self.ends[index]] == op
+        return False
+
+    def _lookahead_is_symbol(self, symbol):
+        index = self.position + 1
+        if index < len(self.kinds):
+            return self.kinds[index] == SYMBOL and self.source[self.starts[index]:self.ends[index]] == symbol
+        return False
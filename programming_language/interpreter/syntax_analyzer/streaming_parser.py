@@ -0,0 +1,75 @@
+from collections import deque
+from .parser import MAX_NESTING_DEPTH, Parser
+from .syntax_error import SyntaxError
+from interpreter.lexical_analyzer.lexeme import TOKEN_TYPES, TOKEN_KINDS, SYMBOL, OPERATOR
+
+class StreamingParser(Parser):
+    """
+    Parser that pulls (type, lexeme, position) tuples on demand from any iterable,
+    typically Lexer.iter_tokens(). The grammar never looks further than the next
+    token, so at most two tokens are held at a time; combined with iter_nodes()
+    a source of any size is parsed with constant memory.
+    """
+
+    def __init__(self, tokens, max_nesting=MAX_NESTING_DEPTH):
+        self.tokens = iter(tokens)
+        self.window = deque()
+        self.last_position = 0
+        self.position = 0
+        self.nesting = 0
+        self.max_nesting = max_nesting
+
+    def _fill(self, count):
+        window = self.window
+        while len(window) < count:
+            token = next(self.tokens, None)
+            if token is None:
+                return False
+            token_type, lexeme, position = token
+            window.append((TOKEN_KINDS[token_type], lexeme, position))
+            self.last_position = position
+        return True
+
+    # --------------------- AUX FUNCTIONS ---------------------
+    def _at_end(self):
+        return not self._fill(1)
+
+    def _consume(self, expected_kind, expected_lexeme=None):
+        if not self._fill(1):
+            raise SyntaxError("Unexpected end of input", self._current_position())
+        kind, lexeme, position = self.window[0]
+        if kind != expected_kind or (expected_lexeme is not None and lexeme != expected_lexeme):
+            expected_type = TOKEN_TYPES[expected_kind]
+            expected_info = f"{expected_type} '{expected_lexeme}'" if expected_lexeme else expected_type
+            raise SyntaxError(f"Expected {expected_info}, found {TOKEN_TYPES[kind]} '{lexeme}'", position)
+        self.window.popleft()
+        self.position += 1
+        return lexeme
+
+    def _peek(self):
+        if not self._fill(1):
+            return None, None, self.position
+        return self.window[0]
+
+    def _peek_type(self):
+        return self._peek()[0]
+
+    def _peek_lexeme(self):
+        return self._peek()[1]
+
+    def _current_position(self):
+        if self._fill(1):
+            return self.window[0][2]
+        return self.last_position
+
+    def _lookahead_is_operator(self, op):
+        if self._fill(2):
+            kind, lexeme, _ = self.window[1]
+            return kind == OPERATOR and lexeme == op
+        return False
+
+    def _lookahead_is_symbol(self, symbol):
+        if self._fill(2):
+            kind, lexeme, _ = self.window[1]
+            return kind == SYMBOL and lexeme == symbol
+        return False
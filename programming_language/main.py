@@ -1,7 +1,7 @@
 import sys
 import os
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox
 )
 from PyQt5.QtGui import QPixmap, QPalette, QBrush, QFontDatabase, QFont
 from PyQt5.QtCore import Qt
@@ -63,10 +63,19 @@ class MainWindow(QMainWindow):
         self.run_button = QPushButton("Run Code")
         self.run_button.setStyleSheet("background-color: white;")
         self.run_button.clicked.connect(self.run_code)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setStyleSheet("background-color: white;")
+        self.stop_button.clicked.connect(self.stop_code)
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.run_button)
+        buttons_layout.addWidget(self.stop_button)
+        self.statistics_checkbox = QCheckBox("Statistics")
+        self.statistics_checkbox.setToolTip("Time every phase and node type of the next runs")
+        buttons_layout.addWidget(self.statistics_checkbox)
         
         left_content_layout.addWidget(self.code_editor)
         left_content_layout.addWidget(self.debug_panel)
-        left_content_layout.addWidget(self.run_button)
+        left_content_layout.addLayout(buttons_layout)
         
         left_layout.addWidget(left_content)
 
@@ -95,12 +104,22 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(right_panel, 1)
         
         self.interpreter_controller = InterpreterController(
-            self.code_editor, self.crafting_table, self.debug_panel
+            self.code_editor, self.crafting_table, self.debug_panel, self.run_button, self.stop_button
         )
+        self.statistics_checkbox.toggled.connect(self.interpreter_controller.set_collect_statistics)
 
     def run_code(self):
         self.interpreter_controller.interpret_code()
 
+    def stop_code(self):
+        self.interpreter_controller.cancel()
+
+    def closeEvent(self, event):
+        # The worker thread must not outlive the window.
+        self.interpreter_controller.cancel()
+        self.interpreter_controller.wait()
+        super(MainWindow, self).closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
@@ -0,0 +1,2 @@
+__all__ = ["test_bulk_compiler", "test_cli", "test_declared_types", "test_deep_expressions", "test_engine_equivalence",
+           "test_profiler", "test_recipe_registry", "test_service", "test_streaming_lexer"]
\ No newline at end of file
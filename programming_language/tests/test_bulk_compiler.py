@@ -0,0 +1,55 @@
+"""
+Merging in interpreter.bulk_compiler.
+
+Checks that a file that fails to compile adds no recipes, and that a recipe the
+registry cannot index by shape is a merge conflict, not an error of its file.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import pytest
+
+from interpreter.bulk_compiler import bulk_compile
+
+TORCHES = """
+recipe slanted_torch {
+    input: [ (0.5,1) 1 stick, (1,1) 1 coal ];
+    output: torch;
+    tool_required: furnace;
+    quantity: 4;
+}
+recipe torch {
+    input: [ (0,0) 1 coal, (1,0) 1 stick ];
+    output: torch;
+    tool_required: crafting_table;
+    quantity: 4;
+}
+"""
+
+BROKEN = """
+recipe ladder {
+    input: [ (0,0) 1 stick, (2,0) 1 stick ];
+    output: ladder;
+    tool_required: crafting_table;
+    quantity: 3;
+}
+recipe fence {
+    input: [ (0,0) 1 stick;
+"""
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_merge(tmp_path, workers):
+    (tmp_path / "a_torches.txt").write_text(TORCHES, encoding="utf-8")
+    (tmp_path / "b_broken.txt").write_text(BROKEN, encoding="utf-8")
+    report = bulk_compile(str(tmp_path), workers=workers)
+
+    assert list(report.errors) == ["b_broken.txt"]
+    assert (report.errors["b_broken.txt"]["type"], report.errors["b_broken.txt"]["line"]) == ("SyntaxError", 9)
+    assert report.conflicts == [
+        "a_torches.txt: Recipe 'slanted_torch' places 'stick' at a non-integer position (0.5, 1); "
+        "it can only be crafted by name"
+    ]
+    assert report.sources == {"slanted_torch": "a_torches.txt", "torch": "a_torches.txt"}
+    assert report.registry.match(["coal", "stick"]) is None
+    assert report.registry.match([["coal"], ["stick"]]).name == "torch"
@@ -0,0 +1,58 @@
+"""
+The python -m interpreter command line.
+
+Checks that "run" with several files gives each file its own execution limits,
+so the steps and time one file uses are not charged to the next.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import pytest
+
+from interpreter.__main__ import main
+from interpreter.run_interpretation_process import ENGINES
+
+COUNT_TO_30 = "n = 0; while (n < 30) { n = n + 1; } log(n);"
+ENDLESS = "n = 0; while (1) { n = n + 1; }"
+
+
+def write_scripts(directory, *sources):
+    paths = []
+    for index, source in enumerate(sources):
+        path = directory / f"script_{index}.txt"
+        path.write_text(source, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_step_limit_applies_to_each_file(tmp_path, capsys, engine):
+    # 31 loop tests per file: two files fit a limit of 40 only if it is per file.
+    paths = write_scripts(tmp_path, COUNT_TO_30, COUNT_TO_30, COUNT_TO_30)
+    status = main(["run", "--no-cache", "--engine", engine, "--max-steps", "40", *paths])
+    captured = capsys.readouterr()
+    assert (status, captured.err) == (0, "")
+    assert captured.out.split() == ["LOG:", "30.0"] * 3
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_step_limit_failure_does_not_stop_the_next_file(tmp_path, capsys, engine):
+    paths = write_scripts(tmp_path, ENDLESS, COUNT_TO_30)
+    status = main(["run", "--no-cache", "--engine", engine, "--max-steps", "40", *paths])
+    captured = capsys.readouterr()
+    assert status == 1
+    assert captured.err.startswith(paths[0] + ":1:")
+    assert "step limit of 40 steps exceeded" in captured.err
+    assert captured.out.split() == ["LOG:", "30.0"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_timeout_applies_to_each_file(tmp_path, capsys, engine):
+    # The first file runs until its deadline; with a shared deadline the others
+    # would start after it has passed and fail at their first check.
+    paths = write_scripts(tmp_path, ENDLESS, COUNT_TO_30, COUNT_TO_30)
+    status = main(["run", "--no-cache", "--engine", engine, "--timeout", "0.2", *paths])
+    captured = capsys.readouterr()
+    assert status == 1
+    assert captured.err.count("\n") == 1 and captured.err.startswith(paths[0] + ":1:")
+    assert captured.out.split() == ["LOG:", "30.0"] * 2
@@ -0,0 +1,40 @@
+"""
+Variables declared int, float or char.
+
+Every number of the language is a float, and a declared int is the same numeric
+type as float: the value is checked and converted, but never truncated.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import pytest
+
+from interpreter.evaluator.output_sink import RingBufferSink
+from interpreter.run_interpretation_process import ENGINES, run_interpretation_process
+from interpreter.semantic_analyzer.semantic_error import SemanticError
+
+
+def run(code, engine):
+    output = RingBufferSink()
+    run_interpretation_process(code, engine, cache=None, output=output)
+    return [line for line in output.lines() if line.startswith("LOG: ")]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_int_is_float(engine):
+    code = ('int a = 30; int b = 7 / 2; int c = "4"; float d = 30; int e = 2.9; e = e * 2; '
+            'log(a); log(b); log(c); log(d); log(e);')
+    assert run(code, engine) == ["LOG: 30.0", "LOG: 3.5", "LOG: 4.0", "LOG: 30.0", "LOG: 5.8"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_int_accepts_only_numbers(engine):
+    with pytest.raises(Exception, match="cannot assign 'x' to numeric variable 'a'"):
+        run('s = "x"; func f() { return s; } int a = f();', engine)
+    with pytest.raises(SemanticError):
+        run('int a = "x";', engine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_char_is_not_converted(engine):
+    assert run('char c = "a"; c = c + 1; log(c);', engine) == ["LOG: a1.0"]
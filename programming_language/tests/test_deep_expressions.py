@@ -0,0 +1,89 @@
+"""
+Deeply nested expressions and long operator chains.
+
+The parser parses expressions with an explicit stack and bounds the nesting of
+parentheses and calls by its max_nesting (MAX_NESTING_DEPTH by default, more than
+the 496 levels the recursive parser reached), past which it raises a positioned
+SyntaxError. Programs at the default limit, and operator chains of any length,
+run on every engine.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import pytest
+
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import MAX_NESTING_DEPTH, Parser
+from interpreter.syntax_analyzer.streaming_parser import StreamingParser
+from interpreter.syntax_analyzer.syntax_error import SyntaxError
+from interpreter.evaluator.output_sink import RingBufferSink
+from interpreter.run_interpretation_process import ENGINES, run_interpretation_process
+
+CHAIN_TERMS = 20000
+
+
+def nested_programs(depth):
+    """
+    Programs nesting depth parentheses or calls, with the last line they log.
+    """
+    return [
+        pytest.param("x = " + "(" * depth + "1" + ")" * depth + "; log(x);", "LOG: 1.0", id="parentheses"),
+        pytest.param("y = 1; x = " + "y + (" * depth + "1" + ")" * depth + "; log(x);",
+                     f"LOG: {float(depth + 1)}", id="right operands"),
+        pytest.param("func f(a) { return a; } log(" + "f(" * depth + "2" + ")" * depth + ");", "LOG: 2.0",
+                     id="calls"),
+        pytest.param("func f(a) { return a; } y = 1; log(" + "f(y + " * depth + "2" + ")" * depth + ");",
+                     f"LOG: {float(depth + 2)}", id="calls of operations"),
+    ]
+
+
+def parse(code, parser_class, **options):
+    tokens = Lexer(code).tokenize_buffer() if parser_class is Parser else Lexer(code).iter_tokens()
+    return parser_class(tokens, **options).parse()
+
+
+def run(code, engine):
+    output = RingBufferSink()
+    run_interpretation_process(code, engine, cache=None, output=output)
+    return output.lines()
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+@pytest.mark.parametrize("code, expected", nested_programs(MAX_NESTING_DEPTH))
+def test_nesting_up_to_the_limit_runs(code, expected, engine):
+    assert run(code, engine)[-1] == expected
+
+
+@pytest.mark.parametrize("parser_class", [Parser, StreamingParser])
+@pytest.mark.parametrize("code, expected", nested_programs(MAX_NESTING_DEPTH + 1))
+def test_nesting_past_the_limit_is_a_syntax_error(code, expected, parser_class):
+    with pytest.raises(SyntaxError) as error:
+        parse(code, parser_class)
+    # The position of the "(" that opens the level past the limit: the innermost one.
+    assert error.value.position == code.rindex("(", 0, code.index("))"))
+
+
+@pytest.mark.parametrize("parser_class", [Parser, StreamingParser])
+@pytest.mark.parametrize("max_nesting", [10, 5000])
+def test_max_nesting_is_configurable(max_nesting, parser_class):
+    # The parser itself takes no Python frames per level, whatever the limit.
+    for code, _ in (program.values for program in nested_programs(max_nesting)):
+        assert len(parse(code, parser_class, max_nesting=max_nesting)) in (2, 3)
+    for code, _ in (program.values for program in nested_programs(max_nesting + 1)):
+        with pytest.raises(SyntaxError, match=f"more than {max_nesting} levels") as error:
+            parse(code, parser_class, max_nesting=max_nesting)
+        assert error.value.position == code.rindex("(", 0, code.index("))"))
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_long_operator_chain(engine):
+    code = "y = 1; x = " + " + ".join(["y"] * CHAIN_TERMS) + "; log(x);"
+    assert run(code, engine)[-1] == f"LOG: {float(CHAIN_TERMS)}"
+
+
+@pytest.mark.parametrize("engine", list(ENGINES))
+def test_long_operator_chain_in_function(engine):
+    # Mixes the operations of every kind, and a local read inside the chain.
+    code = ("func h(y) { return " + " + ".join(['y', '(y * 2)', '"s"', 'g(y)'] * (CHAIN_TERMS // 4)) + "; } "
+            "func g(z) { return z - 1; } log(h(1));")
+    assert run(code, engine)[-1] == "LOG: 3.0s0.0" + "1.02.0s0.0" * (CHAIN_TERMS // 4 - 1)
@@ -0,0 +1,181 @@
+"""
+Equivalence of the execution engines.
+
+Runs every program in EQUIVALENCE_PROGRAMS, the templates and a few programs
+from ProgramGenerator on each engine in ENGINES ("tree", "stack", "vm",
+"python"), on the parsed and on the optimized tree, with and without
+memoization, and checks that each one writes the same lines with the same
+source positions, raises the same error at the same position and leaves the
+same global_env as the tree-walking Interpreter on the parsed tree. Then runs
+them under step limits, whose ResourceLimitError carries the position of the
+loop or call that ran out of steps.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import functools
+import os
+
+import pytest
+
+from benchmarks.program_generator import ProgramGenerator
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.syntax_analyzer.ast_nodes import FunctionDefinition
+from interpreter.semantic_analyzer.semantic_analyzer import SemanticAnalyzer
+from interpreter.semantic_analyzer.type_inference import TypeInference
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.evaluator.execution_limits import ExecutionLimits
+from interpreter.evaluator.output_sink import StructuredSink
+from interpreter.run_interpretation_process import ENGINES, create_engine
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates")
+
+# Seeds of the ProgramGenerator programs checked, at scale 1.
+GENERATED_SEEDS = (0, 1, 2)
+
+# max_steps of the step-limit cases; small enough to stop most loops and recursions.
+STEP_LIMITS = (1, 5, 40)
+
+EQUIVALENCE_PROGRAMS = [
+    # '+' falls back to string concatenation when float() fails on either operand.
+    'a = 1 + 2; b = "x" + 1; c = 1 + "y"; d = "1" + "2"; log(a); log(b); log(c); log(d);',
+    # Arithmetic and ordering comparisons coerce with float().
+    'a = "3" * 2; b = 7 / 2; c = "10" > 9; d = 1 - "0.5"; log(a); log(b); log(c); log(d);',
+    # '==' and '!=' compare without coercion.
+    'log(1 == 1); log("1" == 1); log(2 != "2"); log(1.0 == 1);',
+    'x = 0; for (i = 1; i <= 10; i = i + 1) { x = x + i; if (x > 20) { log("big " + x); } else { log(x); } }',
+    'n = 5; while (n > 0) { n = n - 1; } log(n);',
+    'if (0) { log("then"); } else { } log("after");',
+    'func area(w, h) { r = w * h; } log("defined"); craft recipe bread;',
+    # Recipes are registered when defined and craft commands resolve through the registry.
+    'recipe torch { input: [ (0,0) 1 coal, (1,0) 1 stick ]; output: torch; tool_required: crafting_table; '
+    'quantity: 4; } craft recipe torch; func make() { craft recipe torch; } make();',
+    'recipe a { input: [ (0,0) 1 x, (0,1) 1 y ]; output: a; tool_required: crafting_table; quantity: 1; } '
+    'recipe b { input: [ (1,1) 1 y, (1,2) 1 x ]; output: b; tool_required: crafting_table; quantity: 1; } '
+    'recipe a { input: [ (0,0) 1 z ]; output: a; tool_required: crafting_table; quantity: 2; } craft recipe a;',
+    # Errors must be raised at the same point, after the same output.
+    'log("before"); log(missing);',
+    'x = "a" - missing;',
+    'x = "a" - 1;',
+    'x = 1 / 0;',
+    'log(1); x = 1 % 2;',
+    'x = 2 < "b";',
+    # Constant subtrees and branches removed by the Optimizer.
+    'x = "Task #" + 1; y = (60 * 60) * 24; z = 1 < 2; log(x); log(y); log(z); log(z + 1);',
+    'if (1 > 2) { log("no"); } else { log("yes"); } if (0) { log("zero"); }',
+    'while (1 > 2) { log("never"); } for (i = 5; i < 2; i = i + 1) { log(i); } log(i);',
+    # Fast paths chosen by TypeInference and coercion of declared variables.
+    'a = 2; b = a * 3; c = a + b; d = c < 10; log(c); log(d); s = "n: " + c; log(s + "!");',
+    'int n = "4"; float f = n / 8; char c = "id"; log(n + f); log(c + n); n = 1 < 2; log(n);',
+    'x = 1; if (x > 0) { x = "one"; } log(x + 1); t = "k" + 1; log(t);',
+    'func f(p) { int q = p; char w = p; } log("ok");',
+    'int n = 1; n = n - "x";',
+    'char c = "a"; c = c + 1; log(c);',
+    # Calls, frames, return values and memoization of pure functions.
+    'func fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); } log(fib(12)); log(fib(12));',
+    'func g(a, b) { c = a * b; return; } x = g(2, 3); log(x); g(1, 1); log(c);',
+    'func show(t) { log("t=" + t); return t; } y = show(1) + show("1"); log(y);',
+    'func add(a, b) { return a + b; } func twice(f, v) { return f(v, v); } log(twice(add, 4));',
+    'func ab(x) { return x + "!"; } log(ab(1 < 2)); log(ab(1)); log(ab(1 == 1));',
+    'k = 2; func scale(v) { return v * k; } log(scale(3)); k = 5; log(scale(3));',
+    'func f(a) { return a; } log(f(1, 2));',
+    'x = 3; log(x(1));',
+    'func f(a) { if (a > 0) { b = 1; } return b; } log(f(1)); log(f(0));',
+    'func down(n) { return down(n + 1); } down(0);',
+    # Reads the global k, so it is not memoized and always reaches the depth limit.
+    'k = 1; func d(n) { while (1 < 2) { if (n > 0) { for (i = 0; i < 1; i = i + 1) { '
+    'return 1 + (1 * (1 + d(n - k))); } } return 0; } } log(d(99)); log(d(100));',
+    'func loop(n) { for (i = 0; i < n; i = i + 1) { if (i == 3) { return i * 10; } } return -1; } log(loop(9)); log(loop(2));',
+]
+
+
+def parse(code):
+    """
+    Parses, resolves variable slots and infers types. Undefined variables are not rejected, so
+    the engines' own run-time errors can be compared.
+    """
+    abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+    semantic_analyzer = SemanticAnalyzer(check_undefined=False)
+    semantic_analyzer.analyze(abstract_syntax_tree)
+    TypeInference().infer(abstract_syntax_tree)
+    return abstract_syntax_tree, semantic_analyzer.global_scope
+
+
+def template_files():
+    """
+    (file name, source) of the templates, sorted by name.
+    """
+    templates = []
+    if os.path.isdir(TEMPLATES_DIR):
+        for filename in sorted(os.listdir(TEMPLATES_DIR)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(TEMPLATES_DIR, filename), "r", encoding="utf-8") as f:
+                    templates.append((filename, f.read()))
+    return templates
+
+
+def load_templates():
+    return [code for _, code in template_files()]
+
+
+def programs():
+    cases = [pytest.param(code, id=f"program-{index}") for index, code in enumerate(EQUIVALENCE_PROGRAMS)]
+    cases.extend(pytest.param(code, id=filename) for filename, code in template_files())
+    cases.extend(pytest.param(ProgramGenerator(seed).generate(), id=f"generated-{seed}") for seed in GENERATED_SEEDS)
+    return cases
+
+
+@functools.lru_cache(maxsize=None)
+def trees(code):
+    # Engines only read the trees, so every case of a program shares them.
+    abstract_syntax_tree, global_scope = parse(code)
+    return abstract_syntax_tree, Optimizer().optimize(abstract_syntax_tree), global_scope
+
+
+def run_engine(engine_name, abstract_syntax_tree, global_scope, memo_size=0, limits=None):
+    """
+    (lines written, with their positions and kinds; error, with its position; global_env) of one run.
+    """
+    output = StructuredSink(capacity=1_000_000)
+    engine = create_engine(engine_name, global_scope, memo_size, limits, output)
+    error = None
+    try:
+        engine.run(abstract_syntax_tree)
+    except Exception as e:
+        error = (type(e).__name__, str(e), getattr(e, "position", None))
+    # Functions are compared by name: the optimized tree stores folded bodies.
+    global_env = {
+        name: ("function", value.name) if isinstance(value, FunctionDefinition) else value
+        for name, value in engine.global_env.items()
+    }
+    records = [(record.text, record.position, record.kind) for record in output.records()]
+    return records, error, global_env
+
+
+@pytest.mark.parametrize("memo_size", [0, 16])
+@pytest.mark.parametrize("optimized", [False, True], ids=["parsed", "optimized"])
+@pytest.mark.parametrize("engine_name", list(ENGINES))
+@pytest.mark.parametrize("code", programs())
+def test_engine_matches_tree_interpreter(code, engine_name, optimized, memo_size):
+    abstract_syntax_tree, optimized_tree, global_scope = trees(code)
+    expected_records, expected_error, expected_env = run_engine("tree", abstract_syntax_tree, global_scope)
+    records, error, global_env = run_engine(engine_name, optimized_tree if optimized else abstract_syntax_tree,
+                                            global_scope, memo_size)
+    assert error == expected_error
+    assert records == expected_records
+    assert global_env == expected_env
+
+
+@pytest.mark.parametrize("max_steps", STEP_LIMITS)
+@pytest.mark.parametrize("engine_name", list(ENGINES))
+@pytest.mark.parametrize("code", programs())
+def test_engine_stops_like_tree_interpreter(code, engine_name, max_steps):
+    # The Optimizer drops loops that never run, so only the parsed tree is compared.
+    abstract_syntax_tree, _, global_scope = trees(code)
+    # A small check_interval also exercises the blocks of steps grant() hands out.
+    expected = run_engine("tree", abstract_syntax_tree, global_scope,
+                          limits=ExecutionLimits(max_steps, check_interval=3))
+    actual = run_engine(engine_name, abstract_syntax_tree, global_scope,
+                        limits=ExecutionLimits(max_steps, check_interval=3))
+    assert actual == expected
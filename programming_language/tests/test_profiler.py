@@ -0,0 +1,135 @@
+"""
+ScriptProfiler: the numbers of annotated_source().
+
+The profiler's clock is replaced by one that only moves when the script writes
+a line or computes a binary operation (1 ms each), so every hit count and time
+in the report is exact.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import types
+
+import pytest
+
+from interpreter import profiler as profiler_module
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.semantic_analyzer.iterative_semantic_analyzer import IterativeSemanticAnalyzer
+from interpreter.semantic_analyzer.type_inference import TypeInference
+from interpreter.optimizer.optimizer import Optimizer
+from interpreter.evaluator.interpreter import Interpreter
+from interpreter.evaluator.output_sink import OutputSink
+from interpreter.profiler import ScriptProfiler
+
+FOR_LOOP = """\
+for (i = 0; i < 3; i = i + 1) {
+    log(i);
+}
+"""
+
+RECURSION = """\
+func fact(n) {
+    if (n < 2) {
+        return 1;
+    }
+    return n * fact(n - 1);
+}
+log(fact(3));
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def tick(self):
+        self.now += 0.001
+
+    def perf_counter(self):
+        return self.now
+
+
+class TickingSink(OutputSink):
+    def __init__(self, clock):
+        self.clock = clock
+
+    def write_line(self, text, position=None, kind=None):
+        self.clock.tick()
+
+
+def profile(code, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(profiler_module, "time", types.SimpleNamespace(perf_counter=clock.perf_counter))
+    abstract_syntax_tree = Parser(Lexer(code).tokenize_buffer()).parse()
+    semantic_analyzer = IterativeSemanticAnalyzer()
+    semantic_analyzer.analyze(abstract_syntax_tree)
+    TypeInference().infer(abstract_syntax_tree)
+    interpreter = Interpreter(semantic_analyzer.global_scope, output=TickingSink(clock))
+    binary_operation = interpreter._binary_operation
+
+    def ticking_binary_operation(node, left, right):
+        clock.tick()
+        return binary_operation(node, left, right)
+
+    interpreter._binary_operation = ticking_binary_operation
+    profiler = ScriptProfiler(code)
+    profiler.attach(interpreter).run(Optimizer().optimize(abstract_syntax_tree))
+    return profiler.annotated_source()
+
+
+def line_table(report):
+    """
+    {line: (hits, self ms, total ms)} of the lines that ran, and {scope: (line, hits, total ms)}.
+    """
+    lines, scopes = {}, {}
+    rows = iter(report[2:])
+    for row in rows:
+        if not row:
+            break
+        number, hits = row[:6].strip(), row[6:16].strip()
+        if hits:
+            lines[int(number)] = (int(hits), float(row[16:28]), float(row[28:40]))
+    next(rows)
+    for row in rows:
+        if not row:
+            break
+        scopes[row[:24].strip()] = (int(row[24:30]), int(row[30:40]), float(row[40:52]))
+    return lines, scopes
+
+
+def test_for_loop(monkeypatch):
+    report = profile(FOR_LOOP, monkeypatch)
+    lines, scopes = line_table(report)
+    # The header runs 4 tests and 3 posts (7 ms) on the loop's line; the body logs 3 times.
+    assert lines == {1: (1, 7.0, 10.0), 2: (3, 3.0, 3.0)}
+    assert scopes == {"for line 1": (1, 1, 10.0)}
+    assert report[0] == "Profile of 3 lines, 10.00 ms in the interpreter"
+    assert report[-1].startswith("The self time of a loop's line is its header")
+
+
+def test_recursive_function(monkeypatch):
+    report = profile(RECURSION, monkeypatch)
+    lines, scopes = line_table(report)
+    assert lines == {
+        # "Defined function: fact"
+        1: (1, 1.0, 1.0),
+        # n < 2 once per call.
+        2: (3, 3.0, 3.0),
+        3: (1, 0.0, 0.0),
+        # n - 1 and n * ... in fact(3) and fact(2); the outer call's total holds the inner one.
+        5: (2, 4.0, 6.0),
+        # The log, after the 7 ms of fact(3).
+        7: (1, 1.0, 8.0),
+    }
+    assert scopes == {"func fact": (1, 3, 7.0)}
+    assert report[0] == "Profile of 7 lines, 9.00 ms in the interpreter"
+    assert not any(line.startswith("The self time of a loop") for line in report)
+
+
+@pytest.mark.parametrize("code", [FOR_LOOP, RECURSION])
+def test_self_times_add_up_to_the_run(code, monkeypatch):
+    report = profile(code, monkeypatch)
+    lines, _ = line_table(report)
+    total = float(report[0].split(", ")[1].split()[0])
+    assert sum(self_ms for _, self_ms, _ in lines.values()) == pytest.approx(total)
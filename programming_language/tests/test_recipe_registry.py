@@ -0,0 +1,69 @@
+"""
+RecipeRegistry: shape matching, mirror images and conflicts.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+from interpreter.lexical_analyzer.lexer import Lexer
+from interpreter.syntax_analyzer.parser import Parser
+from interpreter.crafting.recipe_registry import RecipeRegistry
+
+# An L of planks with a stick in the corner, and its mirror image.
+LEFT_HOOK = """
+recipe left_hook {
+    input: [ (0,0) 1 plank, (1,0) 1 plank, (1,1) 1 stick ];
+    output: hook;
+    tool_required: crafting_table;
+    quantity: 1;
+}
+"""
+RIGHT_HOOK = LEFT_HOOK.replace("left_hook", "right_hook").replace("(0,0)", "(0,1)").replace(
+    "(1,0) 1 plank, (1,1) 1 stick", "(1,1) 1 plank, (1,0) 1 stick")
+
+LEFT_GRID = [["plank", None], ["plank", "stick"]]
+RIGHT_GRID = [[None, "plank"], ["stick", "plank"]]
+
+
+def recipe(source):
+    node, = Parser(Lexer(source).tokenize_buffer()).parse()
+    return node
+
+
+def test_mirroring():
+    registry = RecipeRegistry()
+    assert registry.add(recipe(LEFT_HOOK)) == []
+    assert registry.match(LEFT_GRID).name == registry.match(RIGHT_GRID).name == "left_hook"
+    assert RecipeRegistry.from_nodes([recipe(LEFT_HOOK)], allow_mirroring=False).match(RIGHT_GRID) is None
+
+
+def test_mirror_image_of_a_recipe_is_a_conflict():
+    registry = RecipeRegistry()
+    registry.add(recipe(LEFT_HOOK))
+    assert registry.add(recipe(RIGHT_HOOK)) == [
+        "Recipes 'left_hook' and 'right_hook' have the same shape; 'left_hook' is kept"
+    ]
+    assert registry.match(LEFT_GRID).name == registry.match(RIGHT_GRID).name == "left_hook"
+    assert registry.get("right_hook").name == "right_hook"
+
+
+def test_conflict_on_the_mirrored_shape_only():
+    # left_hook is registered before mirroring is allowed, so it holds its own shape
+    # only: right_hook's shape is free but its mirror image is taken.
+    registry = RecipeRegistry(allow_mirroring=False)
+    registry.add(recipe(LEFT_HOOK))
+    registry.allow_mirroring = True
+    assert registry.add(recipe(RIGHT_HOOK)) == [
+        "Recipes 'left_hook' and 'right_hook' have mirror-image shapes; 'left_hook' is kept"
+    ]
+    # right_hook is stored under neither shape, whatever the order of the keys.
+    assert registry.match(LEFT_GRID).name == "left_hook"
+    assert registry.match(RIGHT_GRID) is None
+    assert list(registry.by_shape.values()) == [registry.get("left_hook")]
+
+
+def test_symmetric_recipe_has_one_shape():
+    registry = RecipeRegistry()
+    registry.add(recipe(LEFT_HOOK.replace("(0,0) 1 plank, (1,0) 1 plank, (1,1) 1 stick",
+                                          "(0,0) 1 plank, (0,1) 1 plank, (1,0) 1 stick, (1,1) 1 stick")))
+    assert len(registry.by_shape) == 1
+    assert registry.match([["plank", "plank"], ["stick", "stick"]]).name == "left_hook"
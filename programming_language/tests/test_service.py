@@ -0,0 +1,94 @@
+"""
+interpreter.service: job validation and the worker pool's dispatchers.
+
+The pool is driven with stand-in workers, so a worker that crashes and a
+replacement that fails to start can be arranged without real processes.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import asyncio
+import json
+
+import pytest
+
+from interpreter import service
+from interpreter.service import JobRejected, WorkerPool, validate_job
+
+
+def body(**request):
+    return json.dumps(dict(code="log(1);", **request)).encode("utf-8")
+
+
+@pytest.mark.parametrize("name", ["timeout", "max_steps", "max_memory", "memo_size"])
+@pytest.mark.parametrize("value", [True, False])
+def test_booleans_are_not_numbers(name, value):
+    with pytest.raises(JobRejected) as error:
+        validate_job("run", body(**{name: value}))
+    assert error.value.status == 400
+    assert f'"{name}"' in error.value.message
+
+
+def test_numbers_are_accepted():
+    job = validate_job("run", body(timeout=1, max_steps=0, max_memory=None, memo_size=8))
+    assert (job["timeout"], job["max_steps"], job["max_memory"], job["memo_size"]) == (1, 0, None, 8)
+    assert validate_job("run", body(timeout=0.5))["timeout"] == 0.5
+
+
+class StandInWorker:
+    """
+    Answers every job with an ok result, or fails them all like a dead worker.
+    """
+
+    def __init__(self, crashed=False):
+        self.crashed = crashed
+        self.killed = False
+
+    def round_trip(self, job):
+        if self.crashed:
+            raise EOFError("worker exited")
+        return {"ok": True, "output": [job["code"]], "dropped": 0, "error": None, "elapsed": 0.0}
+
+    def kill(self):
+        self.killed = True
+
+    def stop(self, timeout=1.0):
+        pass
+
+
+def test_dispatcher_survives_a_replacement_that_fails_to_start(monkeypatch):
+    monkeypatch.setattr(service, "RESPAWN_DELAY", 0.01)
+    crashed = StandInWorker(crashed=True)
+    replacement = StandInWorker()
+    # The pool starts with a crashed worker; its first replacement fails to start,
+    # and the second one takes half a second.
+    spawns = []
+
+    async def spawn():
+        spawns.append(len(spawns))
+        if len(spawns) == 1:
+            return crashed
+        if len(spawns) == 2:
+            raise OSError("fork failed")
+        await asyncio.sleep(0.5)
+        return replacement
+
+    async def scenario():
+        pool = WorkerPool(1, kill_grace=0.1, start_method="spawn")
+        monkeypatch.setattr(pool, "_spawn", spawn)
+        await pool.start()
+        job = validate_job("run", body())
+        try:
+            # Answered at once, before the replacement has started.
+            first = await asyncio.wait_for(pool.submit(job), 0.3)
+            second = await asyncio.wait_for(pool.submit(dict(job, code="log(2);")), 5)
+            return first, second, pool.health(), [task.done() for task in pool.tasks]
+        finally:
+            await pool.close()
+
+    first, second, health, tasks_done = asyncio.run(scenario())
+    assert first["error"]["type"] == "WorkerCrashed"
+    assert second["ok"] and second["output"] == ["log(2);"]
+    assert crashed.killed
+    assert (health["crashed"], health["respawn_failed"], health["respawned"]) == (1, 1, 1)
+    assert tasks_done == [False]
@@ -0,0 +1,77 @@
+"""
+Lexer.iter_tokens() over sources read in chunks.
+
+Checks that it produces the tokens, or raises the error, of tokenize() for any
+chunk size, and that an error is raised as soon as its text is read instead of
+after reading the rest of the source.
+
+Run from the programming_language directory:
+    python -m pytest tests
+"""
+import io
+
+import pytest
+
+from interpreter.lexical_analyzer.lexer import STREAM_CHUNK_SIZE, STREAM_MAX_STRING, Lexer
+from interpreter.lexical_analyzer.lexical_error import LexicalError
+from tests.test_engine_equivalence import load_templates
+
+CHUNK_SIZES = (1, 2, 3, 7, 64, 4096)
+
+SOURCES = load_templates() + [
+    'x = "' + "a string\nover many lines " * 500 + '"; y = 12.5; // comment\nlog(x);',
+    "a = 1; @ b = 2;",
+    'a = 1; b = "never closed ' + "z" * 3000,
+    "a = 1.5",
+]
+
+
+class EndlessSource:
+    """
+    A file-like source that starts with head and then repeats a statement for chunks reads.
+    """
+
+    def __init__(self, head, chunks):
+        self.head = head
+        self.chunks = chunks
+        self.reads = 0
+
+    def read(self, size):
+        self.reads += 1
+        if self.head:
+            head, self.head = self.head, ""
+            return head
+        if self.chunks == 0:
+            return ""
+        self.chunks -= 1
+        return "x = 1; " * (size // 7)
+
+
+def tokens_or_error(tokenize):
+    try:
+        return list(tokenize())
+    except LexicalError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("source", SOURCES)
+def test_iter_tokens_matches_tokenize(source, chunk_size):
+    expected = tokens_or_error(Lexer(source).tokenize)
+    assert tokens_or_error(lambda: Lexer(io.StringIO(source)).iter_tokens(chunk_size)) == expected
+
+
+def test_invalid_character_raises_without_reading_ahead():
+    source = EndlessSource("a = 1; @ ", 10000)
+    with pytest.raises(LexicalError) as error:
+        list(Lexer(source).iter_tokens())
+    assert error.value.position == 7
+    assert source.reads <= 2
+
+
+def test_unterminated_string_stops_reading_at_the_limit():
+    source = EndlessSource('a = "open ', 10000)
+    with pytest.raises(LexicalError) as error:
+        list(Lexer(source).iter_tokens())
+    assert error.value.position == 4
+    assert source.reads <= STREAM_MAX_STRING // STREAM_CHUNK_SIZE + 3